@@ -0,0 +1,280 @@
+"""
+Voice pack mastering: silence trimming, integrated loudness normalization
+(ITU-R BS.1770 / EBU R128 gating) and peak limiting, all vectorized NumPy over
+decoded samples. Processing always starts from a lossless master, so running it
+again gives the same output instead of degrading the audio further
+"""
+
+import os
+import json
+import hashlib
+import subprocess
+from contextlib import ExitStack
+
+import numpy as np
+from pydub import AudioSegment
+
+from render_jobs import atomic_output, file_sha256
+
+MASTERS_DIR = "audio_masters/amharic"
+# Lossless formats accepted in the master store (captures are written as WAV)
+MASTER_EXTENSIONS = ('.wav', '.flac')
+# Written into the clip directory: clip name -> output/master hashes and settings
+MASTER_INDEX = ".mastered.json"
+# Bump when the processing changes, so every clip is re-mastered
+MASTERING_VERSION = 1
+
+DEFAULT_SETTINGS = {
+    'target_lufs': -16.0,
+    'ceiling_db': -1.0,
+    'silence_db': -50.0,
+    'trim_padding_ms': 20,
+    'limiter_window_ms': 5,
+    'bitrate': '128k',
+}
+
+# Distribution formats, all mono, each encoded straight from mastered PCM. Budgets
+# are for a whole voice pack (every single clip plus the 75 call clips), sized for
+# halls on slow mobile data
+FORMATS = {
+    'opus': {
+        'extension': 'opus',
+        'mime': 'audio/ogg; codecs=opus',
+        'muxer': 'ogg',
+        'args': ['-c:a', 'libopus', '-b:a', '24k', '-application', 'voip', '-vbr', 'on'],
+        'budget_kb': 600,
+    },
+    'mp3': {
+        'extension': 'mp3',
+        'mime': 'audio/mpeg',
+        'muxer': 'mp3',
+        'args': ['-c:a', 'libmp3lame', '-b:a', '64k'],
+        'budget_kb': 1600,
+    },
+    'aac': {
+        'extension': 'm4a',
+        'mime': 'audio/mp4; codecs=mp4a.40.2',
+        'muxer': 'mp4',
+        'args': ['-c:a', 'aac', '-b:a', '48k', '-movflags', '+faststart'],
+        'budget_kb': 1300,
+    },
+}
+
+# K-weighting from BS.1770 (as derived in libebur128): a high shelf, then a high-pass
+SHELF = (3.999843853973347, 0.7071752369554196, 1681.974450955533)  # gain dB, Q, fc
+HIGH_PASS = (0.5003270373253953, 38.13547087613982)  # Q, fc
+BLOCK_SECONDS = 0.4
+BLOCK_STEP_SECONDS = 0.1
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = -10.0
+
+def decode(path, rate=None):
+    """(mono float32 samples in [-1, 1], sample rate) from any file pydub can read, resampled to rate if given"""
+    segment = AudioSegment.from_file(path).set_channels(1).set_sample_width(2)
+    if rate:
+        segment = segment.set_frame_rate(rate)
+    samples = np.frombuffer(segment.raw_data, dtype=np.int16).astype(np.float32) / 32768
+    return samples, segment.frame_rate
+
+def to_pcm(samples):
+    """Float samples as 16-bit PCM"""
+    return np.clip(np.round(samples * 32768), -32768, 32767).astype(np.int16)
+
+def encode(samples, rate, path, fmt, bitrate=DEFAULT_SETTINGS['bitrate']):
+    """Write float samples as 16-bit audio, atomically"""
+    pcm = to_pcm(samples)
+    segment = AudioSegment(pcm.tobytes(), frame_rate=rate, sample_width=2, channels=1)
+    with atomic_output(path) as temp_path:
+        segment.export(temp_path, format=fmt, **({'bitrate': bitrate} if fmt in ('mp3', 'ogg') else {}))
+
+def format_spec_key(formats):
+    """The encoder settings of formats, for cache keys"""
+    return [[name, FORMATS[name]['args'], FORMATS[name]['muxer']] for name in formats]
+
+def ffmpeg_command(rate, outputs):
+    """One ffmpeg run reading 16-bit mono PCM on stdin and writing every (format, path) output"""
+    command = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+               '-f', 's16le', '-ar', str(rate), '-ac', '1', '-i', 'pipe:0']
+    for fmt, path in outputs:
+        command += ['-map', '0:a', '-map_metadata', '-1', *FORMATS[fmt]['args'], '-f', FORMATS[fmt]['muxer'], path]
+    return command
+
+def encode_formats(pcm, rate, outputs):
+    """
+    Encode 16-bit PCM to every (format, path) in a single ffmpeg pass; each output
+    is written atomically. Raises RuntimeError with ffmpeg's message on failure
+    """
+    with ExitStack() as stack:
+        temp_outputs = [(fmt, stack.enter_context(atomic_output(path))) for fmt, path in outputs]
+        result = subprocess.run(ffmpeg_command(rate, temp_outputs), input=pcm.tobytes(), capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='replace').strip()}")
+
+def frame_levels_db(samples, rate, frame_ms=10):
+    """RMS level of consecutive frames, in dBFS"""
+    size = max(1, int(rate * frame_ms / 1000))
+    count = len(samples) // size
+    if count == 0:
+        return np.array([-np.inf]), size
+    frames = samples[:count * size].reshape(count, size)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    with np.errstate(divide='ignore'):
+        return 20 * np.log10(rms), size
+
+def trim_silence(samples, rate, silence_db, padding_ms):
+    """Cut leading and trailing frames quieter than silence_db, keeping padding_ms of each"""
+    levels, size = frame_levels_db(samples, rate)
+    loud = np.flatnonzero(levels > silence_db)
+    if len(loud) == 0:
+        return samples
+    padding = int(rate * padding_ms / 1000)
+    start = max(0, loud[0] * size - padding)
+    end = min(len(samples), (loud[-1] + 1) * size + padding)
+    return samples[start:end]
+
+def biquad_response(b, a, omega):
+    """Complex frequency response of a biquad at angular frequencies omega"""
+    z = np.exp(-1j * omega)
+    return (b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)
+
+def k_weighting_response(rate, omega):
+    """Both K-weighting stages, designed for this sample rate (matches the spec's 48 kHz coefficients)"""
+    gain_db, q, fc = SHELF
+    k = np.tan(np.pi * fc / rate)
+    vh = 10 ** (gain_db / 20)
+    vb = vh ** 0.4996667741545416
+    shelf = biquad_response(
+        [vh + vb * k / q + k * k, 2 * (k * k - vh), vh - vb * k / q + k * k],
+        [1 + k / q + k * k, 2 * (k * k - 1), 1 - k / q + k * k],
+        omega)
+    
+    q, fc = HIGH_PASS
+    k = np.tan(np.pi * fc / rate)
+    a0 = 1 + k / q + k * k
+    high_pass = biquad_response([1, -2, 1], [1, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0], omega)
+    return shelf * high_pass
+
+def k_weighted(samples, rate):
+    """
+    K-weighting applied in the frequency domain (one FFT instead of a per-sample
+    IIR loop); zero padding keeps the filter tails from wrapping around
+    """
+    size = 1 << int(np.ceil(np.log2(len(samples) + rate // 2)))
+    spectrum = np.fft.rfft(samples, size)
+    omega = 2 * np.pi * np.arange(len(spectrum)) / size
+    return np.fft.irfft(spectrum * k_weighting_response(rate, omega), size)[:len(samples)]
+
+def integrated_loudness(samples, rate):
+    """Gated integrated loudness in LUFS (-inf for silence)"""
+    weighted = k_weighted(samples, rate)
+    block = int(rate * BLOCK_SECONDS)
+    step = int(rate * BLOCK_STEP_SECONDS)
+    squares = np.concatenate([[0.0], np.cumsum(weighted.astype(np.float64) ** 2)])
+    if len(weighted) <= block:
+        powers = np.array([squares[-1] / max(1, len(weighted))])
+    else:
+        starts = np.arange(0, len(weighted) - block + 1, step)
+        powers = (squares[starts + block] - squares[starts]) / block
+    
+    with np.errstate(divide='ignore'):
+        levels = -0.691 + 10 * np.log10(powers)
+    gated = powers[levels > ABSOLUTE_GATE_LUFS]
+    if len(gated) == 0:
+        return -np.inf
+    relative_gate = -0.691 + 10 * np.log10(gated.mean()) + RELATIVE_GATE_LU
+    with np.errstate(divide='ignore'):
+        gated = gated[-0.691 + 10 * np.log10(gated) > relative_gate]
+    return float(-0.691 + 10 * np.log10(gated.mean()))
+
+def limit_peaks(samples, rate, ceiling_db, window_ms):
+    """
+    Look-ahead peak limiter: the gain each sample needs to stay under the ceiling
+    is spread by a sliding minimum, then smoothed with a moving average of the same
+    width, so the gain ramps in before a peak and never lets one exceed the ceiling
+    """
+    ceiling = 10 ** (ceiling_db / 20)
+    peaks = np.abs(samples)
+    if peaks.max(initial=0) <= ceiling:
+        return samples
+    width = max(1, int(rate * window_ms / 1000)) | 1
+    needed = np.minimum(1.0, ceiling / np.maximum(peaks, 1e-9))
+    padded = np.pad(needed, width // 2, mode='edge')
+    spread = np.lib.stride_tricks.sliding_window_view(padded, width).min(axis=1)
+    smooth = np.convolve(np.pad(spread, width // 2, mode='edge'), np.ones(width) / width, mode='valid')
+    return samples * smooth
+
+def master_samples(samples, rate, settings):
+    """Trim, normalize and limit; returns (samples, stats)"""
+    trimmed = trim_silence(samples, rate, settings['silence_db'], settings['trim_padding_ms'])
+    loudness = integrated_loudness(trimmed, rate)
+    gain_db = settings['target_lufs'] - loudness if np.isfinite(loudness) else 0.0
+    limited = limit_peaks(trimmed * 10 ** (gain_db / 20), rate, settings['ceiling_db'], settings['limiter_window_ms'])
+    return limited, {
+        'duration_ms': round(len(samples) * 1000 / rate),
+        'trimmed_ms': round(len(trimmed) * 1000 / rate),
+        'loudness_lufs': round(loudness, 2) if np.isfinite(loudness) else None,
+        'gain_db': round(gain_db, 2),
+        'output_lufs': round(integrated_loudness(limited, rate), 2) if np.isfinite(loudness) else None,
+        'peak_db': round(float(20 * np.log10(max(np.abs(limited).max(initial=0), 1e-9))), 2),
+    }
+
+def settings_key(settings):
+    return hashlib.sha256(json.dumps([MASTERING_VERSION, settings], sort_keys=True).encode()).hexdigest()[:16]
+
+def master_path(masters_dir, name):
+    return os.path.join(masters_dir, f"{name}.wav")
+
+def find_masters(masters_dir):
+    """{name: path} for every lossless master in the store"""
+    if not os.path.isdir(masters_dir):
+        return {}
+    return {os.path.splitext(name)[0]: os.path.join(masters_dir, name) for name in sorted(os.listdir(masters_dir))
+            if name.endswith(MASTER_EXTENSIONS)}
+
+def capture_master(clip_path, path):
+    """Store a raw clip losslessly as the master every later run starts from"""
+    samples, rate = decode(clip_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    encode(samples, rate, path, 'wav')
+
+def master_clip(job):
+    """Worker: master one clip from its lossless master into the clip's own path and format"""
+    name, source_path, output_path, settings = job
+    samples, rate = decode(source_path)
+    mastered, stats = master_samples(samples, rate, settings)
+    encode(mastered, rate, output_path, os.path.splitext(output_path)[1][1:], settings['bitrate'])
+    return dict(stats, name=name, output_sha256=file_sha256(output_path))
+
+def load_master_index(clip_dir):
+    try:
+        with open(os.path.join(clip_dir, MASTER_INDEX)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_master_index(clip_dir, index):
+    with atomic_output(os.path.join(clip_dir, MASTER_INDEX)) as temp_path:
+        with open(temp_path, 'w') as f:
+            json.dump(index, f, indent=1, sort_keys=True)
+
+def plan_mastering(clip_paths, masters_dir, settings, index, force=False):
+    """
+    Jobs for clips that need mastering, capturing new raw clips as masters first
+    A clip whose hash matches the recorded output is our own output: it is
+    re-mastered from its stored master only when the settings change.
+    Anything else is a new raw clip (e.g. freshly synthesized) and becomes the master
+    """
+    key = settings_key(settings)
+    jobs, unchanged, captured = [], [], []
+    for name, clip_path in clip_paths.items():
+        record = index.get(name, {})
+        master = master_path(masters_dir, name)
+        ours = record.get('output') == file_sha256(clip_path) and os.path.exists(master)
+        if not ours:
+            capture_master(clip_path, master)
+            captured.append(name)
+        elif record.get('settings') == key and not force:
+            unchanged.append(name)
+            continue
+        jobs.append((name, master, clip_path, settings))
+    return jobs, unchanged, captured
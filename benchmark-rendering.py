@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Benchmark card rendering across the PDF, JPG, PNG and master poster outputs
+Runs offline on a generated deck, writes machine-readable JSON and compares
+against a stored baseline with a regression threshold
+"""
+
+import io
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import importlib
+import subprocess
+import contextlib
+from PIL import Image
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+from master_poster import StreamingPNGWriter
+
+printable_cards = importlib.import_module('generate-printable-cards')
+jpg_cards = importlib.import_module('generate-printable-jpg-cards')
+png_cards = importlib.import_module('generate-png-cards')
+sample_cards = importlib.import_module('generate-sample-jpg-cards')
+vector_master = importlib.import_module('create-vector-master')
+
+BASELINE_PATH = "benchmarks/baseline.json"
+DEFAULT_SIZES = [100, 1000, 10000]
+DEFAULT_THRESHOLD = 0.10  # 10% slower / bigger counts as a regression
+OUTPUTS = ['pdf', 'jpg', 'png', 'master', 'vector-master']
+
+# Master poster cell size, matching create-160x210-master.py
+MASTER_COLS = 10
+MASTER_CELL = (189, 248)
+
+# Metrics compared against the baseline, all "lower is better" except throughput
+COMPARED_METRICS = ['p50_ms', 'p95_ms', 'cards_per_second', 'peak_rss_mb', 'output_bytes']
+
+def synthetic_deck(count):
+    """Reproducible cards 1..count, generated the same way as the sample JPG cards"""
+    return [sample_cards.generate_bingo_card_data(n) for n in range(1, count + 1)]
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def file_size_and_remove(path):
+    """Output size of one card file; removed so 10k-card runs don't fill the disk"""
+    size = os.path.getsize(path)
+    os.remove(path)
+    return size
+
+def bench_pdf(cards, work_dir):
+    for card in cards:
+        path = os.path.join(work_dir, f"bingo_card_{card['card_number']:03d}.pdf")
+        with contextlib.redirect_stdout(io.StringIO()):
+            printable_cards.create_redesigned_bingo_card(card, path)
+        yield file_size_and_remove(path)
+
+def bench_jpg(cards, work_dir):
+    for card in cards:
+        path = os.path.join(work_dir, f"bingo_card_{card['card_number']:03d}.jpg")
+        jpg_cards.create_jpg_bingo_card(card).save(path, 'JPEG', quality=95, optimize=True)
+        yield file_size_and_remove(path)
+
+def bench_png(cards, work_dir):
+    for card in cards:
+        path = os.path.join(work_dir, f"bingo_card_{card['card_number']:03d}.png")
+        with contextlib.redirect_stdout(io.StringIO()):
+            png_cards.create_png_bingo_card(card, path)
+        yield file_size_and_remove(path)
+
+def bench_master(cards, work_dir):
+    """Raster master: each card rendered, shrunk to a grid cell and streamed band by band"""
+    cell_width, cell_height = MASTER_CELL
+    rows = math.ceil(len(cards) / MASTER_COLS)
+    path = os.path.join(work_dir, "master.png")
+    
+    with StreamingPNGWriter(path, MASTER_COLS * cell_width, rows * cell_height) as master:
+        band = Image.new('RGB', (MASTER_COLS * cell_width, cell_height), (255, 255, 255))
+        for index, card in enumerate(cards):
+            col = index % MASTER_COLS
+            if col == 0:
+                band.paste((255, 255, 255), (0, 0, band.width, band.height))
+            
+            card_img = jpg_cards.create_jpg_bingo_card(card)
+            card_img.thumbnail(MASTER_CELL, Image.Resampling.LANCZOS)
+            band.paste(card_img, (col * cell_width, 0))
+            
+            # The band write is charged to the card that completes the row
+            if col == MASTER_COLS - 1 or index == len(cards) - 1:
+                master.write_band(band)
+            yield 0
+    
+    yield file_size_and_remove(path)
+
+def bench_vector_master(cards, work_dir):
+    """Vector master: the whole deck is one PDF, so only the total is timed"""
+    path = os.path.join(work_dir, "master_vector.pdf")
+    vector_master.create_vector_master(cards, path)
+    yield file_size_and_remove(path)
+
+BENCHMARKS = {
+    'pdf': bench_pdf,
+    'jpg': bench_jpg,
+    'png': bench_png,
+    'master': bench_master,
+    'vector-master': bench_vector_master,
+}
+
+def run_case(output, count):
+    """
+    Render one output path for a synthetic deck of count cards
+    Each yield of the benchmark generator marks one finished card (or, for
+    whole-deck outputs, the finished file), so the gaps between yields are
+    per-card latencies
+    """
+    cards = synthetic_deck(count)
+    work_dir = tempfile.mkdtemp(prefix=f"bench-{output}-")
+    latencies = []
+    output_bytes = 0
+    
+    try:
+        # One untimed card first so font loading and lazy imports don't skew the tail
+        for _ in BENCHMARKS[output](cards[:1], work_dir):
+            pass
+        
+        start = time.perf_counter()
+        last = start
+        for size in BENCHMARKS[output](cards, work_dir):
+            now = time.perf_counter()
+            latencies.append((now - last) * 1000)
+            last = now
+            output_bytes += size
+        elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    # A trailing yield that only reports the file size is not a card
+    per_card = latencies[:count] if len(latencies) >= count else []
+    return {
+        'output': output,
+        'cards': count,
+        'seconds': round(elapsed, 3),
+        'cards_per_second': round(count / elapsed, 2) if elapsed else None,
+        'p50_ms': round(percentile(per_card, 50), 3) if per_card else None,
+        'p95_ms': round(percentile(per_card, 95), 3) if per_card else None,
+        'p99_ms': round(percentile(per_card, 99), 3) if per_card else None,
+        'max_ms': round(max(per_card), 3) if per_card else None,
+        'peak_rss_mb': round(peak_rss_mb(), 1) if resource else None,
+        'output_bytes': output_bytes,
+    }
+
+def run_case_isolated(output, count):
+    """Run one case in a fresh interpreter so peak RSS belongs to that case alone"""
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--run-case', output, str(count)],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(f"Error benchmarking {output} x {count}: {result.stderr.strip()}")
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def case_key(case):
+    return f"{case['output']}/{case['cards']}"
+
+def compare_to_baseline(results, baseline, threshold):
+    """Return a list of regression messages (empty when everything is within threshold)"""
+    baseline_cases = {case_key(case): case for case in baseline.get('cases', [])}
+    regressions = []
+    
+    for case in results['cases']:
+        old = baseline_cases.get(case_key(case))
+        if not old:
+            continue
+        for metric in COMPARED_METRICS:
+            new_value, old_value = case.get(metric), old.get(metric)
+            if not new_value or not old_value:
+                continue
+            # Throughput regresses when it drops, everything else when it grows
+            if metric == 'cards_per_second':
+                change = (old_value - new_value) / old_value
+            else:
+                change = (new_value - old_value) / old_value
+            if change > threshold:
+                regressions.append(f"{case_key(case)} {metric}: {old_value} -> {new_value} "
+                                   f"({change:+.0%})")
+    
+    return regressions
+
+def print_table(results):
+    print(f"\n{'case':<22}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'cards/s':>10}{'RSS MB':>9}{'bytes':>14}")
+    for case in results['cases']:
+        cells = [case['p50_ms'], case['p95_ms'], case['p99_ms'], case['cards_per_second'], case['peak_rss_mb']]
+        cells = [f"{value:.1f}" if value is not None else '-' for value in cells]
+        print(f"{case_key(case):<22}{cells[0]:>9}{cells[1]:>9}{cells[2]:>9}{cells[3]:>10}{cells[4]:>9}"
+              f"{case['output_bytes']:>14,}")
+
+def run_benchmarks(outputs, sizes):
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'cases': [],
+    }
+    
+    for count in sizes:
+        for output in outputs:
+            print(f"Benchmarking {output} x {count} cards...")
+            case = run_case_isolated(output, count)
+            if case:
+                results['cases'].append(case)
+    
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark card rendering")
+    parser.add_argument('--outputs', nargs='+', choices=OUTPUTS, default=OUTPUTS)
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                        help="Synthetic deck sizes (default: 100 1000 10000)")
+    parser.add_argument('--output', help="Write results JSON here")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed relative regression, e.g. 0.10 for 10%%")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Store this run as the new baseline")
+    parser.add_argument('--run-case', nargs=2, metavar=('OUTPUT', 'CARDS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.run_case:
+        # Child process: print one JSON line for the parent
+        print(json.dumps(run_case(args.run_case[0], int(args.run_case[1]))))
+        sys.exit(0)
+    
+    results = run_benchmarks(args.outputs, args.sizes)
+    print_table(results)
+    
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nREGRESSIONS (threshold {args.threshold:.0%}):")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline} (threshold {args.threshold:.0%})")
+    else:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
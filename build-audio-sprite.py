@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Pack every caller clip into one audio sprite per format plus a JSON manifest of offsets
+The sprite is built from the lossless masters and encoded to every format in one pass;
+the browser preloads a single file and plays any call by seeking into it
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+
+import numpy as np
+
+from audio_mastering import (DEFAULT_SETTINGS, FORMATS, MASTERS_DIR, decode, encode_formats, find_masters,
+                             format_spec_key, master_samples, settings_key, to_pcm)
+from render_jobs import atomic_output, file_sha256
+from voice_synthesis import AMHARIC_TEXTS, CALL_CLIP_NAMES
+
+SPRITE_DIR = "public/audio/sprites"
+SPRITE_NAME = "amharic"
+# Bump when the packing itself changes, so old sprites are rebuilt
+PACKER_VERSION = 2
+SAMPLE_RATE = 24000  # gTTS output rate; masters are resampled to it
+GAP_MS = 250
+
+def sprite_masters(masters_dir):
+    """{name: master path} for every caller clip in the store, in sprite order"""
+    masters = find_masters(masters_dir)
+    # Combined call clips are packed too when compose-call-clips.py has built them
+    return {name: masters[name] for name in list(AMHARIC_TEXTS) + CALL_CLIP_NAMES if name in masters}
+
+def sprite_key(masters, formats, gap_ms, settings):
+    """Hash of every master and packing setting; the sprite is rebuilt only when it changes"""
+    content = [PACKER_VERSION, format_spec_key(formats), gap_ms, SAMPLE_RATE, settings_key(settings)]
+    content += [[name, file_sha256(path)] for name, path in masters.items()]
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()
+
+def sprite_path(output_dir, name, fmt):
+    return os.path.join(output_dir, f"{name}.{FORMATS[fmt]['extension']}")
+
+def build_sprite(masters, output_dir, name, formats, gap_ms=GAP_MS, settings=None):
+    """
+    Master each clip, concatenate them with gap_ms of silence before each one and
+    encode the sprite to every format in a single pass. Returns {name: {start, duration}} in ms
+    """
+    settings = settings or DEFAULT_SETTINGS
+    gap = np.zeros(int(SAMPLE_RATE * gap_ms / 1000), dtype=np.int16)
+    parts, clips, length = [], {}, 0
+    for clip_name, path in masters.items():
+        samples, rate = decode(path, SAMPLE_RATE)
+        pcm = to_pcm(master_samples(samples, rate, settings)[0])
+        # The leading gap also absorbs the encoder's start-up delay in lossy formats
+        parts += [gap, pcm]
+        length += len(gap)
+        clips[clip_name] = {'start': round(length * 1000 / SAMPLE_RATE),
+                            'duration': round(len(pcm) * 1000 / SAMPLE_RATE)}
+        length += len(pcm)
+    parts.append(gap)
+    
+    encode_formats(np.concatenate(parts), SAMPLE_RATE, [(fmt, sprite_path(output_dir, name, fmt)) for fmt in formats])
+    return clips
+
+def load_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def pack_audio_sprite(masters_dir=MASTERS_DIR, output_dir=SPRITE_DIR, name=SPRITE_NAME, formats=tuple(FORMATS),
+                      gap_ms=GAP_MS, settings=None, force=False):
+    """Build <name>.<ext> for each format and <name>.json unless they're already current; returns (manifest, rebuilt)"""
+    settings = settings or DEFAULT_SETTINGS
+    masters = sprite_masters(masters_dir)
+    if not masters:
+        raise FileNotFoundError(f"No masters found in {masters_dir} - run enhance-current-audio.py to capture them")
+    manifest_path = os.path.join(output_dir, f"{name}.json")
+    key = sprite_key(masters, formats, gap_ms, settings)
+    
+    manifest = load_manifest(manifest_path)
+    if (not force and manifest and manifest.get('key') == key
+            and all(os.path.exists(sprite_path(output_dir, name, fmt)) for fmt in formats)):
+        return manifest, False
+    
+    os.makedirs(output_dir, exist_ok=True)
+    clips = build_sprite(masters, output_dir, name, formats, gap_ms, settings)
+    manifest = {
+        'version': PACKER_VERSION,
+        'key': key,
+        'formats': {fmt: {
+            'file': os.path.basename(sprite_path(output_dir, name, fmt)),
+            'mime': FORMATS[fmt]['mime'],
+            'bytes': os.path.getsize(sprite_path(output_dir, name, fmt)),
+        } for fmt in formats},
+        'sampleRate': SAMPLE_RATE,
+        'gap': gap_ms,
+        'clips': clips,
+    }
+    with atomic_output(manifest_path) as temp_path:
+        with open(temp_path, 'w') as f:
+            json.dump(manifest, f, indent=1, ensure_ascii=False)
+    return manifest, True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack the caller clips into one audio sprite per format")
+    parser.add_argument('--masters', default=MASTERS_DIR, help="Lossless master store")
+    parser.add_argument('--output-dir', default=SPRITE_DIR)
+    parser.add_argument('--name', default=SPRITE_NAME)
+    parser.add_argument('--formats', nargs='+', choices=list(FORMATS), default=list(FORMATS))
+    parser.add_argument('--gap', type=int, default=GAP_MS, help="Silence before each clip, in ms")
+    parser.add_argument('--target-lufs', type=float, default=DEFAULT_SETTINGS['target_lufs'])
+    parser.add_argument('--force', action='store_true', help="Rebuild even if no master changed")
+    args = parser.parse_args()
+    
+    if not shutil.which('ffmpeg'):
+        print("❌ ffmpeg not found - install it to encode the sprite")
+        sys.exit(1)
+    
+    settings = dict(DEFAULT_SETTINGS, target_lufs=args.target_lufs)
+    start = time.perf_counter()
+    try:
+        manifest, rebuilt = pack_audio_sprite(args.masters, args.output_dir, args.name, tuple(args.formats),
+                                              args.gap, settings, args.force)
+    except (FileNotFoundError, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    missing = [name for name in AMHARIC_TEXTS if name not in manifest['clips']]
+    if missing:
+        print(f"⚠️  No master for: {', '.join(missing)}")
+    status = "Built" if rebuilt else "Up to date:"
+    sizes = ', '.join(f"{fmt} {info['bytes'] / 1024:.0f} KB" for fmt, info in manifest['formats'].items())
+    print(f"✅ {status} {args.output_dir}/{args.name} ({len(manifest['clips'])} clips; {sizes}) "
+          f"in {time.perf_counter() - start:.2f}s")
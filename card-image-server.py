@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Local HTTP service that renders bingo cards on request instead of pre-rendering every file
+GET /cards/<number>.<png|jpg|webp|pdf|svg>?width=300&tenant=<slug> renders from the deck,
+with an in-memory and on-disk LRU, strong ETags and coalescing of concurrent requests
+"""
+
+import io
+import os
+import json
+import time
+import bisect
+import hashlib
+import argparse
+import importlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from reportlab.pdfgen import canvas
+
+from card_layout import (DEFAULT_LAYOUT, PDFRenderer, PILRenderer, SVGRenderer, compile_layout, load_layout,
+                         template_key)
+from render_jobs import card_digest, ensure_cache_dir
+
+png_cards = importlib.import_module('generate-png-cards')
+svg_cards = importlib.import_module('generate-svg-cards')
+tenant_decks = importlib.import_module('render-tenant-decks')
+
+DEFAULT_PORT = 8765
+DISK_CACHE_DIR = "printable_cards/.render_cache"
+# Rendered template layers live in this subdirectory of the disk cache
+TEMPLATE_SUBDIR = "templates"
+
+# Widths a client may ask for; anything else is snapped up to the next one so the
+# cache can't be filled with one-off sizes
+WIDTHS = [150, 300, 600, 1200]
+DEFAULT_WIDTH = 600
+
+CONTENT_TYPES = {
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'webp': 'image/webp',
+    'pdf': 'application/pdf',
+    'svg': 'image/svg+xml',
+}
+SAVE_OPTIONS = {
+    'png': ('PNG', {}),
+    'jpg': ('JPEG', {'quality': 90}),
+    'webp': ('WEBP', {'quality': 80}),
+}
+
+# Cold render latency buckets in milliseconds (Prometheus histogram)
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+class MemoryLRU:
+    """Thread-safe LRU of rendered bytes, bounded by total size"""
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key):
+        with self.lock:
+            data = self.items.get(key)
+            if data is not None:
+                self.items.move_to_end(key)
+            return data
+    
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.items:
+                self.size -= len(self.items.pop(key))
+            self.items[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self.items.popitem(last=False)
+                self.size -= len(evicted)
+
+class DiskLRU:
+    """
+    Rendered files under one directory, named by ETag and bounded by total size
+    Recency survives restarts through file mtimes, which are bumped on every hit
+    """
+    
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.items = OrderedDict()
+        self.size = 0
+        ensure_cache_dir(directory)
+        
+        entries = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            # Skip the .gitignore and the template subdirectory
+            if name.startswith('.') or not os.path.isfile(path):
+                continue
+            if name.endswith('.part'):
+                os.remove(path)
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self.items[name] = size
+            self.size += size
+        self._evict()
+    
+    def get(self, name):
+        with self.lock:
+            if name not in self.items:
+                return None
+            self.items.move_to_end(name)
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            with self.lock:
+                self.size -= self.items.pop(name, 0)
+            return None
+    
+    def put(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path + '.part', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.part', path)
+        with self.lock:
+            self.size -= self.items.pop(name, 0)
+            self.items[name] = len(data)
+            self.size += len(data)
+            self._evict()
+    
+    def _evict(self):
+        while self.size > self.max_bytes and self.items:
+            name, size = self.items.popitem(last=False)
+            self.size -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+class Metrics:
+    """Counters and the cold render histogram, exported in Prometheus text format"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.render_count = 0
+        self.render_ms_total = 0.0
+    
+    def inc(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+    
+    def observe_render(self, ms):
+        with self.lock:
+            self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+            self.render_count += 1
+            self.render_ms_total += ms
+    
+    def hit_rate(self):
+        with self.lock:
+            lookups = {labels: count for (name, labels), count in self.counters.items()
+                       if name == 'card_cache_lookups_total'}
+        total = sum(lookups.values())
+        misses = lookups.get((('result', 'miss'),), 0)
+        return (total - misses) / total if total else 0.0
+    
+    def text(self):
+        lines = []
+        with self.lock:
+            for (name, labels), count in sorted(self.counters.items()):
+                label_text = ','.join(f'{key}="{value}"' for key, value in labels)
+                lines.append(f"{name}{{{label_text}}} {count}" if label_text else f"{name} {count}")
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS_MS + ['+Inf'], self.buckets):
+                cumulative += count
+                lines.append(f'card_cold_render_ms_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f"card_cold_render_ms_sum {self.render_ms_total:.3f}")
+            lines.append(f"card_cold_render_ms_count {self.render_count}")
+        lines.append(f"card_cache_hit_ratio {self.hit_rate():.4f}")
+        return '\n'.join(lines) + '\n'
+
+class CardRenderService:
+    """Deck, tenant branding and caches; render() is safe to call from many threads"""
+    
+    def __init__(self, cards, tenants=None, layout_path=DEFAULT_LAYOUT, memory_mb=64, disk_mb=512,
+                 disk_dir=DISK_CACHE_DIR):
+        self.cards = {card['card_number']: card for card in cards}
+        self.digests = {number: card_digest(card) for number, card in self.cards.items()}
+        self.spec = load_layout(layout_path)
+        self.branding = {'': {}}
+        for tenant in tenants or []:
+            self.branding[tenant_decks.tenant_slug(tenant['tenant'])] = {
+                key: tenant[key] for key in tenant_decks.BRANDING_KEYS if key in tenant}
+        
+        self.display_lists = {}
+        self.template_keys = {}
+        self.renderers = {}
+        self.setup_lock = threading.Lock()
+        self.memory = MemoryLRU(memory_mb * 1024 * 1024)
+        self.disk = DiskLRU(disk_dir, disk_mb * 1024 * 1024) if disk_mb else None
+        # Without a disk cache, templates are only kept in memory
+        self.template_dir = os.path.join(disk_dir, TEMPLATE_SUBDIR) if disk_mb else None
+        self.metrics = Metrics()
+        self.inflight = {}
+        self.inflight_lock = threading.Lock()
+    
+    def display_list(self, tenant):
+        with self.setup_lock:
+            if tenant not in self.display_lists:
+                display_list = compile_layout(self.spec, self.branding[tenant])
+                self.template_keys[tenant] = template_key(display_list)
+                self.display_lists[tenant] = display_list
+            return self.display_lists[tenant]
+    
+    def renderer(self, tenant, kind, width):
+        """Renderers are built once per tenant, backend and width, then shared by threads"""
+        key = (tenant, kind, width)
+        with self.setup_lock:
+            renderer = self.renderers.get(key)
+        if renderer is None:
+            display_list = self.display_list(tenant)
+            scale = width / display_list.width
+            if kind == 'pil':
+                renderer = PILRenderer(display_list, scale, cache_dir=self.template_dir)
+            elif kind == 'pdf':
+                renderer = PDFRenderer(display_list, scale)
+            else:
+                renderer = SVGRenderer(display_list)
+            with self.setup_lock:
+                renderer = self.renderers.setdefault(key, renderer)
+        return renderer
+    
+    def etag(self, number, output_format, width, tenant):
+        """
+        Strong validator: hash of the card's numbers, the tenant's template and the
+        output settings, so it changes exactly when the bytes would
+        """
+        self.display_list(tenant)
+        content = [self.digests[number], self.template_keys[tenant], output_format,
+                   width, SAVE_OPTIONS.get(output_format)]
+        return hashlib.sha256(json.dumps(content).encode()).hexdigest()[:32]
+    
+    def render(self, number, output_format, width, tenant):
+        """(bytes, etag, cache result) for one card, rendering at most once per key at a time"""
+        etag = self.etag(number, output_format, width, tenant)
+        name = f"{etag}.{output_format}"
+        
+        data = self.memory.get(name)
+        if data is not None:
+            self.metrics.inc('card_cache_lookups_total', result='memory')
+            return data, etag, 'memory'
+        
+        with self.inflight_lock:
+            future = self.inflight.get(name)
+            leader = future is None
+            if leader:
+                future = self.inflight[name] = Future()
+        
+        if not leader:
+            self.metrics.inc('card_cache_lookups_total', result='coalesced')
+            return future.result(), etag, 'coalesced'
+        
+        try:
+            data = self.disk.get(name) if self.disk else None
+            if data is not None:
+                result = 'disk'
+            else:
+                result = 'miss'
+                start = time.perf_counter()
+                data = self._render_bytes(self.cards[number], output_format, width, tenant)
+                self.metrics.observe_render((time.perf_counter() - start) * 1000)
+                if self.disk:
+                    self.disk.put(name, data)
+            self.memory.put(name, data)
+            self.metrics.inc('card_cache_lookups_total', result=result)
+            future.set_result(data)
+            return data, etag, result
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with self.inflight_lock:
+                self.inflight.pop(name, None)
+    
+    def _render_bytes(self, card, output_format, width, tenant):
+        if output_format == 'svg':
+            renderer = self.renderer(tenant, 'svg', width)
+            document = svg_cards.card_svg(card, renderer, renderer.symbol())
+            # The SVG scales itself; width only sets its default display size
+            d = renderer.display_list
+            height = round(d.height * width / d.width)
+            return document.replace(f'width="{d.width}" height="{d.height}"',
+                                    f'width="{width}" height="{height}"', 1).encode('utf-8')
+        
+        if output_format == 'pdf':
+            renderer = self.renderer(tenant, 'pdf', width)
+            buffer = io.BytesIO()
+            # invariant=1 drops the creation date and random document ID, so equal cards give equal bytes
+            canv = canvas.Canvas(buffer, pagesize=(renderer.width, renderer.height), invariant=1)
+            renderer.draw_card(canv, card)
+            canv.showPage()
+            canv.save()
+            return buffer.getvalue()
+        
+        fmt, options = SAVE_OPTIONS[output_format]
+        buffer = io.BytesIO()
+        self.renderer(tenant, 'pil', width).render(card).save(buffer, fmt, **options)
+        return buffer.getvalue()
+
+def snap_width(value):
+    """The smallest allowed width at least as large as the request"""
+    index = bisect.bisect_left(WIDTHS, value)
+    return WIDTHS[min(index, len(WIDTHS) - 1)]
+
+class CardRequestHandler(BaseHTTPRequestHandler):
+    server_version = "CardImageServer/1.0"
+    service = None
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/metrics':
+            return self._send(200, self.service.metrics.text().encode(), 'text/plain; version=0.0.4')
+        if url.path == '/health':
+            return self._send(200, b'ok\n', 'text/plain')
+        
+        parts = url.path.strip('/').split('/')
+        if len(parts) != 2 or parts[0] != 'cards' or '.' not in parts[1]:
+            return self._error(404, "Use /cards/<number>.<format>")
+        
+        number_text, output_format = parts[1].rsplit('.', 1)
+        query = parse_qs(url.query)
+        tenant = query.get('tenant', [''])[0]
+        try:
+            number = int(number_text)
+            width = snap_width(int(query.get('width', [DEFAULT_WIDTH])[0]))
+        except ValueError:
+            return self._error(400, "Card number and width must be integers")
+        
+        if output_format not in CONTENT_TYPES:
+            return self._error(404, f"Unknown format: {output_format}")
+        if number not in self.service.cards:
+            return self._error(404, f"Card {number} not in the deck")
+        if tenant not in self.service.branding:
+            return self._error(404, f"Unknown tenant: {tenant}")
+        
+        etag = self.service.etag(number, output_format, width, tenant)
+        if self.headers.get('If-None-Match') in (f'"{etag}"', '*'):
+            self.service.metrics.inc('card_requests_total', status='304')
+            self.send_response(304)
+            self.send_header('ETag', f'"{etag}"')
+            self.end_headers()
+            return
+        
+        data, etag, result = self.service.render(number, output_format, width, tenant)
+        self._send(200, data, CONTENT_TYPES[output_format], etag=etag, cache=result)
+    
+    def _send(self, status, body, content_type, etag=None, cache=None):
+        self.service.metrics.inc('card_requests_total', status=str(status))
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if etag:
+            self.send_header('ETag', f'"{etag}"')
+            self.send_header('Cache-Control', 'public, max-age=3600')
+            self.send_header('X-Cache', cache)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _error(self, status, message):
+        self._send(status, (message + '\n').encode(), 'text/plain')
+    
+    def log_message(self, format, *args):
+        pass
+
+def serve(service, host='127.0.0.1', port=DEFAULT_PORT):
+    CardRequestHandler.service = service
+    server = ThreadingHTTPServer((host, port), CardRequestHandler)
+    server.daemon_threads = True
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve bingo card images rendered on demand")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--deck', help="JSON file of bingo_cards rows instead of the database")
+    parser.add_argument('--tenants', help="Tenant branding JSON (see layouts/tenants.example.json)")
+    parser.add_argument('--layout', default=DEFAULT_LAYOUT, help="Layout spec JSON")
+    parser.add_argument('--memory-mb', type=int, default=64, help="In-memory cache size")
+    parser.add_argument('--disk-mb', type=int, default=512, help="On-disk cache size (0 disables it)")
+    parser.add_argument('--cache-dir', default=DISK_CACHE_DIR,
+                        help="On-disk cache directory; rendered templates go in its templates/ subdirectory")
+    args = parser.parse_args()
+    
+    if args.deck:
+        with open(args.deck) as f:
+            cards = json.load(f)
+    else:
+        print("Fetching bingo cards from database...")
+        cards = png_cards.fetch_bingo_cards()
+    
+    if not cards:
+        print("No cards found!")
+    else:
+        tenants = tenant_decks.load_tenants(args.tenants) if args.tenants else []
+        service = CardRenderService(cards, tenants, args.layout, args.memory_mb, args.disk_mb, args.cache_dir)
+        server = serve(service, args.host, args.port)
+        print(f"🖼️  Serving {len(cards)} cards for {len(service.branding)} branding(s) "
+              f"on http://{args.host}:{args.port}/cards/<number>.<format>")
+        print(f"Metrics: http://{args.host}:{args.port}/metrics")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nStopped")
@@ -0,0 +1,582 @@
+"""
+Declarative card layouts compiled into a flat display list
+A JSON spec (layouts/*.json) is compiled once into primitives; the PIL, reportlab
+and SVG backends replay the static part once per output and only fill in the
+variable text slots (card number and the 24 numbers) per card
+"""
+
+import io
+import os
+import json
+import base64
+import string
+import hashlib
+from xml.sax.saxutils import escape
+from PIL import Image, ImageDraw, ImageFont
+from reportlab.pdfgen import canvas
+
+from render_jobs import ensure_cache_dir
+
+LAYOUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "layouts")
+DEFAULT_LAYOUT = os.path.join(LAYOUT_DIR, "digital_card.json")
+
+# Text y coordinates are the vertical center of the text; baselines sit this far below
+BASELINE_SHIFT = 0.35
+# With "baseline": "top", y is the top of the text; baselines sit this far below in PDF/SVG
+TOP_SHIFT = 0.72
+
+# TrueType fonts tried in order for the PIL backend, keyed by (bold, italic)
+PIL_FONTS = {
+    (False, False): ['arial.ttf', 'DejaVuSans.ttf'],
+    (True, False): ['arialbd.ttf', 'DejaVuSans-Bold.ttf'],
+    (False, True): ['ariali.ttf', 'DejaVuSans-Oblique.ttf'],
+    (True, True): ['arialbi.ttf', 'DejaVuSans-BoldOblique.ttf'],
+}
+PDF_FONTS = {
+    (False, False): 'Helvetica',
+    (True, False): 'Helvetica-Bold',
+    (False, True): 'Helvetica-Oblique',
+    (True, True): 'Helvetica-BoldOblique',
+}
+RESAMPLE = {'lanczos': Image.Resampling.LANCZOS, 'bicubic': Image.Resampling.BICUBIC}
+SVG_FONT_FAMILY = 'Arial, Helvetica, sans-serif'
+
+# Rendered static layers (one per distinct branding and scale), keyed by template_key()
+TEMPLATE_CACHE_DIR = "printable_cards/.templates"
+_templates = {}
+
+class DisplayList:
+    """
+    A compiled layout: size, fonts and three lists of primitives
+    static ops are identical on every card; variable ops are text ops whose
+    text is a str.format template filled from card_values(); front ops are
+    static ops from "front" elements, drawn over the variable text
+    """
+    
+    def __init__(self, name, size, fonts, static, variable, front=()):
+        self.name = name
+        self.width, self.height = size
+        self.fonts = fonts
+        self.static = static
+        self.variable = variable
+        self.front = list(front)
+
+def load_layout(path=DEFAULT_LAYOUT):
+    """Read a layout spec from JSON"""
+    with open(path) as f:
+        return json.load(f)
+
+def parse_color(value, colors):
+    """
+    A named color from the spec, #rrggbb or [r, g, b] in 0-1, as an RGB tuple in 0-255
+    The list form keeps reportlab colors such as Color(0.2, 0.4, 0.8) exact in PDFs
+    """
+    if value is None:
+        return None
+    value = colors.get(value, value) if isinstance(value, str) else value
+    if isinstance(value, list) and len(value) == 3:
+        return tuple(c * 255 for c in value)
+    if not isinstance(value, str) or not value.startswith('#') or len(value) != 7:
+        raise ValueError(f"Unknown color: {value}")
+    return tuple(int(value[i:i + 2], 16) for i in (1, 3, 5))
+
+def parse_font(font):
+    """
+    A spec font with defaults: size, bold and italic, plus optional overrides
+    'pdf' (a reportlab font name), 'pil' (TrueType files to try) and
+    'pil_fallback_size' (the size of Pillow's built-in font when none of them load)
+    """
+    parsed = {'size': font['size'], 'bold': bool(font.get('bold')), 'italic': bool(font.get('italic'))}
+    parsed.update({key: font[key] for key in ('pdf', 'pil', 'pil_fallback_size') if key in font})
+    return parsed
+
+def _pair(value):
+    """An [x, y] spec value, or one number used for both"""
+    return tuple(value) if isinstance(value, (list, tuple)) else (value, value)
+
+class _Slot:
+    """Stands in for a per-card field while layout params are filled in, keeping it as a template"""
+    
+    def __init__(self, name):
+        self.name = name
+    
+    def __format__(self, format_spec):
+        return '{' + self.name + (':' + format_spec if format_spec else '') + '}'
+
+class _LayoutParams(dict):
+    def __missing__(self, key):
+        return _Slot(key)
+
+def fill_params(template, params):
+    """Fill layout params such as {title} or {price}; per-card slots stay as {card_number:03d} etc."""
+    return template.format_map(params)
+
+def text_fields(template):
+    """Names of the format fields in a text template"""
+    return [field for _, field, _, _ in string.Formatter().parse(template) if field]
+
+def layout_params(spec, overrides=None):
+    """
+    The spec's default params updated with overrides (e.g. tenant branding)
+    String values have braces escaped so a tenant title can't add slots
+    """
+    params = dict(spec.get('params', {}))
+    params.update(overrides or {})
+    return _LayoutParams({key: value.replace('{', '{{').replace('}', '}}') if isinstance(value, str) else value
+                          for key, value in params.items()})
+
+def compile_layout(spec, overrides=None):
+    """
+    Compile a layout spec into a DisplayList
+    Text and image paths may use the spec's params ({title}, {price}, {logo}, ...),
+    which are filled here from spec['params'] and overrides; overrides['colors']
+    replaces named colors. Primitives are plain tuples:
+      ('rect', x0, y0, x1, y1, fill, stroke, stroke_width, stroke_align)
+          stroke_align 'inside' keeps the stroke in the box, 'center' centers it on the edge
+      ('ellipse', x0, y0, x1, y1, fill)
+      ('image', path, x0, y0, x1, y1, resample)
+      ('text', x, y, text, font, fill, anchor, baseline, box)
+          anchor is 'start' or 'middle'; baseline None puts y at the vertical center,
+          'top' at the top of the text and a number n puts the baseline n * size below y;
+          with a box the text's ink is centered in it instead (PIL) or around its center
+    An image element's "placeholder" elements are compiled in its place when the
+    file is missing, and an element with "front": true goes into the front list
+    """
+    overrides = dict(overrides or {})
+    colors = dict(spec.get('colors', {}), **overrides.pop('colors', {}))
+    params = layout_params(spec, overrides)
+    color = lambda value: parse_color(value, colors)
+    fonts = {name: parse_font(font) for name, font in spec['fonts'].items()}
+    static = []
+    variable = []
+    front = []
+    
+    def add_text(layer, x, y, text, font, fill, anchor='start', baseline=None, box=None):
+        text = fill_params(text, params)
+        op = ('text', x, y, text, font, color(fill), anchor, baseline, box)
+        (variable if text_fields(text) else layer).append(op)
+    
+    def add_element(element, layer):
+        kind = element['type']
+        if kind == 'rect':
+            layer.append(('rect', *element['box'], color(element.get('fill')), color(element.get('stroke')),
+                          element.get('stroke_width', 0), element.get('stroke_align', 'inside')))
+        elif kind == 'ellipse':
+            layer.append(('ellipse', *element['box'], color(element['fill'])))
+        elif kind == 'image':
+            path = fill_params(element['src'], params).format()
+            if os.path.exists(path) or 'placeholder' not in element:
+                layer.append(('image', path, *element['box'], element.get('resample', 'lanczos')))
+            else:
+                for placeholder in element['placeholder']:
+                    add_element(placeholder, layer)
+        elif kind == 'text':
+            if 'box' in element:
+                x0, y0, x1, y1 = element['box']
+                add_text(layer, (x0 + x1) / 2, (y0 + y1) / 2, element['text'], element['font'],
+                         element['fill'], 'middle', box=tuple(element['box']))
+            else:
+                add_text(layer, *element['at'], element['text'], element['font'], element['fill'],
+                         element.get('anchor', 'start'), element.get('baseline'))
+        elif kind == 'letter_row':
+            x0, y0, x1, y1 = element['box']
+            letters = element['letters']
+            cell_width = (x1 - x0) / len(letters)
+            inset_x, inset_y = _pair(element.get('inset', 0))
+            for i, letter in enumerate(letters):
+                left = x0 + i * cell_width
+                layer.append(('ellipse', left + inset_x, y0 + inset_y, left + cell_width - inset_x, y1 - inset_y,
+                              color(element['colors'][i])))
+                box = (left, y0 + inset_y, left + cell_width, y1 - inset_y) if element.get('text_box') else None
+                add_text(layer, left + cell_width / 2, (y0 + y1) / 2, letter, element['font'], element['fill'],
+                         'middle', element.get('baseline'), box)
+        elif kind == 'number_grid':
+            compile_number_grid(element, color, layer, lambda *args: add_text(layer, *args))
+        else:
+            raise ValueError(f"Unknown layout element: {kind}")
+    
+    for element in spec['elements']:
+        add_element(element, front if element.get('front') else static)
+    
+    return DisplayList(spec.get('name', 'card'), spec['size'], fonts, static, variable, front)
+
+def compile_number_grid(element, color, static, add_text):
+    """
+    Expand a 5x5 number grid into cell rects, the FREE cell and 24 number slots
+    Cells are spaced evenly over the box; "cell_size" draws each cell at a
+    different size from that pitch, e.g. one pixel wider so neighbours overlap
+    """
+    x0, y0, x1, y1 = element['box']
+    cell_width = (x1 - x0) / 5
+    cell_height = (y1 - y0) / 5
+    rect_width, rect_height = element.get('cell_size', (cell_width, cell_height))
+    free = element['free']
+    stroke = element.get('stroke')
+    stroke_width = element.get('stroke_width', 0)
+    stroke_align = element.get('stroke_align', 'inside')
+    baseline = element.get('baseline')
+    
+    for row in range(5):
+        for col in range(5):
+            left = x0 + col * cell_width
+            top = y0 + row * cell_height
+            center = (left + cell_width / 2, top + cell_height / 2)
+            box = (left, top, left + cell_width, top + cell_height) if element.get('text_box') else None
+            if row == 2 and col == 2:
+                static.append(('rect', left, top, left + rect_width, top + rect_height,
+                               color(free['fill']), color(stroke), stroke_width, stroke_align))
+                add_text(*center, free['text'], free['font'], free['text_fill'], 'middle', baseline, box)
+            else:
+                static.append(('rect', left, top, left + rect_width, top + rect_height,
+                               color(element.get('fill')), color(stroke), stroke_width, stroke_align))
+                add_text(*center, f"{{cell_{row}_{col}}}", element['font'], element['text_fill'], 'middle',
+                         baseline, box)
+
+def card_values(card_data):
+    """Slot values for one card: card_number plus cell_R_C for the 24 numbered cells"""
+    values = {'card_number': card_data['card_number']}
+    for col, letter in enumerate('bingo'):
+        numbers = card_data[f'{letter}_column']
+        for row in range(5):
+            if col == 2:
+                if row == 2:
+                    continue
+                values[f'cell_{row}_{col}'] = numbers[row if row < 2 else row - 1]
+            else:
+                values[f'cell_{row}_{col}'] = numbers[row]
+    return values
+
+def _file_sha256(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def template_key(display_list, scale=1.0):
+    """
+    Content hash of a display list's static layer at one scale
+    Covers the static ops, the bytes of every image they draw and this module's
+    code, so two tenants with the same branding share one rendered template and
+    a changed logo or renderer gets a new one
+    """
+    content = {
+        'size': [display_list.width, display_list.height],
+        'fonts': display_list.fonts,
+        'static': display_list.static,
+        'front': display_list.front,
+        'images': [_file_sha256(op[1]) for op in display_list.static + display_list.front if op[0] == 'image'],
+        'renderer': _file_sha256(__file__),
+        'scale': scale,
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()[:16]
+
+def load_pil_font(font, scale=1.0):
+    """A parsed spec font at one scale, falling back to Pillow's built-in font"""
+    size = max(1, round(font['size'] * scale))
+    for name in font.get('pil', PIL_FONTS[font['bold'], font['italic']]):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    if 'pil_fallback_size' in font:
+        size = max(1, round(font['pil_fallback_size'] * scale))
+    return ImageFont.load_default(size)
+
+def pdf_font(font):
+    return font.get('pdf', PDF_FONTS[font['bold'], font['italic']])
+
+def baseline_offset(size, baseline):
+    """How far below a text op's y its baseline sits, for the PDF and SVG backends"""
+    if baseline is None:
+        return size * BASELINE_SHIFT
+    if baseline == 'top':
+        return size * TOP_SHIFT
+    return size * baseline
+
+def pil_anchor(anchor, baseline):
+    """The PIL text anchor for a text op without a box"""
+    vertical = 'm' if baseline is None else 'a' if baseline == 'top' else 's'
+    return ('m' if anchor == 'middle' else 'l') + vertical
+
+def pil_color(rgb):
+    return tuple(round(c) for c in rgb) if rgb else rgb
+
+class PILRenderer:
+    """
+    Raster backend: the static layer is drawn once, each card copies it and adds its text
+    The static layer is shared through template_key(): renderers with identical
+    branding reuse it in-process, and with cache_dir it is also kept on disk as
+    <key>.png so later runs skip the static drawing entirely
+    """
+    
+    def __init__(self, display_list, scale=1.0, cache_dir=None):
+        self.display_list = display_list
+        self.scale = scale
+        self.fonts = {name: load_pil_font(font, scale) for name, font in display_list.fonts.items()}
+        self.key = template_key(display_list, scale)
+        self.base = self._template(cache_dir)
+    
+    def _template(self, cache_dir):
+        base = _templates.get(self.key)
+        if base is not None:
+            return base
+        
+        path = None
+        if cache_dir:
+            ensure_cache_dir(cache_dir)
+            path = os.path.join(cache_dir, f"{self.key}.png")
+        if path and os.path.exists(path):
+            with Image.open(path) as cached:
+                base = cached.convert('RGB')
+        else:
+            d = self.display_list
+            base = Image.new('RGB', (round(d.width * self.scale), round(d.height * self.scale)), (255, 255, 255))
+            self._replay(ImageDraw.Draw(base), base, d.static, {})
+            if path:
+                base.save(path + '.part', 'PNG')
+                os.replace(path + '.part', path)
+        
+        _templates[self.key] = base
+        return base
+    
+    def render(self, card_data):
+        img = self.base.copy()
+        draw = ImageDraw.Draw(img)
+        self._replay(draw, img, self.display_list.variable, card_values(card_data))
+        self._replay(draw, img, self.display_list.front, {})
+        return img
+    
+    def _replay(self, draw, img, ops, values):
+        s = self.scale
+        for op in ops:
+            kind = op[0]
+            if kind == 'rect':
+                _, x0, y0, x1, y1, fill, stroke, width, align = op
+                box = [round(x0 * s), round(y0 * s), round(x1 * s) - 1, round(y1 * s) - 1]
+                line_width = max(1, round(width * s)) if width else 0
+                if align == 'center' and stroke and width:
+                    # PIL strokes inside the box, so grow it by half the line width
+                    grow = line_width // 2
+                    draw.rectangle(box, fill=pil_color(fill))
+                    draw.rectangle([box[0] - grow, box[1] - grow, box[2] + grow, box[3] + grow],
+                                   outline=pil_color(stroke), width=line_width)
+                else:
+                    draw.rectangle(box, fill=pil_color(fill), outline=pil_color(stroke) if width else None,
+                                   width=line_width)
+            elif kind == 'ellipse':
+                _, x0, y0, x1, y1, fill = op
+                draw.ellipse([round(x0 * s), round(y0 * s), round(x1 * s), round(y1 * s)], fill=pil_color(fill))
+            elif kind == 'image':
+                _, path, x0, y0, x1, y1, resample = op
+                if os.path.exists(path):
+                    with Image.open(path) as source:
+                        size = (round((x1 - x0) * s), round((y1 - y0) * s))
+                        alpha = source.mode in ('RGBA', 'LA', 'PA') or 'transparency' in source.info
+                        picture = source.convert('RGBA' if alpha else 'RGB').resize(size, RESAMPLE[resample])
+                        img.paste(picture, (round(x0 * s), round(y0 * s)), picture if alpha else None)
+            elif kind == 'text':
+                _, x, y, text, font, fill, anchor, baseline, box = op
+                text = text.format(**values)
+                if box:
+                    # Center the ink box, as ImageDraw.textbbox measures it, on whole pixels
+                    x0, y0, x1, y1 = [round(v * s) for v in box]
+                    left, top, right, bottom = draw.textbbox((0, 0), text, font=self.fonts[font])
+                    draw.text((x0 + (x1 - x0 - (right - left)) // 2, y0 + (y1 - y0 - (bottom - top)) // 2),
+                              text, fill=pil_color(fill), font=self.fonts[font])
+                else:
+                    draw.text((x * s, y * s), text, fill=pil_color(fill), font=self.fonts[font],
+                              anchor=pil_anchor(anchor, baseline))
+
+class PDFRenderer:
+    """
+    reportlab backend: the static layer is one form XObject shared by every card
+    The form is named after template_key(), so several brandings can share a
+    canvas and identical ones are only embedded once
+    """
+    
+    def __init__(self, display_list, scale=1.0):
+        self.display_list = display_list
+        self.scale = scale
+        self.width = display_list.width * scale
+        self.height = display_list.height * scale
+        self.form_name = f"card_layout_{template_key(display_list, scale)}"
+    
+    def draw_card(self, canv, card_data, x=0, y=0):
+        """Draw one card with its bottom-left corner at (x, y)"""
+        canv.saveState()
+        canv.translate(x, y)
+        self.draw_static(canv)
+        self.draw_variable(canv, card_data)
+        canv.restoreState()
+    
+    def draw_static(self, canv):
+        """The shared artwork at the current origin"""
+        self._draw_form(canv, self.form_name, self.display_list.static)
+    
+    def draw_variable(self, canv, card_data):
+        """One card's text at the current origin, then any front artwork over it"""
+        self._replay(canv, self.display_list.variable, card_values(card_data))
+        if self.display_list.front:
+            self._draw_form(canv, f"{self.form_name}_front", self.display_list.front)
+    
+    def _draw_form(self, canv, name, ops):
+        if not canv.hasForm(name):
+            canv.beginForm(name, 0, 0, self.width, self.height)
+            self._replay(canv, ops, {})
+            canv.endForm()
+        canv.doForm(name)
+    
+    def render_deck(self, cards, path):
+        """One page per card"""
+        canv = canvas.Canvas(path, pagesize=(self.width, self.height))
+        for card in cards:
+            self.draw_card(canv, card)
+            canv.showPage()
+        canv.save()
+    
+    def _replay(self, canv, ops, values):
+        s = self.scale
+        top = self.height
+        for op in ops:
+            kind = op[0]
+            if kind == 'rect':
+                _, x0, y0, x1, y1, fill, stroke, width, align = op
+                if align == 'center' and stroke and width:
+                    # Fill and stroke in one path, like a flowable's canv.rect(..., fill=1, stroke=1)
+                    if fill:
+                        canv.setFillColorRGB(*[c / 255 for c in fill])
+                    canv.setStrokeColorRGB(*[c / 255 for c in stroke])
+                    canv.setLineWidth(width * s)
+                    canv.rect(x0 * s, top - y1 * s, (x1 - x0) * s, (y1 - y0) * s, fill=1 if fill else 0, stroke=1)
+                else:
+                    if fill:
+                        canv.setFillColorRGB(*[c / 255 for c in fill])
+                        canv.rect(x0 * s, top - y1 * s, (x1 - x0) * s, (y1 - y0) * s, fill=1, stroke=0)
+                    if stroke and width:
+                        # Inset by half the line width so the stroke stays inside the box
+                        inset = width * s / 2
+                        canv.setStrokeColorRGB(*[c / 255 for c in stroke])
+                        canv.setLineWidth(width * s)
+                        canv.rect(x0 * s + inset, top - y1 * s + inset, (x1 - x0) * s - 2 * inset,
+                                  (y1 - y0) * s - 2 * inset, fill=0, stroke=1)
+            elif kind == 'ellipse':
+                _, x0, y0, x1, y1, fill = op
+                canv.setFillColorRGB(*[c / 255 for c in fill])
+                canv.ellipse(x0 * s, top - y1 * s, x1 * s, top - y0 * s, fill=1, stroke=0)
+            elif kind == 'image':
+                _, path, x0, y0, x1, y1, _ = op
+                if os.path.exists(path):
+                    canv.drawImage(path, x0 * s, top - y1 * s, width=(x1 - x0) * s, height=(y1 - y0) * s,
+                                   mask='auto')
+            elif kind == 'text':
+                _, x, y, text, font, fill, anchor, baseline, box = op
+                font = self.display_list.fonts[font]
+                size = font['size']
+                canv.setFillColorRGB(*[c / 255 for c in fill])
+                canv.setFont(pdf_font(font), size * s)
+                baseline = top - (y + baseline_offset(size, None if box else baseline)) * s
+                if anchor == 'middle':
+                    canv.drawCentredString(x * s, baseline, text.format(**values))
+                else:
+                    canv.drawString(x * s, baseline, text.format(**values))
+
+class SVGRenderer:
+    """
+    SVG backend: static layer as a <symbol>, each card a <use> plus its text nodes
+    Front artwork is a second symbol, used after the text
+    """
+    
+    def __init__(self, display_list, symbol_id='card'):
+        self.display_list = display_list
+        self.symbol_id = symbol_id
+    
+    def symbol(self):
+        """<defs> holding the static artwork"""
+        d = self.display_list
+        parts = [f'<defs><symbol id="{svg_attr(self.symbol_id)}" viewBox="0 0 {d.width} {d.height}">']
+        parts.extend(self._replay(d.static, {}))
+        parts.append('</symbol>')
+        if d.front:
+            parts.append(f'<symbol id="{svg_attr(self.symbol_id)}_front" viewBox="0 0 {d.width} {d.height}">')
+            parts.extend(self._replay(d.front, {}))
+            parts.append('</symbol>')
+        parts.append('</defs>')
+        return ''.join(parts)
+    
+    def card_body(self, card_data, x=0, y=0, element_id=None):
+        """One card: a <use> of the symbol plus its variable text"""
+        d = self.display_list
+        attrs = f' id="{svg_attr(element_id)}"' if element_id else ''
+        if x or y:
+            attrs += f' transform="translate({x:g} {y:g})"'
+        parts = [f'<g{attrs}>', f'<use xlink:href="#{svg_attr(self.symbol_id)}" width="{d.width}" height="{d.height}"/>']
+        parts.extend(self._replay(d.variable, card_values(card_data)))
+        if d.front:
+            parts.append(f'<use xlink:href="#{svg_attr(self.symbol_id)}_front" width="{d.width}" height="{d.height}"/>')
+        parts.append('</g>')
+        return ''.join(parts)
+    
+    def _replay(self, ops, values):
+        text_style = None
+        for op in ops:
+            kind = op[0]
+            # Runs of text with the same font and color share one <g> holding those attributes
+            style = (op[4], op[5]) if kind == 'text' else None
+            if style != text_style:
+                if text_style:
+                    yield '</g>'
+                if style:
+                    font = self.display_list.fonts[style[0]]
+                    weight = ' font-weight="bold"' if font['bold'] else ''
+                    slant = ' font-style="italic"' if font['italic'] else ''
+                    yield f'<g font-size="{font["size"]}"{weight}{slant} fill="{svg_color(style[1])}">'
+                text_style = style
+            
+            if kind == 'rect':
+                _, x0, y0, x1, y1, fill, stroke, width, align = op
+                fill_attr = svg_color(fill) if fill else 'none'
+                if stroke and width and align == 'center':
+                    yield (f'<rect x="{x0:g}" y="{y0:g}" width="{x1 - x0:g}" height="{y1 - y0:g}" '
+                           f'fill="{fill_attr}" stroke="{svg_color(stroke)}" stroke-width="{width:g}"/>')
+                elif stroke and width:
+                    inset = width / 2
+                    yield (f'<rect x="{x0 + inset:g}" y="{y0 + inset:g}" width="{x1 - x0 - width:g}" '
+                           f'height="{y1 - y0 - width:g}" fill="{fill_attr}" stroke="{svg_color(stroke)}" '
+                           f'stroke-width="{width:g}"/>')
+                else:
+                    yield f'<rect x="{x0:g}" y="{y0:g}" width="{x1 - x0:g}" height="{y1 - y0:g}" fill="{fill_attr}"/>'
+            elif kind == 'ellipse':
+                _, x0, y0, x1, y1, fill = op
+                yield (f'<ellipse cx="{(x0 + x1) / 2:g}" cy="{(y0 + y1) / 2:g}" rx="{(x1 - x0) / 2:g}" '
+                       f'ry="{(y1 - y0) / 2:g}" fill="{svg_color(fill)}"/>')
+            elif kind == 'image':
+                _, path, x0, y0, x1, y1, _ = op
+                uri = image_data_uri(path, round((x1 - x0) * 1.5), round((y1 - y0) * 1.5))
+                if uri:
+                    yield f'<image x="{x0:g}" y="{y0:g}" width="{x1 - x0:g}" height="{y1 - y0:g}" xlink:href="{svg_attr(uri)}"/>'
+            elif kind == 'text':
+                _, x, y, text, font, fill, anchor, baseline, box = op
+                size = self.display_list.fonts[font]['size']
+                # text-anchor on every node: some renderers don't inherit it from a group
+                anchor_attr = ' text-anchor="middle"' if anchor == 'middle' else ''
+                shift = baseline_offset(size, None if box else baseline)
+                yield (f'<text x="{x:g}" y="{y + round(shift):g}"{anchor_attr}>'
+                       f'{escape(text.format(**values))}</text>')
+        if text_style:
+            yield '</g>'
+
+def svg_attr(value):
+    """A value escaped for a double-quoted XML attribute"""
+    return escape(str(value), {'"': '&quot;'})
+
+def svg_color(rgb):
+    return '#%02x%02x%02x' % pil_color(rgb)
+
+def image_data_uri(path, width, height):
+    """An image file as an embedded JPEG at the given pixel size, or None if missing"""
+    if not os.path.exists(path):
+        return None
+    with Image.open(path) as source:
+        buffer = io.BytesIO()
+        source.convert('RGB').resize((width, height), Image.Resampling.LANCZOS).save(buffer, 'JPEG', quality=80)
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode('ascii')
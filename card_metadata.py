@@ -0,0 +1,179 @@
+"""
+Card number and data digest embedded in rendered card files
+PDFs carry it in the document info, JPEGs in a COM segment and PNGs in a tEXt chunk,
+so a file can be checked against the bingo_cards rows by reading only its header.
+An optional dot code prints the same data on the card itself
+"""
+
+import re
+import struct
+
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+import fitz  # PyMuPDF
+
+from render_jobs import card_digest
+
+METADATA_KEY = 'BingoCard'
+METADATA_VERSION = 1
+METADATA_PATTERN = re.compile(r'bingo-card:v(\d+) card_number=(\d+) digest=([0-9a-f]{16})')
+
+# Dot code: 2 rows x 30 columns of square modules. Column 0 is solid (start),
+# column 29 is black over white (orientation), 56 data bits fill the rest:
+# 16 bits card number, the first 32 bits of the digest, an 8-bit checksum
+DOT_CODE_COLUMNS = 30
+DOT_CODE_ROWS = 2
+DOT_CODE_MAX_NUMBER = 0xffff
+
+def metadata_text(card_data):
+    """The string stored in every format"""
+    return f"bingo-card:v{METADATA_VERSION} card_number={card_data['card_number']} digest={card_digest(card_data)}"
+
+def parse_metadata_text(text):
+    """(card_number, digest) from a metadata string, or None"""
+    match = METADATA_PATTERN.search(text or '')
+    if not match:
+        return None
+    return int(match.group(2)), match.group(3)
+
+def pdf_document_info(card_data):
+    """Keyword arguments for SimpleDocTemplate (or canvas setters) carrying the digest"""
+    return {
+        'title': f"Bingo card {card_data['card_number']:03d}",
+        'subject': metadata_text(card_data),
+        'keywords': [METADATA_KEY, f"card_number={card_data['card_number']}", f"digest={card_digest(card_data)}"],
+    }
+
+def set_pdf_document_info(canv, card_data):
+    """Apply pdf_document_info() to a reportlab canvas"""
+    info = pdf_document_info(card_data)
+    canv.setTitle(info['title'])
+    canv.setSubject(info['subject'])
+    canv.setKeywords(info['keywords'])
+
+def image_save_options(card_data, fmt):
+    """Extra Image.save() options that embed the digest for PNG or JPEG"""
+    text = metadata_text(card_data)
+    if fmt.upper() == 'PNG':
+        info = PngInfo()
+        info.add_text(METADATA_KEY, text)
+        return {'pnginfo': info}
+    if fmt.upper() in ('JPEG', 'JPG'):
+        return {'comment': text.encode('ascii')}
+    return {}
+
+def save_card_image(img, path, card_data, fmt, **options):
+    """Image.save() with the card's metadata embedded"""
+    img.save(path, fmt, **options, **image_save_options(card_data, fmt))
+
+def read_jpeg_comment(path):
+    """The first COM segment of a JPEG, reading markers only up to the image data"""
+    with open(path, 'rb') as f:
+        if f.read(2) != b'\xff\xd8':
+            return None
+        while True:
+            marker = f.read(2)
+            if len(marker) < 2 or marker[0] != 0xff:
+                return None
+            # Start of scan: entropy-coded data follows, no more headers
+            if marker[1] == 0xda:
+                return None
+            length = struct.unpack('>H', f.read(2))[0]
+            if marker[1] == 0xfe:
+                return f.read(length - 2).decode('latin-1')
+            f.seek(length - 2, 1)
+
+def read_png_text(path, key=METADATA_KEY):
+    """A tEXt chunk from a PNG, reading chunk headers only up to the first IDAT"""
+    with open(path, 'rb') as f:
+        if f.read(8) != b'\x89PNG\r\n\x1a\n':
+            return None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            length, chunk_type = struct.unpack('>I4s', header)
+            if chunk_type in (b'IDAT', b'IEND'):
+                return None
+            if chunk_type == b'tEXt':
+                name, _, text = f.read(length).partition(b'\0')
+                if name.decode('latin-1') == key:
+                    return text.decode('latin-1')
+                f.seek(4, 1)
+            else:
+                f.seek(length + 4, 1)
+
+def read_pdf_subject(path):
+    """The PDF Subject, read from the trailer and info object without loading pages"""
+    with fitz.open(path) as doc:
+        return (doc.metadata or {}).get('subject')
+
+def read_card_metadata(path):
+    """(card_number, digest) embedded in a card file, or None if it has none"""
+    extension = path.lower().rsplit('.', 1)[-1]
+    if extension == 'pdf':
+        text = read_pdf_subject(path)
+    elif extension in ('jpg', 'jpeg'):
+        text = read_jpeg_comment(path)
+    elif extension == 'png':
+        text = read_png_text(path)
+    else:
+        return None
+    return parse_metadata_text(text)
+
+def dot_code_bits(card_data):
+    """The 56 data bits: card number, digest prefix and checksum"""
+    number = card_data['card_number']
+    if not 0 <= number <= DOT_CODE_MAX_NUMBER:
+        raise ValueError(f"Card number {number} doesn't fit the dot code (0-{DOT_CODE_MAX_NUMBER})")
+    payload = struct.pack('>H', number) + bytes.fromhex(card_digest(card_data)[:8])
+    payload += bytes([sum(payload) & 0xff])
+    return [(byte >> (7 - bit)) & 1 for byte in payload for bit in range(8)]
+
+def dot_code_modules(card_data):
+    """(row, column) of every black module"""
+    bits = iter(dot_code_bits(card_data))
+    modules = [(row, 0) for row in range(DOT_CODE_ROWS)] + [(0, DOT_CODE_COLUMNS - 1)]
+    for col in range(1, DOT_CODE_COLUMNS - 1):
+        for row in range(DOT_CODE_ROWS):
+            if next(bits):
+                modules.append((row, col))
+    return modules
+
+def dot_code_size(module):
+    return DOT_CODE_COLUMNS * module, DOT_CODE_ROWS * module
+
+def draw_pdf_dot_code(canv, x, y, module, card_data):
+    """Draw the dot code on a reportlab canvas, bottom-left at (x, y)"""
+    canv.saveState()
+    canv.setFillColorRGB(0, 0, 0)
+    top = y + DOT_CODE_ROWS * module
+    for row, col in dot_code_modules(card_data):
+        canv.rect(x + col * module, top - (row + 1) * module, module, module, fill=1, stroke=0)
+    canv.restoreState()
+
+def read_dot_code(img, x, y, module):
+    """
+    Decode a dot code from an image whose top-left corner and module size are known
+    (e.g. a rendered card or an aligned scan). Returns (card_number, digest prefix) or None
+    """
+    gray = img.convert('L')
+    dark = lambda row, col: gray.getpixel((int(x + (col + 0.5) * module), int(y + (row + 0.5) * module))) < 128
+    if not (dark(0, 0) and dark(1, 0) and dark(0, DOT_CODE_COLUMNS - 1) and not dark(1, DOT_CODE_COLUMNS - 1)):
+        return None
+    bits = [dark(row, col) for col in range(1, DOT_CODE_COLUMNS - 1) for row in range(DOT_CODE_ROWS)]
+    payload = bytes(sum(bit << (7 - i) for i, bit in enumerate(bits[start:start + 8])) for start in range(0, 56, 8))
+    if sum(payload[:6]) & 0xff != payload[6]:
+        return None
+    return struct.unpack('>H', payload[:2])[0], payload[2:6].hex()
+
+def read_pdf_dot_code(path, x, y, module, pixels_per_module=8):
+    """Decode the dot code draw_pdf_dot_code() put at (x, y) on a PDF's first page"""
+    width, height = dot_code_size(module)
+    zoom = pixels_per_module / module
+    with fitz.open(path) as doc:
+        page = doc[0]
+        top = page.rect.height - y - height
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=fitz.Rect(x, top, x + width, top + height))
+    img = Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+    return read_dot_code(img, 0, 0, pixels_per_module)
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Golden-image regression check for the card renderers
+Renders a fixed synthetic deck, compares every card to its stored golden image with
+NumPy (tile differences, SSIM-like score, changed-area bounding box) and writes heatmaps.
+A small golden set is committed under benchmarks/golden; a card without a golden
+fails the check, and --update only re-records goldens that already exist
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+import importlib
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from PIL import Image, ImageDraw
+import fitz  # PyMuPDF
+
+from pdf_raster import render_page_to_size
+from render_jobs import ensure_cache_dir
+
+png_cards = importlib.import_module('generate-png-cards')
+jpg_cards = importlib.import_module('generate-printable-jpg-cards')
+printable_cards = importlib.import_module('generate-printable-cards')
+redesigned_cards = importlib.import_module('generate-redesigned-cards')
+sample_cards = importlib.import_module('generate-sample-jpg-cards')
+thermal_cards = importlib.import_module('print-thermal-cards')
+
+GOLDEN_DIR = "benchmarks/golden"
+REPORT_DIR = "benchmarks/golden_report"
+# The committed golden set: the first few synthetic cards of every output
+DEFAULT_CARDS = 4
+OUTPUTS = ['png', 'jpg', 'pdf', 'redesigned', 'thermal']
+DEFAULT_OUTPUTS = OUTPUTS
+
+# A pixel counts as changed when any channel moves by more than TOLERANCE
+TOLERANCE = 8
+# Tiles of TILE x TILE pixels summarize where a card changed
+TILE = 30
+# Window size and constants of the SSIM-like score
+SSIM_WINDOW = 8
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+_thermal = None
+
+def render_card(output, card_data):
+    """
+    One card from the given renderer as a PIL image
+    The 300 dpi JPG card is compared at a third of its size and the PDFs at 600px
+    wide, which still shows a one-point shift but keeps 1,000 cards fast
+    """
+    global _thermal
+    if output == 'png':
+        return png_cards.render_png_bingo_card(card_data)
+    if output == 'jpg':
+        return jpg_cards.create_jpg_bingo_card(card_data).reduce(3)
+    if output in ('pdf', 'redesigned'):
+        module = printable_cards if output == 'pdf' else redesigned_cards
+        # The scratch PDF is removed even when rendering fails
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "card.pdf")
+            with contextlib.redirect_stdout(io.StringIO()):
+                module.create_redesigned_bingo_card(card_data, path)
+            with fitz.open(path) as doc:
+                page = doc[0]
+                return render_page_to_size(page, 600, round(600 * page.rect.height / page.rect.width))
+    if _thermal is None:
+        _thermal = thermal_cards.thermal_renderer('80')
+    bits = _thermal.render(card_data)
+    return Image.fromarray(np.where(bits, 0, 255).astype(np.uint8), 'L')
+
+def pixel_hash(img):
+    """Hash of the decoded pixels, so identical renders skip the diff entirely"""
+    header = f"{img.mode}:{img.width}x{img.height}:".encode()
+    return hashlib.sha256(header + img.tobytes()).hexdigest()
+
+def box_mean(values, size):
+    """Mean over every size x size window, via a summed-area table (valid windows only)"""
+    table = np.pad(values, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    sums = table[size:, size:] - table[:-size, size:] - table[size:, :-size] + table[:-size, :-size]
+    return sums / (size * size)
+
+def ssim_score(golden_gray, actual_gray):
+    """Mean and worst-window structural similarity on grayscale (1.0 = identical)"""
+    x = golden_gray.astype(np.float64)
+    y = actual_gray.astype(np.float64)
+    mu_x = box_mean(x, SSIM_WINDOW)
+    mu_y = box_mean(y, SSIM_WINDOW)
+    var_x = box_mean(x * x, SSIM_WINDOW) - mu_x * mu_x
+    var_y = box_mean(y * y, SSIM_WINDOW) - mu_y * mu_y
+    cov = box_mean(x * y, SSIM_WINDOW) - mu_x * mu_y
+    ssim_map = (((2 * mu_x * mu_y + SSIM_C1) * (2 * cov + SSIM_C2))
+                / ((mu_x * mu_x + mu_y * mu_y + SSIM_C1) * (var_x + var_y + SSIM_C2)))
+    return float(ssim_map.mean()), float(ssim_map.min())
+
+def compare_images(golden, actual, tolerance=TOLERANCE):
+    """Difference metrics plus the per-pixel difference map (max over channels)"""
+    a = np.asarray(golden, dtype=np.int16)
+    b = np.asarray(actual, dtype=np.int16)
+    diff = np.abs(a - b)
+    if diff.ndim == 3:
+        diff = diff.max(axis=2)
+    changed = diff > tolerance
+    
+    rows = np.flatnonzero(changed.any(axis=1))
+    cols = np.flatnonzero(changed.any(axis=0))
+    bbox = [int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1] if len(rows) else None
+    
+    # Pad to whole tiles, then reduce each tile to its max and mean difference
+    height, width = diff.shape
+    padded = np.pad(diff, ((0, -height % TILE), (0, -width % TILE)))
+    tiles = padded.reshape(padded.shape[0] // TILE, TILE, padded.shape[1] // TILE, TILE)
+    tile_max = tiles.max(axis=(1, 3))
+    tile_mean = tiles.mean(axis=(1, 3))
+    worst = np.unravel_index(tile_mean.argmax(), tile_mean.shape)
+    
+    ssim_mean, ssim_min = ssim_score(np.asarray(golden.convert('L')), np.asarray(actual.convert('L')))
+    metrics = {
+        'changed_pixels': int(changed.sum()),
+        'max_diff': int(diff.max()),
+        'mean_diff': round(float(diff.mean()), 4),
+        'changed_tiles': int((tile_max > tolerance).sum()),
+        'total_tiles': int(tile_max.size),
+        'worst_tile': [int(worst[1]) * TILE, int(worst[0]) * TILE, TILE, TILE],
+        'bbox': bbox,
+        'ssim': round(ssim_mean, 5),
+        'ssim_min': round(ssim_min, 5),
+    }
+    return metrics, diff
+
+def heatmap(golden, actual, diff, bbox):
+    """Golden, actual and a heatmap (changes in red over the dimmed golden) side by side"""
+    base = np.asarray(golden.convert('L'), dtype=np.float32) * 0.35 + 150
+    strength = np.clip(diff.astype(np.float32) * 4, 0, 255) / 255
+    overlay = np.empty(diff.shape + (3,), dtype=np.float32)
+    overlay[..., 0] = base + (255 - base) * strength
+    overlay[..., 1] = base * (1 - strength)
+    overlay[..., 2] = base * (1 - strength)
+    heat = Image.fromarray(overlay.astype(np.uint8), 'RGB')
+    if bbox:
+        ImageDraw.Draw(heat).rectangle([bbox[0], bbox[1], bbox[2] - 1, bbox[3] - 1], outline=(0, 0, 255), width=2)
+    
+    sheet = Image.new('RGB', (golden.width * 3, golden.height), (255, 255, 255))
+    for index, img in enumerate([golden.convert('RGB'), actual.convert('RGB'), heat]):
+        sheet.paste(img, (index * golden.width, 0))
+    return sheet
+
+def golden_path(golden_dir, output, card_number):
+    return os.path.join(golden_dir, output, f"card_{card_number:04d}.png")
+
+def check_card(job):
+    """
+    Worker: render one card and compare it with its golden
+    Returns a result dict; failing cards get a heatmap in the report directory
+    """
+    output, card, expected_hash, golden_dir, report_dir, update, add, max_pixels, min_ssim = job
+    number = card['card_number']
+    img = render_card(output, card)
+    digest = pixel_hash(img)
+    result = {'output': output, 'card_number': number, 'hash': digest}
+    
+    if digest == expected_hash:
+        return dict(result, status='ok')
+    
+    path = golden_path(golden_dir, output, number)
+    if expected_hash is None or not os.path.exists(path):
+        # A missing golden is never recorded by --update, only by an explicit --add
+        if not add:
+            return dict(result, status='missing')
+        img.save(path, 'PNG', optimize=True)
+        return dict(result, status='added')
+    if update:
+        img.save(path, 'PNG', optimize=True)
+        return dict(result, status='updated')
+    
+    with Image.open(path) as stored:
+        golden = stored.convert(img.mode)
+    if golden.size != img.size:
+        return dict(result, status='failed', reason=f"size {golden.size} -> {img.size}")
+    
+    metrics, diff = compare_images(golden, img)
+    failed = metrics['changed_pixels'] > max_pixels or metrics['ssim'] < min_ssim
+    result.update(metrics, status='failed' if failed else 'ok')
+    if failed:
+        name = f"{output}_card_{number:04d}.png"
+        heatmap(golden, img, diff, metrics['bbox']).save(os.path.join(report_dir, name), 'PNG')
+        result['heatmap'] = name
+    return result
+
+def load_index(golden_dir, output):
+    path = os.path.join(golden_dir, output, 'index.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_index(golden_dir, output, index):
+    path = os.path.join(golden_dir, output, 'index.json')
+    with open(path + '.tmp', 'w') as f:
+        json.dump(index, f, indent=0, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+def write_report(results, report_dir, summary):
+    """report.json with every failure, and report.html showing their heatmaps"""
+    failures = [result for result in results if result['status'] in ('failed', 'missing')]
+    with open(os.path.join(report_dir, 'report.json'), 'w') as f:
+        json.dump({'summary': summary, 'failures': failures}, f, indent=2)
+    
+    rows = []
+    for result in failures:
+        details = result.get('reason') or (
+            f"{result.get('changed_pixels', '-')} px changed, {result.get('changed_tiles', '-')} tiles, "
+            f"SSIM {result.get('ssim', '-')}, bbox {result.get('bbox')}")
+        image = f'<br><img src="{result["heatmap"]}" width="900">' if result.get('heatmap') else ''
+        rows.append(f"<h3>{result['output']} card {result['card_number']}: {result['status']}</h3>"
+                    f"<p>{details}</p>{image}")
+    with open(os.path.join(report_dir, 'report.html'), 'w') as f:
+        f.write("<html><body><h1>Golden image report</h1>"
+                f"<p>{json.dumps(summary)}</p><p>Golden | actual | changes</p>{''.join(rows)}</body></html>")
+
+def check_golden_images(outputs, count=DEFAULT_CARDS, golden_dir=GOLDEN_DIR, report_dir=REPORT_DIR,
+                        update=False, workers=None, max_pixels=0, min_ssim=0.999, add=False):
+    """
+    Check every output for cards 1..count; returns (results, summary)
+    update re-records the goldens that differ, add records the ones that are missing
+    """
+    cards = [sample_cards.generate_bingo_card_data(n) for n in range(1, count + 1)]
+    # The report is rewritten on every run and never belongs in the repo
+    os.makedirs(report_dir, exist_ok=True)
+    for name in os.listdir(report_dir):
+        os.remove(os.path.join(report_dir, name))
+    ensure_cache_dir(report_dir)
+    
+    start = time.perf_counter()
+    results = []
+    for output in outputs:
+        os.makedirs(os.path.join(golden_dir, output), exist_ok=True)
+        index = load_index(golden_dir, output)
+        jobs = [(output, card, index.get(str(card['card_number'])), golden_dir, report_dir, update,
+                 add, max_pixels, min_ssim) for card in cards]
+        
+        if workers == 1:
+            output_results = list(map(check_card, jobs))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                output_results = list(pool.map(check_card, jobs, chunksize=16))
+        
+        recorded = {str(result['card_number']): result['hash'] for result in output_results
+                    if result['status'] in ('updated', 'added')}
+        if recorded:
+            save_index(golden_dir, output, dict(index, **recorded))
+        results.extend(output_results)
+    
+    summary = {'cards': count, 'outputs': outputs, 'seconds': round(time.perf_counter() - start, 2)}
+    for status in ('ok', 'updated', 'added', 'failed', 'missing'):
+        summary[status] = sum(1 for result in results if result['status'] == status)
+    write_report(results, report_dir, summary)
+    return results, summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare card renders against golden images")
+    parser.add_argument('--outputs', nargs='+', choices=OUTPUTS, default=DEFAULT_OUTPUTS)
+    parser.add_argument('--cards', type=int, default=DEFAULT_CARDS, help="Synthetic deck size")
+    parser.add_argument('--golden-dir', default=GOLDEN_DIR)
+    parser.add_argument('--report-dir', default=REPORT_DIR)
+    parser.add_argument('--update', action='store_true',
+                        help="Re-record the existing goldens that changed (after an intended layout change)")
+    parser.add_argument('--add', action='store_true',
+                        help="Record goldens for cards that have none (a new output or a larger --cards)")
+    parser.add_argument('--workers', type=int, help="Render processes (default: CPU count)")
+    parser.add_argument('--max-pixels', type=int, default=0,
+                        help="Changed pixels allowed per card before it fails")
+    parser.add_argument('--min-ssim', type=float, default=0.999)
+    args = parser.parse_args()
+    
+    results, summary = check_golden_images(args.outputs, args.cards, args.golden_dir, args.report_dir,
+                                           args.update, args.workers, args.max_pixels, args.min_ssim, args.add)
+    
+    print(f"Checked {summary['cards']} cards x {len(args.outputs)} output(s) in {summary['seconds']}s: "
+          f"{summary['ok']} ok, {summary['updated']} updated, {summary['added']} added, "
+          f"{summary['failed']} failed, {summary['missing']} missing")
+    if summary['failed'] or summary['missing']:
+        for result in [result for result in results if result['status'] == 'failed'][:20]:
+            print(f"  ❌ {result['output']} card {result['card_number']}: "
+                  f"{result.get('reason') or str(result['changed_pixels']) + ' px, SSIM ' + str(result['ssim'])}")
+        if summary['missing']:
+            print(f"  {summary['missing']} card(s) have no golden; restore benchmarks/golden "
+                  f"or record new ones with --add")
+        print(f"Report: {os.path.join(args.report_dir, 'report.html')}")
+        sys.exit(1)
+    print("✅ All cards match their goldens")
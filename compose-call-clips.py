@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Build the 75 combined "letter + number" call clips (e.g. "ቢ አስራ ሁለት") from the
+lossless letter and number masters, so a call is one clip with no gap or second decode
+The call clips are written back to the master store as WAV and encoded from there
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from audio_mastering import (DEFAULT_SETTINGS, MASTERS_DIR, decode, encode, find_masters, master_samples,
+                             settings_key, to_pcm)
+from render_jobs import atomic_output, file_sha256
+from voice_synthesis import CALL_CLIP_NAMES
+
+sprite = importlib.import_module('build-audio-sprite')
+
+# Silence between the letter's end and the number's start; negative overlaps them
+SPACING_MS = 60
+# Equal-power fade applied to the letter's tail and the number's head
+CROSSFADE_MS = 30
+# Written into the master store: call clip name -> key it was built from
+CALL_INDEX = ".calls.json"
+
+def column_letter(number):
+    return 'bingo'[(number - 1) // 15]
+
+def compose_call(letter, number, rate, spacing_ms=SPACING_MS, crossfade_ms=CROSSFADE_MS):
+    """
+    Join two int16 sample arrays: the letter fades out, the number fades in, and
+    the number starts spacing_ms after the letter ends (overlapping if negative)
+    """
+    letter = letter.astype(np.float32)
+    number = number.astype(np.float32)
+    fade = min(int(rate * crossfade_ms / 1000), len(letter), len(number))
+    if fade:
+        ramp = np.linspace(0, np.pi / 2, fade, dtype=np.float32)
+        letter[-fade:] *= np.cos(ramp)
+        number[:fade] *= np.sin(ramp)
+    
+    offset = max(0, len(letter) + int(rate * spacing_ms / 1000))
+    combined = np.zeros(max(len(letter), offset + len(number)), dtype=np.float32)
+    combined[:len(letter)] += letter
+    combined[offset:offset + len(number)] += number
+    return np.clip(np.round(combined), -32768, 32767).astype(np.int16)
+
+def mastered_pcm(path, settings):
+    """A master decoded at the sprite rate, trimmed and loudness-normalized, as 16-bit PCM"""
+    samples, rate = decode(path, sprite.SAMPLE_RATE)
+    return to_pcm(master_samples(samples, rate, settings)[0])
+
+def build_call_clip(job):
+    """Worker: compose one call clip and store it as a lossless master"""
+    number, letter_samples, number_samples, rate, output_path, spacing_ms, crossfade_ms = job
+    samples = compose_call(letter_samples, number_samples, rate, spacing_ms, crossfade_ms)
+    encode(samples.astype(np.float32) / 32768, rate, output_path, 'wav')
+    return number, round(len(samples) * 1000 / rate)
+
+def call_key(letter_path, number_path, spacing_ms, crossfade_ms, settings):
+    content = [file_sha256(letter_path), file_sha256(number_path), spacing_ms, crossfade_ms,
+               sprite.SAMPLE_RATE, settings_key(settings)]
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()
+
+def load_call_index(output_dir):
+    try:
+        with open(os.path.join(output_dir, CALL_INDEX)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def compose_call_clips(masters_dir=MASTERS_DIR, spacing_ms=SPACING_MS, crossfade_ms=CROSSFADE_MS,
+                       settings=None, workers=None, force=False):
+    """
+    Write call-<n>.wav for 1-75 into the master store, skipping clips whose
+    letter and number masters and settings haven't changed. Returns (built, skipped, missing)
+    """
+    settings = settings or DEFAULT_SETTINGS
+    paths = find_masters(masters_dir)
+    index = load_call_index(masters_dir)
+    
+    jobs, skipped, missing = [], [], []
+    masters = {}
+    for number in range(1, 76):
+        letter, name = column_letter(number), CALL_CLIP_NAMES[number - 1]
+        if letter not in paths or str(number) not in paths:
+            missing.append(name)
+            continue
+        output_path = os.path.join(masters_dir, f"{name}.wav")
+        key = call_key(paths[letter], paths[str(number)], spacing_ms, crossfade_ms, settings)
+        if not force and index.get(name) == key and os.path.exists(output_path):
+            skipped.append(name)
+            continue
+        # Masters are decoded and mastered here, once each, then shipped to the
+        # workers as sample arrays
+        for master in (letter, str(number)):
+            if master not in masters:
+                masters[master] = mastered_pcm(paths[master], settings)
+        jobs.append((number, masters[letter], masters[str(number)], sprite.SAMPLE_RATE, output_path,
+                     spacing_ms, crossfade_ms))
+        index[name] = key
+    
+    built = []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            built = list(pool.map(build_call_clip, jobs))
+    if os.path.isdir(masters_dir):
+        with atomic_output(os.path.join(masters_dir, CALL_INDEX)) as temp_path:
+            with open(temp_path, 'w') as f:
+                json.dump(index, f, indent=1, sort_keys=True)
+    return built, skipped, missing
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compose the letter + number call clips")
+    parser.add_argument('--masters', default=MASTERS_DIR,
+                        help="Lossless master store holding the letter and number masters")
+    parser.add_argument('--spacing', type=int, default=SPACING_MS,
+                        help="ms of silence between letter and number (negative overlaps them)")
+    parser.add_argument('--crossfade', type=int, default=CROSSFADE_MS, help="Fade length at the join, in ms")
+    parser.add_argument('--target-lufs', type=float, default=DEFAULT_SETTINGS['target_lufs'])
+    parser.add_argument('--workers', type=int, help="Processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="Rebuild every call clip")
+    args = parser.parse_args()
+    
+    settings = dict(DEFAULT_SETTINGS, target_lufs=args.target_lufs)
+    start = time.perf_counter()
+    built, skipped, missing = compose_call_clips(args.masters, args.spacing, args.crossfade, settings,
+                                                 args.workers, args.force)
+    elapsed = time.perf_counter() - start
+    
+    if missing:
+        print(f"⚠️  Missing letter or number master for: {', '.join(missing)}")
+    print(f"✅ Built {len(built)} call clips, {len(skipped)} unchanged, in {elapsed:.2f}s")
+    if built:
+        durations = [duration for _, duration in built]
+        print(f"   Durations {min(durations)}-{max(durations)} ms; "
+              f"run build-audio-sprite.py and encode-voice-pack.py to ship them")
+    if missing and not built and not skipped:
+        sys.exit(1)
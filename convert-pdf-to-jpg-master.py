@@ -6,8 +6,13 @@ Plus create a master PNG file with all 100 cards in 10x10 grid for 1-meter print
 
 import os
 import glob
+import hashlib
+import argparse
 from PIL import Image
-import fitz  # PyMuPDF
+
+from master_poster import open_master_writer
+from pdf_raster import kept_image, rasterize_cards
+from render_jobs import RenderManifest, file_sha256
 
 # Physical dimensions: 15cm x 20cm at 300 DPI for high quality printing
 DPI = 300
@@ -22,46 +27,16 @@ GRID_COLS = 10
 MASTER_WIDTH_PX = CARD_WIDTH_PX * GRID_COLS  # 17720 pixels
 MASTER_HEIGHT_PX = CARD_HEIGHT_PX * GRID_ROWS  # 23620 pixels
 
-def pdf_to_jpg(pdf_path, jpg_path, target_width=CARD_WIDTH_PX, target_height=CARD_HEIGHT_PX):
-    """Convert PDF to JPG with specific dimensions"""
-    try:
-        # Open PDF
-        doc = fitz.open(pdf_path)
-        page = doc[0]  # Get first page
-        
-        # Calculate zoom to get target dimensions
-        page_rect = page.rect
-        zoom_x = target_width / page_rect.width
-        zoom_y = target_height / page_rect.height
-        
-        # Use the smaller zoom to maintain aspect ratio, then crop if needed
-        zoom = min(zoom_x, zoom_y)
-        
-        # Create transformation matrix
-        mat = fitz.Matrix(zoom, zoom)
-        
-        # Render page to pixmap
-        pix = page.get_pixmap(matrix=mat)
-        
-        # Convert to PIL Image
-        img_data = pix.tobytes("ppm")
-        img = Image.open(io.BytesIO(img_data))
-        
-        # Resize to exact target dimensions
-        img = img.resize((target_width, target_height), Image.Resampling.LANCZOS)
-        
-        # Save as JPG
-        img.save(jpg_path, 'JPEG', quality=95, optimize=True)
-        
-        doc.close()
-        return img
-        
-    except Exception as e:
-        print(f"Error converting {pdf_path}: {e}")
-        return None
+def sources_digest(hashes):
+    """One hash over the source PDF hashes of the cards on finished master rows"""
+    return hashlib.sha256(''.join(hashes).encode()).hexdigest()
 
-def convert_pdfs_to_jpgs_and_master():
-    """Convert all PDF cards to JPG and create master PNG"""
+def convert_pdfs_to_jpgs_and_master(master_format='png', compression='deflate', pyramid=False, restart=False):
+    """
+    Convert all PDF cards to JPG and create master PNG (or tiled BigTIFF)
+    Finished JPGs and master bands are logged to a progress manifest, so an
+    interrupted run resumes from the last completed card and band
+    """
     
     # Get all PDF files
     pdf_files = glob.glob("printable_cards/bingo_card_*.pdf")
@@ -73,40 +48,95 @@ def convert_pdfs_to_jpgs_and_master():
     
     print(f"Found {len(pdf_files)} PDF files to convert...")
     
-    # Create master grid image
-    master_img = Image.new('RGB', (MASTER_WIDTH_PX, MASTER_HEIGHT_PX), (255, 255, 255))
+    converted_count = 0
+    master_cards = min(len(pdf_files), GRID_ROWS * GRID_COLS)
+    extension = 'tif' if master_format == 'tiff' else 'png'
+    master_filename = f"printable_cards/master_bingo_cards_1meter.{extension}"
     
-    converted_images = []
+    manifest = RenderManifest("printable_cards/.progress_jpg_master.jsonl",
+                              {'master': master_filename, 'compression': compression, 'pyramid': pyramid},
+                              restart)
+    sources = [file_sha256(pdf_path) for pdf_path in pdf_files]
     
+    # Resume the master only if the cards already on it come from the same PDFs
+    resume = manifest.checkpoint('master', master_filename)
+    if resume and resume['sources'] != sources_digest(sources[:resume['bands'] * GRID_COLS]):
+        resume = None
+    if resume and master_format == 'tiff' and not os.path.exists(master_filename + '.pending'):
+        resume = None
+    bands_done = resume['bands'] if resume else 0
+    if manifest.resumed:
+        print(f"Resuming: {len(manifest.done)} JPGs and {bands_done} master rows already complete")
+    
+    # Each page is rendered once at card size in a worker: the worker writes the JPG
+    # and hands the pixels back only for cards on master rows still to be written
+    jobs = []
+    pending = []
     for i, pdf_path in enumerate(pdf_files):
         # Extract card number from filename
         filename = os.path.basename(pdf_path)
         card_number = filename.replace('bingo_card_', '').replace('.pdf', '')
-        
-        print(f"Converting card {card_number} ({i+1}/{len(pdf_files)})...")
-        
-        # Convert PDF to JPG
         jpg_path = f"printable_cards/bingo_card_{card_number}.jpg"
-        card_img = pdf_to_jpg(pdf_path, jpg_path)
         
-        if card_img:
-            converted_images.append(card_img)
+        jpg_needed = not manifest.is_done(jpg_path, jpg_path, source=sources[i])
+        keep = i < master_cards and i // GRID_COLS >= bands_done
+        if jpg_needed or keep:
+            jobs.append((pdf_path, [(CARD_WIDTH_PX, CARD_HEIGHT_PX, jpg_path if jpg_needed else None, keep)]))
+        pending.append(jpg_path if jpg_needed else None if keep else False)
+    results = rasterize_cards(jobs)
+    
+    def take_result(i):
+        """Result for card i: freshly rendered, or True if nothing had to be done"""
+        nonlocal converted_count
+        if pending[i] is False:
+            converted_count += 1
+            return True
+        result = next(results)
+        print(f"Converted card {i+1}/{len(pdf_files)}...")
+        if result is not None:
+            converted_count += 1
+            if pending[i]:
+                manifest.mark_done(pending[i], pending[i], source=sources[i])
+        return result
+    
+    # Stream the master grid one row of cards at a time
+    print(f"Streaming master {master_format.upper()} file: {master_filename}")
+    
+    with open_master_writer(master_filename, MASTER_WIDTH_PX, MASTER_HEIGHT_PX, dpi=DPI,
+                            tiled=master_format == 'tiff', compression=compression,
+                            pyramid=pyramid, resume=resume) as master:
+        # One reusable band holds the current row of cards
+        band = Image.new('RGB', (MASTER_WIDTH_PX, CARD_HEIGHT_PX), (255, 255, 255))
+        
+        for row_start in range(0, master_cards, GRID_COLS):
+            row_cards = range(row_start, min(row_start + GRID_COLS, master_cards))
+            band_index = row_start // GRID_COLS
+            if band_index < bands_done:
+                # Already on the master; only missing JPGs are rendered
+                for i in row_cards:
+                    take_result(i)
+                continue
+            
+            band.paste((255, 255, 255), (0, 0, MASTER_WIDTH_PX, CARD_HEIGHT_PX))
             
-            # Place in master grid (10x10)
-            if i < 100:  # Only place first 100 cards
-                row = i // GRID_COLS
-                col = i % GRID_COLS
-                x = col * CARD_WIDTH_PX
-                y = row * CARD_HEIGHT_PX
-                master_img.paste(card_img, (x, y))
+            for i in row_cards:
+                result = take_result(i)
+                if result:
+                    col = i % GRID_COLS
+                    band.paste(kept_image(result[0]), (col * CARD_WIDTH_PX, 0))
+            
+            master.write_band(band)
+            state = dict(master.checkpoint(), bands=band_index + 1,
+                         sources=sources_digest(sources[:row_cards.stop]))
+            manifest.save_checkpoint('master', master_filename, state)
     
-    # Save master PNG
-    master_filename = "printable_cards/master_bingo_cards_1meter.png"
-    print(f"Saving master PNG file: {master_filename}")
-    master_img.save(master_filename, 'PNG', optimize=False)
+    # Remaining cards only get individual JPGs
+    for i in range(master_cards, len(pdf_files)):
+        take_result(i)
+    manifest.finish()
     
-    print(f"\n✅ Converted {len(converted_images)} PDF cards to JPG!")
-    print(f"✅ Created master PNG file: {master_filename}")
+    print(f"\n✅ Converted {converted_count} PDF cards to JPG!")
+    print(f"✅ Created master {master_format.upper()} file: {master_filename}")
     print("\nFile specifications:")
     print(f"📄 Individual JPG cards: {CARD_WIDTH_PX}x{CARD_HEIGHT_PX}px (15cm x 20cm at 300 DPI)")
     print(f"🖼️  Master PNG grid: {MASTER_WIDTH_PX}x{MASTER_HEIGHT_PX}px")
@@ -118,14 +148,23 @@ def convert_pdfs_to_jpgs_and_master():
     print("- Physical master size: 177.2cm x 236.2cm (1.77m x 2.36m)")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert PDF cards to JPG and build the master poster")
+    parser.add_argument('--master-format', choices=['png', 'tiff'], default='png',
+                        help="png (default) or tiled BigTIFF for large-format printing")
+    parser.add_argument('--compression', choices=['deflate', 'lzw'], default='deflate',
+                        help="TIFF tile compression")
+    parser.add_argument('--pyramid', action='store_true',
+                        help="Add reduced-resolution levels to the TIFF")
+    parser.add_argument('--restart', action='store_true',
+                        help="Ignore progress from an interrupted run and start over")
+    args = parser.parse_args()
+    
     # Check if PyMuPDF is installed
     try:
         import fitz
-        import io
     except ImportError:
         print("PyMuPDF not found. Installing...")
         os.system("pip install PyMuPDF")
         import fitz
-        import io
     
-    convert_pdfs_to_jpgs_and_master()
\ No newline at end of file
+    convert_pdfs_to_jpgs_and_master(args.master_format, args.compression, args.pyramid, args.restart)
\ No newline at end of file
@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
 """
 Create master PNG with 1.60m x 2.10m dimensions (10x10 grid)
+Use --format tiff for a tiled, compressed BigTIFF and --replace-card to patch
+a single card into an existing TIFF master in place
 """
 
 import os
 import glob
+import argparse
 from PIL import Image
 
+from master_poster import open_master_writer, replace_tiff_region
+from pdf_raster import kept_image, rasterize_card, rasterize_cards
+
 # New dimensions: 1.60m x 2.10m at 300 DPI
 DPI = 300
 MASTER_WIDTH_CM = 160
@@ -20,45 +26,78 @@ GRID_COLS = 10
 CARD_WIDTH_PX = MASTER_WIDTH_PX // GRID_COLS  # 189 pixels per card
 CARD_HEIGHT_PX = MASTER_HEIGHT_PX // GRID_ROWS  # 248 pixels per card
 
-def create_160x210_master():
+MASTER_BASENAME = "printable_cards/master_bingo_cards_160x210cm"
+
+def load_card_cell(jpg_path):
+    """Load a card JPG resized to one grid cell"""
+    card_img = Image.open(jpg_path)
+    # Let the JPEG decoder downscale in the DCT domain instead of decoding full size
+    card_img.draft('RGB', (CARD_WIDTH_PX, CARD_HEIGHT_PX))
+    return card_img.resize((CARD_WIDTH_PX, CARD_HEIGHT_PX), Image.Resampling.LANCZOS)
+
+def iter_card_cells(count):
+    """
+    Yield the first count cards as grid cell images
+    Card PDFs are rasterized straight at cell size in a process pool; existing
+    JPGs are only used when the PDFs are missing
+    """
+    pdf_files = sorted(glob.glob("printable_cards/bingo_card_*.pdf"))
+    if len(pdf_files) >= count:
+        jobs = [(pdf_path, [(CARD_WIDTH_PX, CARD_HEIGHT_PX, None, True)]) for pdf_path in pdf_files[:count]]
+        for result in rasterize_cards(jobs):
+            yield kept_image(result[0]) if result else None
+        return
+    
+    jpg_files = sorted(glob.glob("printable_cards/bingo_card_*.jpg"))
+    for jpg_path in jpg_files[:count]:
+        yield load_card_cell(jpg_path)
+
+def card_cell(card_number):
+    """Render or load a single card as a grid cell image"""
+    pdf_path = f"printable_cards/bingo_card_{card_number:03d}.pdf"
+    if os.path.exists(pdf_path):
+        result = rasterize_card((pdf_path, [(CARD_WIDTH_PX, CARD_HEIGHT_PX, None, True)]))
+        if result:
+            return kept_image(result[0])
+    
+    jpg_path = f"printable_cards/bingo_card_{card_number:03d}.jpg"
+    if os.path.exists(jpg_path):
+        return load_card_cell(jpg_path)
+    return None
+
+def create_160x210_master(output_format='png', compression='deflate', pyramid=False):
     """Create master PNG with 1.60m x 2.10m dimensions"""
     
-    # Get existing JPG files
-    jpg_files = glob.glob("printable_cards/bingo_card_*.jpg")
-    jpg_files.sort()
+    # Need 100 existing cards (PDF or JPG)
+    pdf_count = len(glob.glob("printable_cards/bingo_card_*.pdf"))
+    jpg_count = len(glob.glob("printable_cards/bingo_card_*.jpg"))
     
-    if len(jpg_files) < 100:
-        print(f"Only found {len(jpg_files)} JPG files. Need 100 cards.")
+    if max(pdf_count, jpg_count) < 100:
+        print(f"Only found {max(pdf_count, jpg_count)} card files. Need 100 cards.")
         return
     
-    print(f"Creating 1.60m x 2.10m master PNG...")
+    cells = iter_card_cells(GRID_ROWS * GRID_COLS)
     
-    # Create master image
-    master_img = Image.new('RGB', (MASTER_WIDTH_PX, MASTER_HEIGHT_PX), (255, 255, 255))
+    extension = 'tif' if output_format == 'tiff' else 'png'
+    master_filename = f"{MASTER_BASENAME}.{extension}"
+    print(f"Creating 1.60m x 2.10m master {output_format.upper()}...")
     
-    # Place 100 cards in 10x10 grid
-    for i in range(100):
-        jpg_path = jpg_files[i]
-        
-        # Load and resize card to fit grid cell
-        card_img = Image.open(jpg_path)
-        card_img = card_img.resize((CARD_WIDTH_PX, CARD_HEIGHT_PX), Image.Resampling.LANCZOS)
-        
-        # Calculate position in grid
-        row = i // GRID_COLS
-        col = i % GRID_COLS
-        x = col * CARD_WIDTH_PX
-        y = row * CARD_HEIGHT_PX
+    # Stream one row of cards at a time instead of holding the whole poster
+    with open_master_writer(master_filename, MASTER_WIDTH_PX, MASTER_HEIGHT_PX, dpi=DPI,
+                            tiled=output_format == 'tiff', compression=compression,
+                            pyramid=pyramid) as master:
+        band = Image.new('RGB', (MASTER_WIDTH_PX, CARD_HEIGHT_PX), (255, 255, 255))
         
-        # Paste card into master
-        master_img.paste(card_img, (x, y))
-        
-        if (i + 1) % 10 == 0:
-            print(f"Processed {i + 1}/100 cards...")
-    
-    # Save master PNG
-    master_filename = "printable_cards/master_bingo_cards_160x210cm.png"
-    master_img.save(master_filename, 'PNG', optimize=False)
+        for row in range(GRID_ROWS):
+            band.paste((255, 255, 255), (0, 0, MASTER_WIDTH_PX, CARD_HEIGHT_PX))
+            
+            for col in range(GRID_COLS):
+                card_img = next(cells)
+                if card_img:
+                    band.paste(card_img, (col * CARD_WIDTH_PX, 0))
+            
+            master.write_band(band)
+            print(f"Processed {(row + 1) * GRID_COLS}/100 cards...")
     
     print(f"\nSUCCESS!")
     print(f"Created: {master_filename}")
@@ -66,6 +105,41 @@ def create_160x210_master():
     print(f"Physical size: 160cm x 210cm (1.60m x 2.10m)")
     print(f"Grid: 10x10 cards")
     print(f"Each card: {CARD_WIDTH_PX} x {CARD_HEIGHT_PX} pixels (16cm x 21cm)")
+    if output_format == 'tiff':
+        print(f"Tiled BigTIFF: {compression} compression{', pyramidal' if pyramid else ''}")
+
+def replace_master_card(card_number):
+    """Re-place one card in the tiled TIFF master without rewriting the rest"""
+    master_filename = f"{MASTER_BASENAME}.tif"
+    
+    if not os.path.exists(master_filename):
+        print(f"No TIFF master found at {master_filename}. Run with --format tiff first.")
+        return
+    
+    card_img = card_cell(card_number)
+    if card_img is None:
+        print(f"No PDF or JPG found for card #{card_number:03d}")
+        return
+    
+    index = card_number - 1
+    x = (index % GRID_COLS) * CARD_WIDTH_PX
+    y = (index // GRID_COLS) * CARD_HEIGHT_PX
+    replace_tiff_region(master_filename, x, y, card_img)
+    print(f"Replaced card #{card_number:03d} in {master_filename}")
 
 if __name__ == "__main__":
-    create_160x210_master()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Create the 1.60m x 2.10m master poster")
+    parser.add_argument('--format', choices=['png', 'tiff'], default='png',
+                        help="png (default) or tiled BigTIFF")
+    parser.add_argument('--compression', choices=['deflate', 'lzw'], default='deflate',
+                        help="TIFF tile compression")
+    parser.add_argument('--pyramid', action='store_true',
+                        help="Add reduced-resolution levels to the TIFF")
+    parser.add_argument('--replace-card', type=int, metavar='N',
+                        help="Update card N in an existing TIFF master in place")
+    args = parser.parse_args()
+    
+    if args.replace_card:
+        replace_master_card(args.replace_card)
+    else:
+        create_160x210_master(args.format, args.compression, args.pyramid)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Create the master poster as a single vector PDF page (default 1.60m x 2.10m, 10x10 grid)
+The static card artwork (header, logo, BINGO circles, cell borders) is drawn once
+as a shared form XObject; every card only adds its numbers on top
+"""
+
+import os
+import json
+import argparse
+import importlib
+from reportlab.pdfgen import canvas
+from reportlab.lib.units import cm
+
+# Reuse the exact card artwork from generate-printable-cards.py (layouts/print_card.json)
+printable_cards = importlib.import_module('generate-printable-cards')
+
+# Largest page side most RIPs and viewers accept without UserUnit scaling
+MAX_PAGE_SIDE = 14400
+
+def card_renderer():
+    """The compiled print card layout"""
+    return printable_cards.card_renderer()
+
+def card_box():
+    """Width and height of one card's artwork, borders included"""
+    renderer = card_renderer()
+    return renderer.width, renderer.height
+
+def load_cards(deck_path=None):
+    """Load cards from a JSON file of bingo_cards rows, or from the database"""
+    if deck_path:
+        with open(deck_path) as f:
+            return json.load(f)
+    
+    print("Fetching bingo cards from database...")
+    return printable_cards.fetch_bingo_cards()
+
+def create_vector_master(cards, output_path, width_cm=160, height_cm=210, rows=10, cols=10,
+                         margin_cm=1.0, gap_cm=0.5):
+    """Place cards on R x C vector poster pages, one page per full grid"""
+    page_width = width_cm * cm
+    page_height = height_cm * cm
+    margin = margin_cm * cm
+    gap = gap_cm * cm
+    
+    if max(page_width, page_height) > MAX_PAGE_SIDE:
+        print(f"WARNING: page side over {MAX_PAGE_SIDE}pt (508cm); some RIPs may reject it")
+    
+    cell_width = (page_width - 2 * margin - (cols - 1) * gap) / cols
+    cell_height = (page_height - 2 * margin - (rows - 1) * gap) / rows
+    box_width, box_height = card_box()
+    scale = min(cell_width / box_width, cell_height / box_height)
+    if scale <= 0:
+        print("Margins and gaps leave no room for cards!")
+        return False
+    
+    canv = canvas.Canvas(output_path, pagesize=(page_width, page_height))
+    canv.setTitle("Enjoy Bingo master poster")
+    
+    # Shared artwork: drawn once as a form, referenced by every card
+    renderer = card_renderer()
+    
+    per_page = rows * cols
+    for index, card in enumerate(cards):
+        slot = index % per_page
+        if index and slot == 0:
+            canv.showPage()
+        
+        # Center the scaled card in its grid cell (row 0 at the top)
+        row, col = divmod(slot, cols)
+        x = margin + col * (cell_width + gap) + (cell_width - box_width * scale) / 2
+        y = page_height - margin - (row + 1) * cell_height - row * gap + (cell_height - box_height * scale) / 2
+        
+        canv.saveState()
+        canv.translate(x, y)
+        canv.scale(scale, scale)
+        renderer.draw_static(canv)
+        renderer.draw_variable(canv, card)
+        canv.restoreState()
+    
+    canv.save()
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create a vector PDF master poster")
+    parser.add_argument('--output', default="printable_cards/master_bingo_cards_vector.pdf")
+    parser.add_argument('--deck', help="JSON file of bingo_cards rows instead of the database")
+    parser.add_argument('--width-cm', type=float, default=160)
+    parser.add_argument('--height-cm', type=float, default=210)
+    parser.add_argument('--rows', type=int, default=10)
+    parser.add_argument('--cols', type=int, default=10)
+    parser.add_argument('--margin-cm', type=float, default=1.0)
+    parser.add_argument('--gap-cm', type=float, default=0.5)
+    args = parser.parse_args()
+    
+    cards = load_cards(args.deck)
+    if not cards:
+        print("No cards found!")
+    else:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        if create_vector_master(cards, args.output, args.width_cm, args.height_cm, args.rows,
+                                args.cols, args.margin_cm, args.gap_cm):
+            pages = -(-len(cards) // (args.rows * args.cols))
+            print(f"\nSUCCESS!")
+            print(f"Created: {args.output}")
+            print(f"Physical size: {args.width_cm:g}cm x {args.height_cm:g}cm, {pages} page(s)")
+            print(f"Grid: {args.rows}x{args.cols} cards")
+            print(f"File size: {os.path.getsize(args.output) / 1024:.0f} KB")
@@ -0,0 +1,90 @@
+"""
+Binary deck snapshots (.bdeck)
+A compact, exact copy of the bingo_cards rows taken at print time, so printed
+cards can be checked later even if the database has been regenerated since.
+Layout: b'BDECK' + version byte + card count (uint32 LE), then per card the
+card number (uint32 LE) and its 24 numbers as bytes: B(5) I(5) N(4) G(5) O(5).
+Version 1 files, with uint16 card numbers, are still read
+"""
+
+import os
+import struct
+
+MAGIC = b'BDECK'
+VERSION = 2
+HEADER = struct.Struct('<5sBI')
+# Card number field per format version
+CARD_NUMBER_FORMATS = {1: struct.Struct('<H'), 2: struct.Struct('<I')}
+CARD_NUMBER = CARD_NUMBER_FORMATS[VERSION]
+MAX_CARD_NUMBER = 2 ** (8 * CARD_NUMBER.size) - 1
+COLUMN_SIZES = {'b': 5, 'i': 5, 'n': 4, 'g': 5, 'o': 5}
+NUMBERS_PER_CARD = sum(COLUMN_SIZES.values())
+RECORD_SIZE = CARD_NUMBER.size + NUMBERS_PER_CARD
+
+def pack_numbers(card_data):
+    """The 24 numbers of a card as bytes, column by column in printed order"""
+    numbers = []
+    for letter, size in COLUMN_SIZES.items():
+        column = card_data[f'{letter}_column']
+        if len(column) != size:
+            raise ValueError(f"Card {card_data['card_number']}: {letter.upper()} column has {len(column)} numbers")
+        numbers.extend(column)
+    return bytes(numbers)
+
+def unpack_numbers(card_number, data):
+    """A card dict from its number and 24 packed bytes"""
+    card = {'card_number': card_number}
+    offset = 0
+    for letter, size in COLUMN_SIZES.items():
+        card[f'{letter}_column'] = list(data[offset:offset + size])
+        offset += size
+    return card
+
+def write_bdeck(cards, path):
+    """Write cards as a .bdeck snapshot, sorted by card number"""
+    cards = sorted(cards, key=lambda card: card['card_number'])
+    for card in cards:
+        if not 0 <= card['card_number'] <= MAX_CARD_NUMBER:
+            raise ValueError(f"Card number {card['card_number']} doesn't fit a .bdeck snapshot (0-{MAX_CARD_NUMBER})")
+    with open(path + '.tmp', 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(cards)))
+        for card in cards:
+            f.write(CARD_NUMBER.pack(card['card_number']) + pack_numbers(card))
+    os.replace(path + '.tmp', path)
+
+def spool_bdeck(cards, path):
+    """
+    Yield cards while appending them to a .bdeck snapshot, in the order given, so
+    a one-pass stream can be read again from disk. The file only appears once the
+    stream is exhausted
+    """
+    count = 0
+    with open(path + '.tmp', 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0))
+        for card in cards:
+            if not 0 <= card['card_number'] <= MAX_CARD_NUMBER:
+                raise ValueError(f"Card number {card['card_number']} doesn't fit a .bdeck snapshot (0-{MAX_CARD_NUMBER})")
+            f.write(CARD_NUMBER.pack(card['card_number']) + pack_numbers(card))
+            count += 1
+            yield card
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, count))
+    os.replace(path + '.tmp', path)
+
+def read_bdeck(path):
+    """Cards from a .bdeck snapshot as bingo_cards-style dicts"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version not in CARD_NUMBER_FORMATS:
+        raise ValueError(f"{path} is not a .bdeck snapshot (versions {sorted(CARD_NUMBER_FORMATS)})")
+    card_number_format = CARD_NUMBER_FORMATS[version]
+    record_size = card_number_format.size + NUMBERS_PER_CARD
+    if len(data) != HEADER.size + count * record_size:
+        raise ValueError(f"{path} is truncated: expected {count} cards")
+    
+    cards = []
+    for offset in range(HEADER.size, len(data), record_size):
+        card_number = card_number_format.unpack_from(data, offset)[0]
+        cards.append(unpack_numbers(card_number, data[offset + card_number_format.size:offset + record_size]))
+    return cards
@@ -0,0 +1,204 @@
+"""
+Content-addressed deck versions and incremental sync
+Card numbers 0-1048575 form a fixed 16-ary tree of ranges. A range hashes to the
+sha256 of its cards' hashes in order (supabase/deck_versions.sql computes the
+same in the database), and the whole-tree hash is the deck's version. Two decks
+are diffed by comparing range hashes level by level, only descending into ranges
+that differ, so a sync moves just the changed cards
+"""
+
+import json
+import bisect
+import hashlib
+
+import requests
+
+from deck_snapshot import MAX_CARD_NUMBER, read_bdeck, write_bdeck
+
+FANOUT = 16
+# Five levels of 16; every card number must fall inside
+CARD_NUMBER_SPACE = (0, FANOUT ** 5 - 1)
+# Any deck in the space can be synced into a .bdeck snapshot
+assert CARD_NUMBER_SPACE[1] <= MAX_CARD_NUMBER, "card number space exceeds the .bdeck format"
+# Card numbers per PostgREST in.(...) filter or upsert body
+REQUEST_CHUNK = 500
+# A sync that would delete more than this share of the target needs allow_delete
+MAX_DELETE_FRACTION = 0.5
+
+def card_hash(card_data):
+    """sha256 of "<card_number>:<B>|<I>|<N>|<G>|<O>", matching bingo_card_hash() in SQL"""
+    columns = '|'.join(','.join(map(str, card_data[f'{letter}_column'])) for letter in 'bingo')
+    return hashlib.sha256(f"{card_data['card_number']}:{columns}".encode()).hexdigest()
+
+def range_hash(card_hashes):
+    return hashlib.sha256(''.join(card_hashes).encode()).hexdigest()
+
+def split_range(start, end, fanout=FANOUT):
+    """The child ranges of an inclusive range"""
+    width = -(-(end - start + 1) // fanout)
+    return [(low, min(low + width - 1, end)) for low in range(start, end + 1, width)]
+
+def chunks(items, size=REQUEST_CHUNK):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class LocalDeck:
+    """A deck held in memory (from a JSON or .bdeck file), answering range hash queries"""
+    
+    def __init__(self, cards):
+        self.cards = {card['card_number']: card for card in cards}
+        self._index = None
+        outside = [number for number in self.cards if not CARD_NUMBER_SPACE[0] <= number <= CARD_NUMBER_SPACE[1]]
+        if outside:
+            raise ValueError(f"Card numbers outside {CARD_NUMBER_SPACE}: {outside[:5]}")
+    
+    @classmethod
+    def load(cls, path):
+        if path.endswith('.bdeck'):
+            return cls(read_bdeck(path))
+        with open(path) as f:
+            return cls(json.load(f))
+    
+    def save(self, path):
+        cards = [self.cards[number] for number in sorted(self.cards)]
+        if path.endswith('.bdeck'):
+            write_bdeck(cards, path)
+            return
+        with open(path, 'w') as f:
+            json.dump([{key: card[key] for key in ('card_number', 'b_column', 'i_column', 'n_column',
+                                                   'g_column', 'o_column')} for card in cards], f, indent=1)
+    
+    def _sorted_hashes(self):
+        if self._index is None:
+            numbers = sorted(self.cards)
+            self._index = (numbers, [card_hash(self.cards[number]) for number in numbers])
+        return self._index
+    
+    def range_hashes(self, ranges):
+        """(card_count, hash) for each inclusive (start, end) range"""
+        numbers, hashes = self._sorted_hashes()
+        results = []
+        for start, end in ranges:
+            low, high = bisect.bisect_left(numbers, start), bisect.bisect_right(numbers, end)
+            results.append((high - low, range_hash(hashes[low:high])))
+        return results
+    
+    @property
+    def version(self):
+        return self.range_hashes([CARD_NUMBER_SPACE])[0][1]
+    
+    def fetch(self, card_numbers):
+        return [self.cards[number] for number in card_numbers if number in self.cards]
+    
+    def upsert(self, cards):
+        self.cards.update((card['card_number'], card) for card in cards)
+        self._index = None
+    
+    def delete(self, card_numbers):
+        for number in card_numbers:
+            self.cards.pop(number, None)
+        self._index = None
+
+class SupabaseDeck:
+    """The bingo_cards table, queried through the bingo_card_range_hashes RPC"""
+    
+    COLUMNS = 'card_number,b_column,i_column,n_column,g_column,o_column'
+    
+    def __init__(self, url, key):
+        self.url = url
+        self.headers = {
+            'apikey': key,
+            'Authorization': f'Bearer {key}',
+            'Content-Type': 'application/json'
+        }
+    
+    def _check(self, response):
+        if response.status_code not in (200, 201, 204):
+            raise RuntimeError(f"Supabase error {response.status_code}: {response.text[:200]}")
+        return response
+    
+    def range_hashes(self, ranges):
+        response = self._check(requests.post(
+            f"{self.url}/rest/v1/rpc/bingo_card_range_hashes",
+            headers=self.headers,
+            json={'range_starts': [start for start, _ in ranges], 'range_ends': [end for _, end in ranges]}
+        ))
+        return [(row['card_count'], row['range_hash']) for row in response.json()]
+    
+    @property
+    def version(self):
+        return self.range_hashes([CARD_NUMBER_SPACE])[0][1]
+    
+    def fetch(self, card_numbers):
+        cards = []
+        for chunk in chunks(card_numbers):
+            response = self._check(requests.get(
+                f"{self.url}/rest/v1/bingo_cards?select={self.COLUMNS}"
+                f"&card_number=in.({','.join(map(str, chunk))})&order=card_number",
+                headers=self.headers
+            ))
+            cards.extend(response.json())
+        return cards
+    
+    def upsert(self, cards):
+        columns = self.COLUMNS.split(',')
+        for chunk in chunks(cards):
+            self._check(requests.post(
+                f"{self.url}/rest/v1/bingo_cards?on_conflict=card_number",
+                headers={**self.headers, 'Prefer': 'resolution=merge-duplicates,return=minimal'},
+                json=[{column: card[column] for column in columns} for card in chunk]
+            ))
+    
+    def delete(self, card_numbers):
+        for chunk in chunks(card_numbers):
+            self._check(requests.delete(
+                f"{self.url}/rest/v1/bingo_cards?card_number=in.({','.join(map(str, chunk))})",
+                headers=self.headers
+            ))
+
+def diff_decks(source, target, fanout=FANOUT):
+    """
+    Card numbers whose contents differ between two decks (including cards only
+    one of them has), found by walking the range tree one level per round trip
+    Returns (card_numbers, stats)
+    """
+    pending = [CARD_NUMBER_SPACE]
+    changed = []
+    stats = {'round_trips': 0, 'ranges_compared': 0}
+    while pending:
+        source_hashes = source.range_hashes(pending)
+        target_hashes = target.range_hashes(pending)
+        if stats['round_trips'] == 0:
+            stats['target_cards'] = target_hashes[0][0]
+        stats['round_trips'] += 1
+        stats['ranges_compared'] += len(pending)
+        
+        next_level = []
+        for (start, end), (_, source_hash), (_, target_hash) in zip(pending, source_hashes, target_hashes):
+            if source_hash == target_hash:
+                continue
+            if start == end:
+                changed.append(start)
+            else:
+                next_level.extend(split_range(start, end, fanout))
+        pending = next_level
+    return changed, stats
+
+def sync_decks(source, target, dry_run=False, fanout=FANOUT, allow_delete=False):
+    """
+    Make target match source, transferring only the cards that differ
+    Refuses (ValueError) to delete most of the target unless allow_delete is set,
+    so an empty or wrong source can't wipe it. Returns a summary with the
+    changed, upserted and deleted card numbers
+    """
+    changed, stats = diff_decks(source, target, fanout)
+    cards = source.fetch(changed)
+    present = {card['card_number'] for card in cards}
+    deleted = [number for number in changed if number not in present]
+    if not dry_run and not allow_delete and deleted and len(deleted) > stats['target_cards'] * MAX_DELETE_FRACTION:
+        raise ValueError(f"Sync would delete {len(deleted)} of the target's {stats['target_cards']} cards")
+    if not dry_run:
+        target.upsert(cards)
+        target.delete(deleted)
+    return dict(stats, changed=changed, upserted=sorted(present), deleted=deleted)
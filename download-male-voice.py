@@ -1,14 +1,18 @@
 #!/usr/bin/env python3
 """
 Download male Amharic voice using gTTS with male voice settings
+The processed clips go straight into the lossless master store; build the
+distributed voice pack from there with encode-voice-pack.py
 """
 
 import os
 from gtts import gTTS
 from pydub import AudioSegment
 
+from audio_mastering import MASTERS_DIR, capture_master, master_path
+
 # Create directory
-os.makedirs("public/audio/amharic", exist_ok=True)
+os.makedirs(MASTERS_DIR, exist_ok=True)
 
 # Amharic texts
 texts = {
@@ -51,18 +55,20 @@ def make_male_voice(filename, text):
         male_audio = male_audio + 3  # Volume boost
         male_audio = male_audio.normalize()
         
-        # Save final version
-        final_path = f"public/audio/amharic/{filename}.mp3"
-        male_audio.export(final_path, format="mp3", bitrate="128k")
+        # Save final version as a WAV master, so the only lossy step is the pack encode
+        processed_path = f"temp_{filename}.wav"
+        male_audio.export(processed_path, format="wav")
+        capture_master(processed_path, master_path(MASTERS_DIR, filename))
         
-        # Clean up temp file
+        # Clean up temp files
         os.remove(temp_path)
+        os.remove(processed_path)
         
-        print(f"Generated male voice: {filename}.mp3")
+        print(f"Generated male voice: {filename}.wav")
         return True
         
     except Exception as e:
-        print(f"Failed: {filename}.mp3 - {e}")
+        print(f"Failed: {filename}.wav - {e}")
         return False
 
 print("Generating male Amharic voice files...")
@@ -72,4 +78,5 @@ for filename, text in texts.items():
     if make_male_voice(filename, text):
         success_count += 1
 
-print(f"\nGenerated {success_count}/{len(texts)} male voice files!")
\ No newline at end of file
+print(f"\nGenerated {success_count}/{len(texts)} male voice files in {MASTERS_DIR}!")
+print("Run encode-voice-pack.py to build the voice pack from them")
\ No newline at end of file
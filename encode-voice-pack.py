@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Encode the voice pack for distribution from the lossless master store
+Each clip is decoded and mastered once, then one ffmpeg run writes every format
+(Opus, MP3, AAC), so no format is ever transcoded from another lossy file
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+from audio_mastering import (DEFAULT_SETTINGS, FORMATS, MASTERS_DIR, decode, encode_formats, find_masters,
+                             format_spec_key, master_samples, settings_key, to_pcm)
+from render_jobs import atomic_output, file_sha256
+
+PACK_DIR = "public/audio/packs/amharic"
+MANIFEST_NAME = "manifest.json"
+# Bump when the encoding itself changes, so every clip is re-encoded
+PACK_VERSION = 1
+
+def clip_key(master_sha256, settings, formats):
+    """Changes whenever the master, the mastering settings or a format's encoding does"""
+    content = [PACK_VERSION, master_sha256, settings_key(settings), format_spec_key(formats)]
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()[:16]
+
+def output_path(pack_dir, fmt, name):
+    return os.path.join(pack_dir, fmt, f"{name}.{FORMATS[fmt]['extension']}")
+
+def encode_clip(job):
+    """Worker: master one clip and encode every format from it in a single pass"""
+    name, master, pack_dir, formats, settings = job
+    samples, rate = decode(master)
+    mastered, stats = master_samples(samples, rate, settings)
+    pcm = to_pcm(mastered)
+    try:
+        encode_formats(pcm, rate, [(fmt, output_path(pack_dir, fmt, name)) for fmt in formats])
+    except RuntimeError as e:
+        raise RuntimeError(f"{name}: {e}") from e
+    
+    return {
+        'name': name,
+        'duration': round(len(pcm) * 1000 / rate),
+        'bytes': {fmt: os.path.getsize(output_path(pack_dir, fmt, name)) for fmt in formats},
+        'loudness': stats['output_lufs'],
+    }
+
+def load_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def encode_voice_pack(masters_dir=MASTERS_DIR, pack_dir=PACK_DIR, formats=tuple(FORMATS), settings=None,
+                      workers=None, force=False):
+    """
+    Encode every master that changed since the last run and write the manifest
+    Returns (manifest, encoded clip names, unchanged clip names)
+    """
+    settings = settings or DEFAULT_SETTINGS
+    masters = find_masters(masters_dir)
+    if not masters:
+        raise FileNotFoundError(f"No lossless masters in {masters_dir}")
+    manifest_path = os.path.join(pack_dir, MANIFEST_NAME)
+    previous = (load_manifest(manifest_path) or {}).get('clips', {})
+    
+    jobs, clips, unchanged = [], {}, []
+    for name, master in masters.items():
+        key = clip_key(file_sha256(master), settings, formats)
+        record = previous.get(name)
+        if (not force and record and record.get('key') == key
+                and all(os.path.exists(output_path(pack_dir, fmt, name)) for fmt in formats)):
+            clips[name] = record
+            unchanged.append(name)
+            continue
+        clips[name] = {'key': key}
+        jobs.append((name, master, pack_dir, formats, settings))
+    
+    for fmt in formats:
+        os.makedirs(os.path.join(pack_dir, fmt), exist_ok=True)
+    encoded = []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(encode_clip, jobs):
+                name = result.pop('name')
+                clips[name].update(result)
+                encoded.append(name)
+    
+    manifest = {
+        'version': PACK_VERSION,
+        'formats': {},
+        'clips': clips,
+    }
+    for fmt in formats:
+        total = sum(clip['bytes'][fmt] for clip in clips.values())
+        manifest['formats'][fmt] = {
+            'path': fmt,
+            'extension': FORMATS[fmt]['extension'],
+            'mime': FORMATS[fmt]['mime'],
+            'bytes': total,
+            'budget': FORMATS[fmt]['budget_kb'] * 1024,
+        }
+    with atomic_output(manifest_path) as temp_path:
+        with open(temp_path, 'w') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+    return manifest, encoded, unchanged
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Encode the voice pack formats from the lossless masters")
+    parser.add_argument('--masters', default=MASTERS_DIR,
+                        help="Lossless WAV/FLAC masters, captured by enhance-current-audio.py")
+    parser.add_argument('--output-dir', default=PACK_DIR)
+    parser.add_argument('--formats', nargs='+', choices=list(FORMATS), default=list(FORMATS))
+    parser.add_argument('--target-lufs', type=float, default=DEFAULT_SETTINGS['target_lufs'])
+    parser.add_argument('--workers', type=int, help="Processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="Re-encode every clip")
+    args = parser.parse_args()
+    
+    if not shutil.which('ffmpeg'):
+        print("❌ ffmpeg not found - install it to encode the voice pack")
+        sys.exit(1)
+    
+    settings = dict(DEFAULT_SETTINGS, target_lufs=args.target_lufs)
+    start = time.perf_counter()
+    try:
+        manifest, encoded, unchanged = encode_voice_pack(args.masters, args.output_dir, tuple(args.formats),
+                                                         settings, args.workers, args.force)
+    except (FileNotFoundError, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    
+    print(f"✅ Encoded {len(encoded)} clip(s), {len(unchanged)} unchanged, in {elapsed:.2f}s")
+    over_budget = False
+    for fmt, info in manifest['formats'].items():
+        within = info['bytes'] <= info['budget']
+        over_budget = over_budget or not within
+        print(f"   {'✅' if within else '⚠️ '} {fmt}: {info['bytes'] / 1024:.0f} KB "
+              f"of {info['budget'] / 1024:.0f} KB budget")
+    if over_budget:
+        print("❌ Voice pack over its size budget - lower the bitrate or trim the clips")
+        sys.exit(1)
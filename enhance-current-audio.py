@@ -1,45 +1,69 @@
 #!/usr/bin/env python3
 """
-Enhance current gTTS audio files with professional effects
+Master the voice pack: trim silence, normalize loudness and limit peaks, in parallel
+Raw clips are kept as lossless masters on first sight, so re-running never degrades audio
 """
 
-from pydub import AudioSegment
 import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 
-def enhance_audio_file(input_path, output_path):
-    try:
-        # Load audio
-        audio = AudioSegment.from_mp3(input_path)
-        
-        # Professional enhancements
-        audio = audio.normalize()  # Normalize volume
-        audio = audio + 2  # Slight volume boost
-        audio = audio.low_pass_filter(3000)  # Remove harsh frequencies
-        
-        # Add slight reverb effect (simulate professional studio)
-        audio = audio.overlay(audio.apply_gain(-20), position=50)
-        
-        # Export enhanced version
-        audio.export(output_path, format="mp3", bitrate="128k")
-        return True
-    except Exception as e:
-        print(f"Error enhancing {input_path}: {e}")
-        return False
+from audio_mastering import (DEFAULT_SETTINGS, MASTERS_DIR, load_master_index, master_clip, plan_mastering,
+                             save_master_index, settings_key)
+from voice_synthesis import AMHARIC_TEXTS, OUTPUT_DIR
 
-# Enhance all existing files
-audio_dir = "public/audio/amharic"
-if os.path.exists(audio_dir):
-    files = [f for f in os.listdir(audio_dir) if f.endswith('.mp3')]
+def find_clips(clip_dir, extensions=('.mp3', '.wav')):
+    """
+    {name: path} for the synthesized caller clips present in clip_dir
+    Call clips are left out: compose-call-clips.py writes their masters directly
+    """
+    names = set(AMHARIC_TEXTS)
+    return {os.path.splitext(name)[0]: os.path.join(clip_dir, name) for name in sorted(os.listdir(clip_dir))
+            if name.endswith(extensions) and os.path.splitext(name)[0] in names}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trim, loudness-normalize and limit the caller clips")
+    parser.add_argument('--clips', default=OUTPUT_DIR)
+    parser.add_argument('--masters', default=MASTERS_DIR, help="Lossless masters (captured on first run)")
+    parser.add_argument('--target-lufs', type=float, default=DEFAULT_SETTINGS['target_lufs'])
+    parser.add_argument('--ceiling', type=float, default=DEFAULT_SETTINGS['ceiling_db'], help="Peak ceiling, dBFS")
+    parser.add_argument('--silence', type=float, default=DEFAULT_SETTINGS['silence_db'],
+                        help="Level below which leading/trailing audio is trimmed, dBFS")
+    parser.add_argument('--padding', type=int, default=DEFAULT_SETTINGS['trim_padding_ms'],
+                        help="ms kept either side of the speech")
+    parser.add_argument('--workers', type=int, help="Processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="Re-master every clip from its master")
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.clips):
+        print("Audio directory not found")
+        sys.exit(1)
+    
+    settings = dict(DEFAULT_SETTINGS, target_lufs=args.target_lufs, ceiling_db=args.ceiling,
+                    silence_db=args.silence, trim_padding_ms=args.padding)
+    start = time.perf_counter()
+    index = load_master_index(args.clips)
+    jobs, unchanged, captured = plan_mastering(find_clips(args.clips), args.masters, settings, index, args.force)
+    if captured:
+        print(f"Captured {len(captured)} new lossless master(s) in {args.masters}")
     
-    for file in files:
-        input_path = os.path.join(audio_dir, file)
-        output_path = os.path.join(audio_dir, f"enhanced_{file}")
-        
-        if enhance_audio_file(input_path, output_path):
-            # Replace original with enhanced version
-            os.replace(output_path, input_path)
-            print(f"Enhanced: {file}")
+    results = []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(master_clip, jobs))
+    key = settings_key(settings)
+    for result in results:
+        index[result['name']] = {'output': result['output_sha256'], 'settings': key}
+    save_master_index(args.clips, index)
+    elapsed = time.perf_counter() - start
     
-    print(f"Enhanced {len(files)} audio files!")
-else:
-    print("Audio directory not found")
\ No newline at end of file
+    for result in results:
+        print(f"Mastered: {result['name']} {result['duration_ms']} -> {result['trimmed_ms']} ms, "
+              f"{result['loudness_lufs']} LUFS {result['gain_db']:+.1f} dB -> {result['output_lufs']} LUFS, "
+              f"peak {result['peak_db']} dBFS")
+    if results:
+        saved = sum(result['duration_ms'] - result['trimmed_ms'] for result in results)
+        print(f"\nTrimmed {saved / 1000:.1f}s of silence in total")
+    print(f"✅ Mastered {len(results)} clip(s), {len(unchanged)} already mastered, in {elapsed:.2f}s")
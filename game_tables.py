@@ -0,0 +1,109 @@
+"""
+Precomputed marking and winner tables for the TypeScript game engine
+Written next to printedBingoCards.js as one little-endian binary file that
+src/lib/bingoTables.ts maps onto typed arrays, so marking a called number and
+checking patterns are table lookups instead of scans over card arrays.
+Cell positions are row-major (row * 5 + column, FREE = 12), like winning_patterns
+"""
+
+import os
+import struct
+
+from deck_snapshot import COLUMN_SIZES, MAX_CARD_NUMBER
+
+MAGIC = b'BTBL'
+VERSION = 2
+# magic, version, pattern count, card count
+HEADER = struct.Struct('<4sBxHI')
+NUMBER_SLOTS = 76  # numbers 1-75, slot 0 unused
+NOT_ON_CARD = 0xff
+
+# Mirrors the winning_patterns seed in supabase/complete_winning_system_setup.sql
+WINNING_PATTERNS = [
+    ('Top Row', [0, 1, 2, 3, 4], 1),
+    ('Second Row', [5, 6, 7, 8, 9], 1),
+    ('Middle Row', [10, 11, 12, 13, 14], 1),
+    ('Fourth Row', [15, 16, 17, 18, 19], 1),
+    ('Bottom Row', [20, 21, 22, 23, 24], 1),
+    ('B Column', [0, 5, 10, 15, 20], 1),
+    ('I Column', [1, 6, 11, 16, 21], 1),
+    ('N Column', [2, 7, 12, 17, 22], 1),
+    ('G Column', [3, 8, 13, 18, 23], 1),
+    ('O Column', [4, 9, 14, 19, 24], 1),
+    ('Main Diagonal', [0, 6, 12, 18, 24], 1),
+    ('Anti Diagonal', [4, 8, 12, 16, 20], 1),
+    ('Four Corners', [0, 4, 20, 24], 2),
+    ('X Pattern', [0, 6, 12, 18, 24, 4, 8, 16, 20], 3),
+    ('Plus Pattern', [2, 7, 10, 11, 12, 13, 14, 17, 22], 3),
+    ('T Pattern', [0, 1, 2, 3, 4, 12], 3),
+    ('Full House', list(range(25)), 5),
+]
+
+def pattern_mask(positions):
+    """25-bit mask with bit p set for every cell position p"""
+    mask = 0
+    for position in positions:
+        mask |= 1 << position
+    return mask
+
+def cell_positions(card_data):
+    """{number: row-major cell position} for the card's 24 numbers"""
+    positions = {}
+    for col, letter in enumerate(COLUMN_SIZES):
+        for index, number in enumerate(card_data[f'{letter}_column']):
+            row = index + 1 if letter == 'n' and index >= 2 else index
+            positions[number] = row * 5 + col
+    return positions
+
+def pad4(data):
+    return data + b'\0' * (-len(data) % 4)
+
+def build_tables(cards, patterns=WINNING_PATTERNS):
+    """
+    The binary tables, each section starting on a 4-byte boundary:
+      header            magic, version, pattern count P, card count N
+      pattern masks     uint32[P]
+      card numbers      uint32[N], sorted; the card index used everywhere else
+      index offsets     uint32[76]: cards holding number n are entries[offsets[n - 1]:offsets[n]]
+      index entries     uint32[24N] card indexes, grouped by number
+      cell positions    uint8[N * 76]: position of number n on card i at [i * 76 + n], 255 if absent
+      pattern info      per pattern: uint8 priority, uint8 name length, UTF-8 name
+    """
+    cards = sorted(cards, key=lambda card: card['card_number'])
+    if cards and not 0 <= cards[0]['card_number'] <= cards[-1]['card_number'] <= MAX_CARD_NUMBER:
+        raise ValueError(f"Card numbers outside 0-{MAX_CARD_NUMBER} don't fit the uint32 tables")
+    
+    cells = bytearray([NOT_ON_CARD]) * (len(cards) * NUMBER_SLOTS)
+    holders = [[] for _ in range(NUMBER_SLOTS)]
+    for card_index, card in enumerate(cards):
+        for number, position in cell_positions(card).items():
+            cells[card_index * NUMBER_SLOTS + number] = position
+            holders[number].append(card_index)
+    
+    offsets = [0]
+    for number in range(1, NUMBER_SLOTS):
+        offsets.append(offsets[-1] + len(holders[number]))
+    entries = [card_index for number in range(1, NUMBER_SLOTS) for card_index in holders[number]]
+    
+    info = b''
+    for name, _, priority in patterns:
+        encoded = name.encode()
+        info += struct.pack('<BB', priority, len(encoded)) + encoded
+    
+    return b''.join([
+        HEADER.pack(MAGIC, VERSION, len(patterns), len(cards)),
+        struct.pack(f'<{len(patterns)}I', *(pattern_mask(positions) for _, positions, _ in patterns)),
+        struct.pack(f'<{len(cards)}I', *(card['card_number'] for card in cards)),
+        struct.pack(f'<{NUMBER_SLOTS}I', *offsets),
+        struct.pack(f'<{len(entries)}I', *entries),
+        pad4(bytes(cells)),
+        info,
+    ])
+
+def write_tables_file(cards, path, patterns=WINNING_PATTERNS):
+    """Write the tables atomically; returns the size in bytes"""
+    data = build_tables(cards, patterns)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(path + '.tmp', path)
+    return len(data)
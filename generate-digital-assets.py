@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Generate small digital card assets for the web app and mobile app
+Each card is written at several widths as WebP (and AVIF when Pillow supports it),
+thumbnails are packed into sprite sheets, and a JSON manifest maps cards to files
+"""
+
+import os
+import json
+import hashlib
+import argparse
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, features
+
+import card_layout
+
+png_cards = importlib.import_module('generate-png-cards')
+
+OUTPUT_DIR = "public/cards"
+MANIFEST_NAME = "manifest.json"
+
+# Widths in pixels; heights follow the 600x900 PNG card (2:3)
+WIDTHS = [150, 300, 600]
+FORMATS = ['webp', 'avif'] if features.check('avif') else ['webp']
+
+# Encoder settings per format; AVIF's default speed is several times slower for little gain here
+SAVE_OPTIONS = {
+    'webp': {'quality': 80},
+    'avif': {'quality': 60, 'speed': 8},
+}
+
+# Sprite sheets of SPRITE_COLS x SPRITE_ROWS thumbnails at the smallest width
+SPRITE_COLS = 10
+SPRITE_ROWS = 10
+SPRITE_QUALITY = 80
+
+def file_digest(path):
+    """sha256 of a file, or empty string if it doesn't exist"""
+    if not os.path.exists(path):
+        return ''
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def render_settings():
+    """
+    Everything besides the card numbers that changes the output pixels
+    The layout spec, the code that replays it and the logo are hashed, so editing
+    the card artwork invalidates the cache without a manual version bump
+    """
+    return {
+        'renderer': file_digest(card_layout.__file__),
+        'layout': file_digest(card_layout.DEFAULT_LAYOUT),
+        'logo': file_digest("printable_cards/enjoycartelalogo.jpg"),
+        'widths': WIDTHS,
+        'formats': FORMATS,
+        'save_options': {fmt: SAVE_OPTIONS[fmt] for fmt in FORMATS},
+    }
+
+def card_hash(card_data, settings):
+    """Content hash of one card's assets"""
+    content = {
+        'card_number': card_data['card_number'],
+        'columns': [card_data[f'{letter}_column'] for letter in 'bingo'],
+        'settings': settings,
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()[:16]
+
+def asset_name(card_number, width, fmt):
+    return f"card_{card_number:03d}_w{width}.{fmt}"
+
+def render_card_assets(job):
+    """Worker: render one card once and save every width and format"""
+    card_data, output_dir = job
+    img = png_cards.render_png_bingo_card(card_data)
+    images = {fmt: {} for fmt in FORMATS}
+    
+    for width in sorted(WIDTHS, reverse=True):
+        height = round(img.height * width / img.width)
+        sized = img if width == img.width else img.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt in FORMATS:
+            name = asset_name(card_data['card_number'], width, fmt)
+            sized.save(os.path.join(output_dir, name), fmt.upper(), **SAVE_OPTIONS[fmt])
+            images[fmt][str(width)] = name
+    
+    return card_data['card_number'], images
+
+def load_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {'cards': {}, 'sprites': []}
+    with open(path) as f:
+        return json.load(f)
+
+def is_cached(entry, digest, output_dir):
+    """A card is up to date if its hash matches and all its files are still there"""
+    if not entry or entry.get('hash') != digest:
+        return False
+    return all(os.path.exists(os.path.join(output_dir, name))
+               for sizes in entry['images'].values() for name in sizes.values())
+
+def build_sprites(cards, entries, previous_sprites, output_dir):
+    """
+    Pack the smallest WebP of every card into sprite sheets
+    A sheet is only re-encoded when the hashes of the cards on it changed
+    """
+    thumb_width = min(WIDTHS)
+    per_sheet = SPRITE_COLS * SPRITE_ROWS
+    previous = {sprite['file']: sprite for sprite in previous_sprites}
+    sprites = []
+    
+    for sheet_index, start in enumerate(range(0, len(cards), per_sheet), start=1):
+        sheet_cards = cards[start:start + per_sheet]
+        name = f"sprite_{sheet_index:03d}.webp"
+        hashes = [entries[str(card['card_number'])]['hash'] for card in sheet_cards]
+        sheet_hash = hashlib.sha256(''.join(hashes).encode()).hexdigest()[:16]
+        
+        # Thumbnail size comes from the first card (all cards share one size)
+        first = entries[str(sheet_cards[0]['card_number'])]['images']['webp'][str(thumb_width)]
+        with Image.open(os.path.join(output_dir, first)) as thumb:
+            cell_width, cell_height = thumb.size
+        
+        cols = min(SPRITE_COLS, len(sheet_cards))
+        rows = -(-len(sheet_cards) // SPRITE_COLS)
+        sheet_path = os.path.join(output_dir, name)
+        cached = previous.get(name, {}).get('hash') == sheet_hash and os.path.exists(sheet_path)
+        
+        sheet = None if cached else Image.new('RGB', (cols * cell_width, rows * cell_height), (255, 255, 255))
+        for slot, card in enumerate(sheet_cards):
+            entry = entries[str(card['card_number'])]
+            x = (slot % SPRITE_COLS) * cell_width
+            y = (slot // SPRITE_COLS) * cell_height
+            entry['sprite'] = {'file': name, 'x': x, 'y': y, 'width': cell_width, 'height': cell_height}
+            if sheet is not None:
+                with Image.open(os.path.join(output_dir, entry['images']['webp'][str(thumb_width)])) as thumb:
+                    sheet.paste(thumb.convert('RGB'), (x, y))
+        
+        if sheet is not None:
+            sheet.save(sheet_path, 'WEBP', quality=SPRITE_QUALITY)
+            print(f"Packed {name} ({len(sheet_cards)} cards)")
+        
+        sprites.append({
+            'file': name,
+            'hash': sheet_hash,
+            'width': cols * cell_width,
+            'height': rows * cell_height,
+            'cards': [card['card_number'] for card in sheet_cards],
+        })
+    
+    return sprites
+
+def generate_digital_assets(cards, output_dir=OUTPUT_DIR, workers=None, force=False):
+    """Render changed cards in parallel, then rebuild sprites and the manifest"""
+    os.makedirs(output_dir, exist_ok=True)
+    cards = sorted(cards, key=lambda card: card['card_number'])
+    settings = render_settings()
+    manifest = load_manifest(output_dir)
+    
+    entries = {}
+    jobs = []
+    for card in cards:
+        key = str(card['card_number'])
+        digest = card_hash(card, settings)
+        previous = manifest['cards'].get(key)
+        if not force and is_cached(previous, digest, output_dir):
+            entries[key] = previous
+        else:
+            entries[key] = {'hash': digest}
+            jobs.append((card, output_dir))
+    
+    print(f"{len(cards) - len(jobs)} cards cached, rendering {len(jobs)} ({', '.join(FORMATS)} at {WIDTHS})...")
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for done, (card_number, images) in enumerate(pool.map(render_card_assets, jobs, chunksize=8), start=1):
+                entries[str(card_number)]['images'] = images
+                if done % 100 == 0:
+                    print(f"Rendered {done}/{len(jobs)} cards...")
+    
+    sprites = build_sprites(cards, entries, manifest.get('sprites', []), output_dir)
+    
+    manifest = {
+        'widths': WIDTHS,
+        'formats': FORMATS,
+        'sprites': sprites,
+        'cards': entries,
+    }
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return manifest_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate WebP/AVIF card assets and sprite sheets")
+    parser.add_argument('--deck', help="JSON file of bingo_cards rows instead of the database")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--workers', type=int, help="Render processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="Ignore the cache and re-render every card")
+    args = parser.parse_args()
+    
+    if args.deck:
+        with open(args.deck) as f:
+            cards = json.load(f)
+    else:
+        print("Fetching bingo cards from database...")
+        cards = png_cards.fetch_bingo_cards()
+    
+    if not cards:
+        print("No cards found!")
+    else:
+        manifest_path = generate_digital_assets(cards, args.output_dir, args.workers, args.force)
+        print(f"\nSUCCESS! Assets for {len(cards)} cards in {args.output_dir}/")
+        print(f"Manifest: {manifest_path}")
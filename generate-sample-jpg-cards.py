@@ -6,7 +6,11 @@ Plus create a master PNG file with all 100 cards in 10x10 grid for 1-meter print
 
 import os
 import random
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image
+
+from card_layout import LAYOUT_DIR, PILRenderer, compile_layout, load_layout
+from card_metadata import save_card_image
+from master_poster import open_master_writer
 
 # Physical dimensions: 15cm x 20cm at 300 DPI for high quality printing
 DPI = 300
@@ -22,16 +26,11 @@ MASTER_WIDTH_PX = CARD_WIDTH_PX * GRID_COLS  # 17720 pixels
 MASTER_HEIGHT_PX = CARD_HEIGHT_PX * GRID_ROWS  # 23620 pixels
 
 # Colors
-GREEN = (0, 128, 0)
 WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-HEADER_COLORS = {
-    'B': (51, 102, 204),    # Blue
-    'I': (204, 51, 51),     # Red  
-    'N': (230, 184, 0),     # Gold
-    'G': (51, 179, 102),    # Green
-    'O': (230, 128, 26)     # Orange
-}
+
+# Card artwork comes from layouts/jpg_card.json, compiled on first use
+JPG_LAYOUT = os.path.join(LAYOUT_DIR, "jpg_card.json")
+_renderer = None
 
 def generate_bingo_card_data(card_number):
     """Generate unique bingo card data"""
@@ -54,163 +53,58 @@ def generate_bingo_card_data(card_number):
         'o_column': sorted(o_numbers)
     }
 
+def jpg_renderer():
+    """Compiled JPG card layout, shared by every card in this process"""
+    global _renderer
+    if _renderer is None:
+        _renderer = PILRenderer(compile_layout(load_layout(JPG_LAYOUT)))
+    return _renderer
+
 def create_jpg_bingo_card(card_data):
     """Create a high-resolution JPG bingo card (15cm x 20cm)"""
-    img = Image.new('RGB', (CARD_WIDTH_PX, CARD_HEIGHT_PX), WHITE)
-    draw = ImageDraw.Draw(img)
-    
-    # Scale fonts for high resolution
-    try:
-        title_font = ImageFont.truetype("arial.ttf", 80)
-        subtitle_font = ImageFont.truetype("arial.ttf", 50)
-        header_font = ImageFont.truetype("arial.ttf", 70)
-        cell_font = ImageFont.truetype("arial.ttf", 60)
-        free_font = ImageFont.truetype("arial.ttf", 40)
-    except:
-        # Fallback to default font with size scaling
-        title_font = ImageFont.load_default()
-        subtitle_font = ImageFont.load_default()
-        header_font = ImageFont.load_default()
-        cell_font = ImageFont.load_default()
-        free_font = ImageFont.load_default()
-    
-    # Header section
-    header_height = 300
-    draw.rectangle([0, 0, CARD_WIDTH_PX, header_height], fill=WHITE, outline=GREEN, width=8)
-    
-    # Logo placeholder (if logo exists)
-    logo_path = "printable_cards/enjoycartelalogo.jpg"
-    if os.path.exists(logo_path):
-        try:
-            logo = Image.open(logo_path)
-            logo = logo.resize((250, 150))
-            img.paste(logo, (30, 75))
-        except:
-            # Draw placeholder logo
-            draw.rectangle([30, 75, 280, 225], fill=GREEN, outline=BLACK, width=4)
-            draw.text((155, 150), "LOGO", fill=WHITE, font=subtitle_font, anchor="mm")
-    else:
-        # Draw placeholder logo
-        draw.rectangle([30, 75, 280, 225], fill=GREEN, outline=BLACK, width=4)
-        draw.text((155, 150), "LOGO", fill=WHITE, font=subtitle_font, anchor="mm")
-    
-    # Title and card info
-    draw.text((320, 80), "ENJOY BINGO", fill=GREEN, font=title_font)
-    draw.text((320, 170), f"CARD #{card_data['card_number']:03d} - 20 ETB", fill=GREEN, font=subtitle_font)
-    
-    # BINGO header letters
-    letters = ['B', 'I', 'N', 'G', 'O']
-    cell_size = CARD_WIDTH_PX // 5
-    start_y = header_height + 50
-    
-    for i, letter in enumerate(letters):
-        x = i * cell_size
-        y = start_y
-        
-        # Circular background
-        circle_size = cell_size - 40
-        circle_x = x + 20
-        circle_y = y + 20
-        draw.ellipse([circle_x, circle_y, circle_x + circle_size, circle_y + circle_size], fill=HEADER_COLORS[letter])
-        
-        # Letter text
-        bbox = draw.textbbox((0, 0), letter, font=header_font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        text_x = x + (cell_size - text_width) // 2
-        text_y = y + (circle_size - text_height) // 2 + 20
-        draw.text((text_x, text_y), letter, fill=WHITE, font=header_font)
-    
-    # Number grid
-    grid_start_y = start_y + cell_size + 50
-    grid_cell_height = (CARD_HEIGHT_PX - grid_start_y - 50) // 5
-    
-    columns = [
-        card_data['b_column'],
-        card_data['i_column'], 
-        card_data['n_column'],
-        card_data['g_column'],
-        card_data['o_column']
-    ]
-    
-    for row in range(5):
-        for col in range(5):
-            x = col * cell_size
-            y = grid_start_y + row * grid_cell_height
-            
-            # Cell background and border
-            if col == 2 and row == 2:  # FREE space
-                draw.rectangle([x, y, x + cell_size, y + grid_cell_height], fill=GREEN, outline=GREEN, width=8)
-                text = "FREE"
-                text_color = WHITE
-                font = free_font
-            else:
-                draw.rectangle([x, y, x + cell_size, y + grid_cell_height], fill=WHITE, outline=GREEN, width=8)
-                
-                # Get number
-                if col == 2:  # N column (skip center)
-                    idx = row if row < 2 else row - 1
-                    number = columns[col][idx]
-                else:
-                    number = columns[col][row]
-                
-                text = str(number)
-                text_color = BLACK
-                font = cell_font
-            
-            # Center text in cell
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-            text_x = x + (cell_size - text_width) // 2
-            text_y = y + (grid_cell_height - text_height) // 2
-            draw.text((text_x, text_y), text, fill=text_color, font=font)
-    
-    return img
+    return jpg_renderer().render(card_data)
 
 def generate_jpg_cards_and_master():
     """Generate 100 JPG cards and master PNG grid"""
     # Create output directory
     os.makedirs("printable_cards", exist_ok=True)
     
-    print(f"Generating 100 JPG bingo cards (15cm x 20cm)...")
+    total_cards = GRID_ROWS * GRID_COLS
+    print(f"Generating {total_cards} JPG bingo cards (15cm x 20cm)...")
     
-    # Create master grid image
-    master_img = Image.new('RGB', (MASTER_WIDTH_PX, MASTER_HEIGHT_PX), WHITE)
-    
-    card_images = []
+    # Stream the master grid one row of cards at a time so memory stays flat
+    master_filename = "printable_cards/master_bingo_cards_1meter.png"
+    generated_count = 0
+    print(f"Streaming master PNG file: {master_filename}")
     
-    # Generate 100 cards
-    for i in range(100):
-        card_number = i + 1
-        print(f"Processing card {card_number}/100...")
-        
-        # Generate card data
-        card_data = generate_bingo_card_data(card_number)
-        
-        # Create card image
-        card_img = create_jpg_bingo_card(card_data)
-        
-        # Save individual JPG
-        jpg_filename = f"printable_cards/bingo_card_{card_number:03d}.jpg"
-        card_img.save(jpg_filename, 'JPEG', quality=95, optimize=True)
-        
-        # Store for master grid
-        card_images.append(card_img)
+    with open_master_writer(master_filename, MASTER_WIDTH_PX, MASTER_HEIGHT_PX, dpi=DPI) as master:
+        # One reusable band holds the current row of cards
+        band = Image.new('RGB', (MASTER_WIDTH_PX, CARD_HEIGHT_PX), WHITE)
         
-        # Place in master grid
-        row = i // GRID_COLS
-        col = i % GRID_COLS
-        x = col * CARD_WIDTH_PX
-        y = row * CARD_HEIGHT_PX
-        master_img.paste(card_img, (x, y))
-    
-    # Save master PNG
-    master_filename = "printable_cards/master_bingo_cards_1meter.png"
-    print(f"Saving master PNG file: {master_filename}")
-    master_img.save(master_filename, 'PNG', optimize=False)
+        for row in range(GRID_ROWS):
+            band.paste(WHITE, (0, 0, MASTER_WIDTH_PX, CARD_HEIGHT_PX))
+            
+            for col in range(GRID_COLS):
+                card_number = row * GRID_COLS + col + 1
+                print(f"Processing card {card_number}/{total_cards}...")
+                
+                # Generate card data
+                card_data = generate_bingo_card_data(card_number)
+                
+                # Create card image
+                card_img = create_jpg_bingo_card(card_data)
+                
+                # Save individual JPG
+                jpg_filename = f"printable_cards/bingo_card_{card_number:03d}.jpg"
+                save_card_image(card_img, jpg_filename, card_data, 'JPEG', quality=95, optimize=True)
+                generated_count += 1
+                
+                # Place in this row's band of the master grid
+                band.paste(card_img, (col * CARD_WIDTH_PX, 0))
+            
+            master.write_band(band)
     
-    print(f"\n✅ Generated {len(card_images)} JPG bingo cards!")
+    print(f"\n✅ Generated {generated_count} JPG bingo cards!")
     print(f"✅ Created master PNG file: {master_filename}")
     print("\nFile specifications:")
     print(f"📄 Individual JPG cards: {CARD_WIDTH_PX}x{CARD_HEIGHT_PX}px (15cm x 20cm at 300 DPI)")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Generate SVG bingo cards that scale to any size
+The static artwork from the card layout is one <symbol> defined once; each card
+is a <use> of it plus its card number and 24 number text nodes
+"""
+
+import os
+import json
+import argparse
+import importlib
+
+from card_layout import DEFAULT_LAYOUT, SVG_FONT_FAMILY, SVGRenderer, compile_layout, load_layout
+
+png_cards = importlib.import_module('generate-png-cards')
+
+# Whole-deck documents lay cards out in rows of this many
+DECK_COLUMNS = 10
+DECK_GAP = 40
+
+def svg_renderer(layout_path=None):
+    """SVG backend for the compiled card layout (same layout as the PNG cards)"""
+    return SVGRenderer(compile_layout(load_layout(layout_path or DEFAULT_LAYOUT)))
+
+def svg_open(width, height):
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+            f'viewBox="0 0 {width} {height}" width="{width}" height="{height}" font-family="{SVG_FONT_FAMILY}">')
+
+def deck_svg(cards, renderer, columns=DECK_COLUMNS):
+    """All cards in one document, DECK_COLUMNS to a row; each card is addressable as #card-NNN"""
+    card_width = renderer.display_list.width
+    card_height = renderer.display_list.height
+    columns = min(columns, len(cards))
+    rows = -(-len(cards) // columns)
+    width = columns * card_width + (columns - 1) * DECK_GAP
+    height = rows * card_height + (rows - 1) * DECK_GAP
+    
+    parts = [svg_open(width, height), renderer.symbol()]
+    for index, card in enumerate(cards):
+        row, col = divmod(index, columns)
+        parts.append(renderer.card_body(card, col * (card_width + DECK_GAP), row * (card_height + DECK_GAP),
+                                        element_id=f"card-{card['card_number']:03d}"))
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
+def card_svg(card_data, renderer, defs):
+    """A standalone single-card document"""
+    d = renderer.display_list
+    return '\n'.join([svg_open(d.width, d.height), defs,
+                      renderer.card_body(card_data, element_id=f"card-{card_data['card_number']:03d}"), '</svg>'])
+
+def generate_svg_cards(cards, output_dir="printable_cards/svg", per_card=False, layout_path=None):
+    """Write the deck SVG (or one SVG per card) and return the paths written"""
+    os.makedirs(output_dir, exist_ok=True)
+    cards = sorted(cards, key=lambda card: card['card_number'])
+    renderer = svg_renderer(layout_path)
+    
+    if not per_card:
+        path = os.path.join(output_dir, "bingo_cards.svg")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(deck_svg(cards, renderer))
+        return [path]
+    
+    defs = renderer.symbol()
+    paths = []
+    for card in cards:
+        path = os.path.join(output_dir, f"bingo_card_{card['card_number']:03d}.svg")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(card_svg(card, renderer, defs))
+        paths.append(path)
+    return paths
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate SVG bingo cards")
+    parser.add_argument('--deck', help="JSON file of bingo_cards rows instead of the database")
+    parser.add_argument('--output-dir', default="printable_cards/svg")
+    parser.add_argument('--per-card', action='store_true',
+                        help="Write one SVG per card instead of a single deck document")
+    parser.add_argument('--layout', help="Layout spec JSON (default: layouts/digital_card.json)")
+    args = parser.parse_args()
+    
+    if args.deck:
+        with open(args.deck) as f:
+            cards = json.load(f)
+    else:
+        print("Fetching bingo cards from database...")
+        cards = png_cards.fetch_bingo_cards()
+    
+    if not cards:
+        print("No cards found!")
+    else:
+        paths = generate_svg_cards(cards, args.output_dir, args.per_card, args.layout)
+        total = sum(os.path.getsize(path) for path in paths)
+        print(f"\nSUCCESS! {len(cards)} cards in {len(paths)} SVG file(s) under {args.output_dir}/")
+        print(f"Total size: {total / 1024:.0f} KB ({total / len(cards) / 1024:.1f} KB per card)")
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Impose bingo cards onto N-up print sheets (A4 4-up, A3 8-up) with bleed and crop marks
+Cards are ordered for cut-and-stack: after one guillotine pass through a stack of
+sheets, the piles stack up in card number order. Each stack is written as its own
+multi-page PDF, so 10k-card runs never hold more than one stack in memory.
+The outermost edge of each card is stretched over its bleed, so a cut slightly
+outside the trim box still lands on printed artwork instead of white paper.
+"""
+
+import os
+import io
+import glob
+import math
+import argparse
+import importlib
+from PIL import Image, ImageChops
+from reportlab.pdfgen import canvas
+from reportlab.lib.units import mm
+import numpy as np
+import fitz  # PyMuPDF
+
+# Card artwork and deck loading shared with the vector master poster
+vector_master = importlib.import_module('create-vector-master')
+
+# Sheet presets: (sheet width pt, sheet height pt, columns, rows)
+SHEET_PRESETS = {
+    'a4-4up': (210 * mm, 297 * mm, 2, 2),
+    'a3-8up': (420 * mm, 297 * mm, 4, 2),  # A3 landscape
+}
+
+BLEED = 3 * mm
+MARGIN = 12 * mm
+MARK_OFFSET = 2 * mm   # Gap between the bleed edge and the start of a crop mark
+MARK_LENGTH = 6 * mm
+MARK_WIDTH = 0.25
+EDGE_SAMPLE = 0.5      # Width of the card edge (pt on the sheet) stretched over the bleed
+
+def sheet_layout(preset, card_aspect, bleed=BLEED, margin=MARGIN):
+    """
+    Work out trim boxes for every slot on a sheet (top-left origin, row-major)
+    Cards keep their aspect ratio and are separated by two bleeds, so every
+    cut line is shared by a whole column or row of cards
+    """
+    sheet_width, sheet_height, cols, rows = SHEET_PRESETS[preset]
+    avail_width = sheet_width - 2 * margin - (cols - 1) * 2 * bleed
+    avail_height = sheet_height - 2 * margin - (rows - 1) * 2 * bleed
+    trim_width = min(avail_width / cols, avail_height / rows * card_aspect)
+    trim_height = trim_width / card_aspect
+    
+    block_width = cols * trim_width + (cols - 1) * 2 * bleed
+    block_height = rows * trim_height + (rows - 1) * 2 * bleed
+    left = (sheet_width - block_width) / 2
+    top = (sheet_height - block_height) / 2
+    
+    slots = []
+    for row in range(rows):
+        for col in range(cols):
+            x0 = left + col * (trim_width + 2 * bleed)
+            y0 = top + row * (trim_height + 2 * bleed)
+            slots.append((x0, y0, x0 + trim_width, y0 + trim_height))
+    
+    return {
+        'sheet_size': (sheet_width, sheet_height),
+        'slots': slots,
+        'block': (left, top, left + block_width, top + block_height),
+        'bleed': bleed,
+    }
+
+def crop_mark_lines(layout):
+    """Crop marks in the sheet margins at every shared cut line"""
+    left, top, right, bottom = layout['block']
+    bleed = layout['bleed']
+    xs = sorted({x for slot in layout['slots'] for x in (slot[0], slot[2])})
+    ys = sorted({y for slot in layout['slots'] for y in (slot[1], slot[3])})
+    
+    lines = []
+    for x in xs:
+        start = top - bleed - MARK_OFFSET
+        lines.append((x, start, x, start - MARK_LENGTH))
+        start = bottom + bleed + MARK_OFFSET
+        lines.append((x, start, x, start + MARK_LENGTH))
+    for y in ys:
+        start = left - bleed - MARK_OFFSET
+        lines.append((start, y, start - MARK_LENGTH, y))
+        start = right + bleed + MARK_OFFSET
+        lines.append((start, y, start + MARK_LENGTH, y))
+    return lines
+
+def bleed_patches(trim, bleed, edge=EDGE_SAMPLE):
+    """
+    (target, source) pairs that fill the bleed around one trim box (top-left origin)
+    target is a sheet rect in the bleed; source is the card edge strip or corner
+    stretched into it, as fractions (u0, v0, u1, v1) of the card
+    """
+    x0, y0, x1, y1 = trim
+    fx = min(1, edge / (x1 - x0))
+    fy = min(1, edge / (y1 - y0))
+    columns = {-1: ((x0 - bleed, x0), (0, fx)), 0: ((x0, x1), (0, 1)), 1: ((x1, x1 + bleed), (1 - fx, 1))}
+    rows = {-1: ((y0 - bleed, y0), (0, fy)), 0: ((y0, y1), (0, 1)), 1: ((y1, y1 + bleed), (1 - fy, 1))}
+    patches = []
+    for row in (-1, 0, 1):
+        for col in (-1, 0, 1):
+            if row or col:
+                (tx0, tx1), (u0, u1) = columns[col]
+                (ty0, ty1), (v0, v1) = rows[row]
+                patches.append(((tx0, ty0, tx1, ty1), (u0, v0, u1, v1)))
+    return patches
+
+def imposition_order(count, per_sheet, stack_sheets, order='cut-stack'):
+    """
+    Yield (stack number, sheets) where each sheet is a list of card indexes per slot
+    With cut-stack ordering slot p of sheet s in a stack of S sheets holds card
+    p * S + s, so pile p (one slot cut from every sheet) is a run of consecutive cards
+    """
+    per_stack = per_sheet * stack_sheets
+    for stack_number, stack_start in enumerate(range(0, count, per_stack), start=1):
+        remaining = min(per_stack, count - stack_start)
+        sheet_count = math.ceil(remaining / per_sheet)
+        sheets = []
+        for s in range(sheet_count):
+            sheet = []
+            for p in range(per_sheet):
+                if order == 'cut-stack':
+                    offset = p * sheet_count + s
+                else:
+                    offset = s * per_sheet + p
+                sheet.append(stack_start + offset if offset < remaining else None)
+            sheets.append(sheet)
+        yield stack_number, sheets
+
+class DeckSheetWriter:
+    """Draw cards from deck data as vector art; the static card artwork is one shared form"""
+    
+    def __init__(self, path, layout):
+        self.layout = layout
+        self.sheet_height = layout['sheet_size'][1]
+        self.renderer = vector_master.card_renderer()
+        self.box_width, self.box_height = vector_master.card_box()
+        self.canv = canvas.Canvas(path, pagesize=layout['sheet_size'])
+        self.sheets = 0
+    
+    def new_sheet(self):
+        if self.sheets:
+            self.canv.showPage()
+        self.sheets += 1
+    
+    def place(self, card, trim):
+        x0, y0, x1, y1 = trim
+        scale = min((x1 - x0) / self.box_width, (y1 - y0) / self.box_height)
+        self.canv.saveState()
+        self.canv.translate(x0, self.sheet_height - y1)
+        self.canv.scale(scale, scale)
+        self.renderer.draw_static(self.canv)
+        self.renderer.draw_variable(self.canv, card)
+        self.canv.restoreState()
+        
+        # The numbers never reach the edge, so the shared artwork alone fills the bleed
+        for target, (u0, v0, u1, v1) in bleed_patches(trim, self.layout['bleed']):
+            tx0, ty0, tx1, ty1 = target
+            sx = (tx1 - tx0) / ((u1 - u0) * self.box_width)
+            sy = (ty1 - ty0) / ((v1 - v0) * self.box_height)
+            self.canv.saveState()
+            clip = self.canv.beginPath()
+            clip.rect(tx0, self.sheet_height - ty1, tx1 - tx0, ty1 - ty0)
+            self.canv.clipPath(clip, stroke=0, fill=0)
+            self.canv.translate(tx0 - u0 * self.box_width * sx,
+                                self.sheet_height - ty1 - (1 - v1) * self.box_height * sy)
+            self.canv.scale(sx, sy)
+            self.renderer.draw_static(self.canv)
+            self.canv.restoreState()
+    
+    def crop_marks(self, lines):
+        self.canv.setStrokeColorRGB(0, 0, 0)
+        self.canv.setLineWidth(MARK_WIDTH)
+        for x0, y0, x1, y1 in lines:
+            self.canv.line(x0, self.sheet_height - y0, x1, self.sheet_height - y1)
+    
+    def close(self):
+        self.canv.save()
+
+class FileSheetWriter:
+    """Place existing card PDFs or JPGs; identical resources are merged on save"""
+    
+    def __init__(self, path, layout):
+        self.path = path
+        self.layout = layout
+        self.doc = fitz.open()
+        self.page = None
+    
+    def new_sheet(self):
+        width, height = self.layout['sheet_size']
+        self.page = self.doc.new_page(width=width, height=height)
+    
+    def place(self, source, trim):
+        bleed = self.layout['bleed']
+        if source.lower().endswith('.pdf'):
+            with fitz.open(source) as src:
+                box = pdf_card_box(src[0])
+                self.page.show_pdf_page(fitz.Rect(trim), src, 0, clip=box)
+                for target, (u0, v0, u1, v1) in bleed_patches(trim, bleed):
+                    edge = fitz.Rect(box.x0 + u0 * box.width, box.y0 + v0 * box.height,
+                                     box.x0 + u1 * box.width, box.y0 + v1 * box.height)
+                    self.page.show_pdf_page(fitz.Rect(target), src, 0, clip=edge, keep_proportion=False)
+        else:
+            x0, y0, x1, y1 = trim
+            self.page.insert_image(fitz.Rect(x0 - bleed, y0 - bleed, x1 + bleed, y1 + bleed),
+                                   stream=cropped_jpg(source, bleed / (x1 - x0)))
+    
+    def crop_marks(self, lines):
+        shape = self.page.new_shape()
+        for x0, y0, x1, y1 in lines:
+            shape.draw_line((x0, y0), (x1, y1))
+        shape.finish(color=(0, 0, 0), width=MARK_WIDTH)
+        shape.commit()
+    
+    def close(self):
+        # garbage=4 merges duplicate objects such as the logo every card PDF embeds
+        self.doc.save(self.path, garbage=4, deflate=True)
+        self.doc.close()
+
+def pdf_card_box(page):
+    """Bounding box of everything drawn on a card PDF page"""
+    box = fitz.Rect()
+    for _, rect in page.get_bboxlog():
+        box |= fitz.Rect(rect)
+    return box if not box.is_empty else page.rect
+
+def jpg_card_box(jpg_path):
+    """Bounding box of the non-white area of a card JPG, found on a draft-decoded copy"""
+    img = Image.open(jpg_path)
+    full_width, full_height = img.size
+    img.draft('RGB', (full_width // 8, full_height // 8))
+    img = img.convert('RGB')
+    scale = full_width / img.width
+    diff = ImageChops.difference(img, Image.new('RGB', img.size, (255, 255, 255)))
+    bbox = diff.point(lambda value: 255 if value > 16 else 0).getbbox()
+    if not bbox:
+        return (0, 0, full_width, full_height)
+    return (max(0, int((bbox[0] - 1) * scale)), max(0, int((bbox[1] - 1) * scale)),
+            min(full_width, int((bbox[2] + 1) * scale)), min(full_height, int((bbox[3] + 1) * scale)))
+
+def cropped_jpg(jpg_path, bleed_fraction=0):
+    """
+    Card JPG cropped to its artwork, re-encoded in memory
+    Its edge pixels are repeated outward by bleed_fraction of the card width on every side
+    """
+    img = Image.open(jpg_path).convert('RGB')
+    img = img.crop(jpg_card_box(jpg_path))
+    pad = round(bleed_fraction * img.width)
+    if pad:
+        img = Image.fromarray(np.pad(np.asarray(img), ((pad, pad), (pad, pad), (0, 0)), mode='edge'))
+    buffer = io.BytesIO()
+    img.save(buffer, 'JPEG', quality=95)
+    return buffer.getvalue()
+
+def load_sources(source, deck_path=None):
+    """Return (items, card aspect ratio, writer class) for the chosen source"""
+    if source == 'deck':
+        cards = vector_master.load_cards(deck_path)
+        box_width, box_height = vector_master.card_box()
+        return cards, box_width / box_height, DeckSheetWriter
+    
+    files = sorted(glob.glob(f"printable_cards/bingo_card_*.{source}"))
+    if not files:
+        return [], 1, FileSheetWriter
+    if source == 'pdf':
+        with fitz.open(files[0]) as first:
+            box = pdf_card_box(first[0])
+        aspect = box.width / box.height
+    else:
+        x0, y0, x1, y1 = jpg_card_box(files[0])
+        aspect = (x1 - x0) / (y1 - y0)
+    return files, aspect, FileSheetWriter
+
+def impose(source='deck', preset='a4-4up', output_dir="printable_cards/imposed", deck_path=None,
+           stack_sheets=100, order='cut-stack', bleed_mm=3.0):
+    """Impose the whole deck, writing one PDF per cut stack"""
+    items, aspect, writer_class = load_sources(source, deck_path)
+    if not items:
+        print("No cards found to impose!")
+        return []
+    
+    layout = sheet_layout(preset, aspect, bleed=bleed_mm * mm)
+    marks = crop_mark_lines(layout)
+    per_sheet = len(layout['slots'])
+    os.makedirs(output_dir, exist_ok=True)
+    
+    print(f"Imposing {len(items)} cards {preset} ({per_sheet} per sheet, {order} order)...")
+    outputs = []
+    for stack_number, sheets in imposition_order(len(items), per_sheet, stack_sheets, order):
+        path = os.path.join(output_dir, f"{preset}_{stack_number:03d}.pdf")
+        writer = writer_class(path, layout)
+        for sheet in sheets:
+            writer.new_sheet()
+            for slot, index in zip(layout['slots'], sheet):
+                if index is not None:
+                    writer.place(items[index], slot)
+            writer.crop_marks(marks)
+        writer.close()
+        outputs.append(path)
+        print(f"Stack {stack_number}: {len(sheets)} sheets -> {path}")
+    
+    return outputs
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Impose bingo cards onto N-up print sheets")
+    parser.add_argument('--source', choices=['deck', 'pdf', 'jpg'], default='deck',
+                        help="Draw from deck data (default) or place existing printable_cards files")
+    parser.add_argument('--deck', help="JSON file of bingo_cards rows instead of the database")
+    parser.add_argument('--preset', choices=sorted(SHEET_PRESETS), default='a4-4up')
+    parser.add_argument('--stack-sheets', type=int, default=100,
+                        help="Sheets per cut stack (one output PDF per stack)")
+    parser.add_argument('--order', choices=['cut-stack', 'sequential'], default='cut-stack')
+    parser.add_argument('--bleed-mm', type=float, default=3.0)
+    parser.add_argument('--output-dir', default="printable_cards/imposed")
+    args = parser.parse_args()
+    
+    outputs = impose(args.source, args.preset, args.output_dir, args.deck,
+                     args.stack_sheets, args.order, args.bleed_mm)
+    if outputs:
+        print(f"\nSUCCESS! {len(outputs)} imposed PDF file(s) in {args.output_dir}/")
+        print("Cut each stack on the crop marks, then stack the piles left-to-right, top-to-bottom")
@@ -0,0 +1,697 @@
+"""
+Streaming writers for the large-format master poster
+Cards are fed one horizontal band (usually one row of cards) at a time, so peak
+memory stays at a few card rows no matter how big the grid is
+"""
+
+import io
+import math
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+# Flush compressed PNG data to disk in IDAT chunks of about this size
+PNG_CHUNK_SIZE = 1 << 20
+
+# TIFF strips hold this many scanlines each
+TIFF_ROWS_PER_STRIP = 64
+
+# Bands are serialized this many scanlines at a time to avoid copying a whole band
+BAND_SLICE_ROWS = 128
+
+# Square tile edge for tiled TIFF output
+TIFF_TILE_SIZE = 256
+
+# Raw RGB sizes above this switch the TIFF writer to BigTIFF (64-bit offsets)
+BIGTIFF_THRESHOLD = 0xF0000000
+
+# TIFF field types
+TIFF_SHORT = 3
+TIFF_LONG = 4
+TIFF_RATIONAL = 5
+TIFF_LONG8 = 16
+
+# TIFF compression codes
+TIFF_COMPRESSION = {
+    'none': 1,
+    'lzw': 5,
+    'deflate': 8,
+}
+
+def iter_band_slices(band, rows=BAND_SLICE_ROWS):
+    """Yield the raw RGB bytes of a band a few scanlines at a time"""
+    if band.mode != 'RGB':
+        band = band.convert('RGB')
+    for top in range(0, band.height, rows):
+        bottom = min(top + rows, band.height)
+        yield band.crop((0, top, band.width, bottom)).tobytes()
+
+def _png_chunk(chunk_type, data):
+    """Encode a single PNG chunk"""
+    crc = zlib.crc32(chunk_type + data) & 0xFFFFFFFF
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', crc)
+
+class StreamingPNGWriter:
+    """
+    Write an RGB PNG band by band without holding the full image
+    The image data is a raw deflate stream with the zlib header and Adler-32
+    trailer written by hand, so checkpoint() can end the file on a clean chunk
+    boundary and a later writer can pick the stream up from there (resume=)
+    """
+    
+    def __init__(self, path, width, height, compress_level=6, dpi=None, resume=None):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._stride = width * 3
+        self._compressor = zlib.compressobj(compress_level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self._adler = 1
+        self._pending = bytearray()
+        
+        if resume:
+            # Drop anything written after the checkpoint and continue the deflate stream
+            self._file = open(path, 'r+b')
+            self._file.truncate(resume['offset'])
+            self._file.seek(resume['offset'])
+            self.rows_written = resume['rows_written']
+            self._adler = resume['adler32']
+            return
+        
+        self._file = open(path, 'wb')
+        self._file.write(b'\x89PNG\r\n\x1a\n')
+        # 8-bit truecolor, no interlace
+        ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+        self._file.write(_png_chunk(b'IHDR', ihdr))
+        if dpi:
+            pixels_per_meter = int(round(dpi / 0.0254))
+            phys = struct.pack('>IIB', pixels_per_meter, pixels_per_meter, 1)
+            self._file.write(_png_chunk(b'pHYs', phys))
+        # zlib header (deflate, 32K window); the level bits are informational only
+        self._pending += b'\x78\x9c'
+    
+    def _compress(self, data):
+        self._adler = zlib.adler32(data, self._adler)
+        self._pending += self._compressor.compress(data)
+    
+    def write_band(self, band):
+        """Append a horizontal band (PIL image with the full poster width)"""
+        if band.width != self.width:
+            raise ValueError(f"Band width {band.width} does not match poster width {self.width}")
+        if self.rows_written + band.height > self.height:
+            raise ValueError("Band overflows the poster height")
+        
+        stride = self._stride
+        for chunk in iter_band_slices(band):
+            raw = memoryview(chunk)
+            for start in range(0, len(raw), stride):
+                # Filter type 0 (None) per scanline keeps encoding cheap
+                self._compress(b'\x00')
+                self._compress(raw[start:start + stride])
+            if len(self._pending) >= PNG_CHUNK_SIZE:
+                self._flush_pending()
+        
+        self.rows_written += band.height
+    
+    def _flush_pending(self):
+        if self._pending:
+            self._file.write(_png_chunk(b'IDAT', bytes(self._pending)))
+            self._pending = bytearray()
+    
+    def checkpoint(self):
+        """
+        Make everything written so far durable and return the state needed to resume
+        A full flush byte-aligns the deflate stream and drops back-references, so
+        a fresh compressor can continue it after a restart
+        """
+        self._pending += self._compressor.flush(zlib.Z_FULL_FLUSH)
+        self._flush_pending()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return {'rows_written': self.rows_written, 'offset': self._file.tell(), 'adler32': self._adler}
+    
+    def close(self):
+        """Pad any missing rows with white and finish the file"""
+        if self._file is None:
+            return
+        blank_row = b'\x00' + b'\xff' * self._stride
+        while self.rows_written < self.height:
+            self._compress(blank_row)
+            self.rows_written += 1
+            if len(self._pending) >= PNG_CHUNK_SIZE:
+                self._flush_pending()
+        
+        self._pending += self._compressor.flush()
+        self._pending += struct.pack('>I', self._adler & 0xFFFFFFFF)
+        self._flush_pending()
+        self._file.write(_png_chunk(b'IEND', b''))
+        self._file.close()
+        self._file = None
+    
+    def abort(self):
+        """Close the file unfinished, e.g. after an error, so it can be resumed from a checkpoint"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+def _pack_tiff_values(field_type, values):
+    """Pack TIFF field values, returning (count, bytes)"""
+    if field_type == TIFF_SHORT:
+        return len(values), struct.pack(f'<{len(values)}H', *values)
+    if field_type == TIFF_LONG:
+        return len(values), struct.pack(f'<{len(values)}I', *values)
+    if field_type == TIFF_LONG8:
+        return len(values), struct.pack(f'<{len(values)}Q', *values)
+    if field_type == TIFF_RATIONAL:
+        # Values are flattened numerator/denominator pairs
+        return len(values) // 2, struct.pack(f'<{len(values)}I', *values)
+    raise ValueError(f"Unsupported TIFF field type {field_type}")
+
+def write_tiff_header(f, bigtiff):
+    """Write a little-endian TIFF header with a zero first-IFD pointer"""
+    f.seek(0)
+    if bigtiff:
+        f.write(b'II+\x00' + struct.pack('<HHQ', 8, 0, 0))
+    else:
+        f.write(b'II*\x00' + struct.pack('<I', 0))
+
+def set_first_ifd(f, bigtiff, ifd_offset):
+    """Point the TIFF header at the first IFD"""
+    if bigtiff:
+        f.seek(8)
+        f.write(struct.pack('<Q', ifd_offset))
+    else:
+        f.seek(4)
+        f.write(struct.pack('<I', ifd_offset))
+
+def write_tiff_ifd(f, entries, bigtiff, next_ifd=0):
+    """
+    Append an IFD to the end of the file and return its offset
+    entries is a list of (tag, field_type, values); values that do not fit
+    inline are stored right after the IFD
+    """
+    f.seek(0, os.SEEK_END)
+    if f.tell() % 2:
+        f.write(b'\x00')
+    ifd_offset = f.tell()
+    
+    if bigtiff:
+        count_fmt, entry_fmt, offset_fmt, inline_size = '<Q', '<HHQ', '<Q', 8
+    else:
+        count_fmt, entry_fmt, offset_fmt, inline_size = '<H', '<HHI', '<I', 4
+    
+    entries = sorted(entries, key=lambda entry: entry[0])
+    ifd_size = (struct.calcsize(count_fmt)
+                + len(entries) * (struct.calcsize(entry_fmt) + inline_size)
+                + struct.calcsize(offset_fmt))
+    
+    ifd = bytearray(struct.pack(count_fmt, len(entries)))
+    extra = bytearray()
+    for tag, field_type, values in entries:
+        count, data = _pack_tiff_values(field_type, values)
+        ifd += struct.pack(entry_fmt, tag, field_type, count)
+        if len(data) <= inline_size:
+            ifd += data.ljust(inline_size, b'\x00')
+        else:
+            if len(extra) % 2:
+                extra += b'\x00'
+            ifd += struct.pack(offset_fmt, ifd_offset + ifd_size + len(extra))
+            extra += data
+    ifd += struct.pack(offset_fmt, next_ifd)
+    
+    f.write(ifd)
+    f.write(extra)
+    return ifd_offset
+
+def tiff_rgb_entries(width, height, compression, dpi=None):
+    """IFD entries shared by every RGB TIFF layout we write"""
+    entries = [
+        (256, TIFF_LONG, [width]),
+        (257, TIFF_LONG, [height]),
+        (258, TIFF_SHORT, [8, 8, 8]),
+        (259, TIFF_SHORT, [TIFF_COMPRESSION[compression]]),
+        (262, TIFF_SHORT, [2]),        # RGB
+        (277, TIFF_SHORT, [3]),
+        (284, TIFF_SHORT, [1]),        # Chunky pixels
+    ]
+    if dpi:
+        entries += [
+            (282, TIFF_RATIONAL, [int(dpi), 1]),
+            (283, TIFF_RATIONAL, [int(dpi), 1]),
+            (296, TIFF_SHORT, [2]),    # Inches
+        ]
+    return entries
+
+class StreamingTIFFWriter:
+    """Write a striped, deflate-compressed RGB TIFF band by band"""
+    
+    def __init__(self, path, width, height, compress_level=6, dpi=None, bigtiff=None):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.dpi = dpi
+        self.compress_level = compress_level
+        self.rows_written = 0
+        if bigtiff is None:
+            bigtiff = width * height * 3 > BIGTIFF_THRESHOLD
+        self.bigtiff = bigtiff
+        self._stride = width * 3
+        self._buffer = bytearray()
+        self._strip_offsets = []
+        self._strip_byte_counts = []
+        self._file = open(path, 'wb+')
+        write_tiff_header(self._file, bigtiff)
+    
+    def write_band(self, band):
+        """Append a horizontal band (PIL image with the full poster width)"""
+        if band.width != self.width:
+            raise ValueError(f"Band width {band.width} does not match poster width {self.width}")
+        if self.rows_written + band.height > self.height:
+            raise ValueError("Band overflows the poster height")
+        
+        strip_bytes = self._stride * TIFF_ROWS_PER_STRIP
+        for chunk in iter_band_slices(band):
+            self._buffer += chunk
+            if len(self._buffer) >= strip_bytes:
+                full = len(self._buffer) - len(self._buffer) % strip_bytes
+                for start in range(0, full, strip_bytes):
+                    self._write_strip(self._buffer[start:start + strip_bytes])
+                del self._buffer[:full]
+        self.rows_written += band.height
+    
+    def _write_strip(self, raw):
+        data = zlib.compress(raw, self.compress_level)
+        self._file.seek(0, os.SEEK_END)
+        self._strip_offsets.append(self._file.tell())
+        self._strip_byte_counts.append(len(data))
+        self._file.write(data)
+    
+    def close(self):
+        """Pad any missing rows with white, write the IFD and finish the file"""
+        if self._file is None:
+            return
+        missing_rows = self.height - self.rows_written
+        if missing_rows > 0:
+            self._buffer += b'\xff' * (self._stride * missing_rows)
+            self.rows_written = self.height
+        
+        strip_bytes = self._stride * TIFF_ROWS_PER_STRIP
+        for start in range(0, len(self._buffer), strip_bytes):
+            self._write_strip(self._buffer[start:start + strip_bytes])
+        self._buffer = bytearray()
+        
+        offset_type = TIFF_LONG8 if self.bigtiff else TIFF_LONG
+        entries = tiff_rgb_entries(self.width, self.height, 'deflate', self.dpi) + [
+            (273, offset_type, self._strip_offsets),
+            (278, TIFF_LONG, [TIFF_ROWS_PER_STRIP]),
+            (279, offset_type, self._strip_byte_counts),
+        ]
+        ifd_offset = write_tiff_ifd(self._file, entries, self.bigtiff)
+        set_first_ifd(self._file, self.bigtiff, ifd_offset)
+        self._file.close()
+        self._file = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def encode_tiff_tile(raw, compression, tile_size, compress_level=6):
+    """Compress one tile's raw RGB bytes for the given TIFF compression"""
+    if compression == 'deflate':
+        return zlib.compress(raw, compress_level)
+    if compression == 'lzw':
+        # Let Pillow's libtiff encoder do LZW on a single-strip tile, then lift the strip out
+        tile = Image.frombytes('RGB', (tile_size, tile_size), raw)
+        buffer = io.BytesIO()
+        tile.save(buffer, 'TIFF', compression='tiff_lzw', strip_size=len(raw) + 1)
+        buffer.seek(0)
+        encoded = Image.open(buffer)
+        offset = encoded.tag_v2[273][0]
+        length = encoded.tag_v2[279][0]
+        return buffer.getvalue()[offset:offset + length]
+    if compression == 'none':
+        return bytes(raw)
+    raise ValueError(f"Unsupported TIFF compression: {compression}")
+
+def decode_tiff_tile(data, compression, tile_size):
+    """Decode one compressed tile back into a PIL image"""
+    if compression == 'deflate':
+        return Image.frombytes('RGB', (tile_size, tile_size), zlib.decompress(data))
+    if compression == 'none':
+        return Image.frombytes('RGB', (tile_size, tile_size), data)
+    
+    # Wrap the tile in a one-strip TIFF so Pillow can decode it
+    buffer = io.BytesIO()
+    write_tiff_header(buffer, False)
+    buffer.write(data)
+    entries = tiff_rgb_entries(tile_size, tile_size, compression) + [
+        (273, TIFF_LONG, [8]),
+        (278, TIFF_LONG, [tile_size]),
+        (279, TIFF_LONG, [len(data)]),
+    ]
+    set_first_ifd(buffer, False, write_tiff_ifd(buffer, entries, False))
+    buffer.seek(0)
+    tile = Image.open(buffer)
+    tile.load()
+    return tile.convert('RGB')
+
+class _TiledLevel:
+    """One resolution level of a tiled TIFF that is still being written"""
+    
+    def __init__(self, width, height, tile_size):
+        self.width = width
+        self.height = height
+        self.tiles_across = math.ceil(width / tile_size)
+        self.tiles_down = math.ceil(height / tile_size)
+        self.offsets = []
+        self.byte_counts = []
+        self.rows = bytearray()
+        self.rows_received = 0
+
+class TiledTIFFWriter:
+    """
+    Write a tiled, compressed RGB BigTIFF band by band
+    Tiles of each completed tile row are compressed in parallel. With pyramid=True
+    every tile row is also downsampled 2x into reduced-resolution IFDs, so viewers
+    and RIPs can open the poster without decoding the full-size image.
+    """
+    
+    def __init__(self, path, width, height, compression='deflate', tile_size=TIFF_TILE_SIZE,
+                 pyramid=False, dpi=None, bigtiff=True, workers=None, compress_level=6, resume=None):
+        if compression not in TIFF_COMPRESSION:
+            raise ValueError(f"Unsupported TIFF compression: {compression}")
+        self.path = path
+        self.width = width
+        self.height = height
+        self.compression = compression
+        self.tile_size = tile_size
+        self.dpi = dpi
+        self.bigtiff = bigtiff
+        self.compress_level = compress_level
+        self.rows_written = 0
+        
+        self.levels = [_TiledLevel(width, height, tile_size)]
+        while pyramid and max(self.levels[-1].width, self.levels[-1].height) > tile_size:
+            previous = self.levels[-1]
+            self.levels.append(_TiledLevel(math.ceil(previous.width / 2),
+                                           math.ceil(previous.height / 2), tile_size))
+        
+        self._pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count())
+        if resume:
+            self._resume(resume)
+        else:
+            self._file = open(path, 'wb+')
+            write_tiff_header(self._file, bigtiff)
+    
+    @property
+    def pending_path(self):
+        """Side file holding rows that don't fill a tile row yet at each checkpoint"""
+        return self.path + '.pending'
+    
+    def checkpoint(self):
+        """
+        Make everything written so far durable and return the state needed to resume
+        Finished tiles stay in the TIFF; rows waiting for the next tile row at each
+        level are saved next to it
+        """
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        
+        temp_path = self.pending_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            for level in self.levels:
+                f.write(level.rows)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.pending_path)
+        
+        return {
+            'rows_written': self.rows_written,
+            'offset': self._file.seek(0, os.SEEK_END),
+            'levels': [{'offsets': level.offsets, 'byte_counts': level.byte_counts,
+                        'rows_received': level.rows_received, 'pending_bytes': len(level.rows)}
+                       for level in self.levels],
+        }
+    
+    def _resume(self, state):
+        if len(state['levels']) != len(self.levels):
+            raise ValueError("Checkpoint was taken with a different pyramid setting")
+        self._file = open(self.path, 'r+b')
+        self._file.truncate(state['offset'])
+        self.rows_written = state['rows_written']
+        
+        with open(self.pending_path, 'rb') as f:
+            for level, saved in zip(self.levels, state['levels']):
+                level.offsets = list(saved['offsets'])
+                level.byte_counts = list(saved['byte_counts'])
+                level.rows_received = saved['rows_received']
+                level.rows = bytearray(f.read(saved['pending_bytes']))
+                if len(level.rows) != saved['pending_bytes']:
+                    raise ValueError(f"Pending rows file {self.pending_path} is truncated")
+    
+    def write_band(self, band):
+        """Append a horizontal band (PIL image with the full poster width)"""
+        if band.width != self.width:
+            raise ValueError(f"Band width {band.width} does not match poster width {self.width}")
+        if self.rows_written + band.height > self.height:
+            raise ValueError("Band overflows the poster height")
+        
+        for chunk in iter_band_slices(band):
+            self._feed(0, chunk)
+        self.rows_written += band.height
+    
+    def _feed(self, level_index, raw_rows):
+        level = self.levels[level_index]
+        stride = level.width * 3
+        level.rows += raw_rows
+        level.rows_received += len(raw_rows) // stride
+        
+        tile_row_bytes = stride * self.tile_size
+        while len(level.rows) >= tile_row_bytes:
+            tile_row = bytes(level.rows[:tile_row_bytes])
+            del level.rows[:tile_row_bytes]
+            self._write_tile_row(level_index, tile_row, self.tile_size)
+    
+    def _write_tile_row(self, level_index, raw_rows, row_count):
+        level = self.levels[level_index]
+        tile_size = self.tile_size
+        strip = Image.frombytes('RGB', (level.width, row_count), raw_rows)
+        
+        # Edge tiles are padded with white to the full tile size
+        tiles = []
+        for col in range(level.tiles_across):
+            left = col * tile_size
+            tile = Image.new('RGB', (tile_size, tile_size), (255, 255, 255))
+            tile.paste(strip.crop((left, 0, min(left + tile_size, level.width), row_count)), (0, 0))
+            tiles.append(tile.tobytes())
+        
+        encoded = self._pool.map(
+            lambda raw: encode_tiff_tile(raw, self.compression, tile_size, self.compress_level),
+            tiles,
+        )
+        self._file.seek(0, os.SEEK_END)
+        for data in encoded:
+            level.offsets.append(self._file.tell())
+            level.byte_counts.append(len(data))
+            self._file.write(data)
+        
+        if level_index + 1 < len(self.levels):
+            self._feed(level_index + 1, strip.reduce(2).tobytes())
+    
+    def close(self):
+        """Pad missing rows, flush partial tile rows at every level and write the IFDs"""
+        if self._file is None:
+            return
+        missing_rows = self.height - self.rows_written
+        if missing_rows > 0:
+            self._feed(0, b'\xff' * (self.width * 3 * missing_rows))
+            self.rows_written = self.height
+        
+        # Flush partial tile rows top-down so each one cascades into the next level
+        for level_index, level in enumerate(self.levels):
+            if level.rows:
+                row_count = len(level.rows) // (level.width * 3)
+                tile_row = bytes(level.rows)
+                level.rows = bytearray()
+                self._write_tile_row(level_index, tile_row, row_count)
+        self._pool.shutdown()
+        
+        offset_type = TIFF_LONG8 if self.bigtiff else TIFF_LONG
+        next_ifd = 0
+        for level_index in reversed(range(len(self.levels))):
+            level = self.levels[level_index]
+            entries = tiff_rgb_entries(level.width, level.height, self.compression, self.dpi) + [
+                (254, TIFF_LONG, [1 if level_index else 0]),    # Reduced-resolution image
+                (322, TIFF_LONG, [self.tile_size]),
+                (323, TIFF_LONG, [self.tile_size]),
+                (324, offset_type, level.offsets),
+                (325, offset_type, level.byte_counts),
+            ]
+            next_ifd = write_tiff_ifd(self._file, entries, self.bigtiff, next_ifd)
+        set_first_ifd(self._file, self.bigtiff, next_ifd)
+        self._file.close()
+        self._file = None
+        if os.path.exists(self.pending_path):
+            os.remove(self.pending_path)
+    
+    def abort(self):
+        """Close the file unfinished, e.g. after an error, so it can be resumed from a checkpoint"""
+        if self._file is not None:
+            self._pool.shutdown()
+            self._file.close()
+            self._file = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+def _read_tiff_value_location(f, bigtiff, entry_offset):
+    """Return (field_type, count, file offset of the values) for an IFD entry"""
+    f.seek(entry_offset)
+    if bigtiff:
+        tag, field_type, count = struct.unpack('<HHQ', f.read(12))
+        inline_size, value_fmt = 8, '<Q'
+    else:
+        tag, field_type, count = struct.unpack('<HHI', f.read(8))
+        inline_size, value_fmt = 4, '<I'
+    item_size = {TIFF_SHORT: 2, TIFF_LONG: 4, TIFF_RATIONAL: 8, TIFF_LONG8: 8}.get(field_type, 1)
+    if item_size * count <= inline_size:
+        return field_type, count, f.tell()
+    return field_type, count, struct.unpack(value_fmt, f.read(inline_size))[0]
+
+def _read_tiff_array(f, field_type, count, offset):
+    f.seek(offset)
+    fmt = {TIFF_SHORT: 'H', TIFF_LONG: 'I', TIFF_LONG8: 'Q'}[field_type]
+    return list(struct.unpack(f'<{count}{fmt}', f.read(count * struct.calcsize(fmt))))
+
+def read_tiled_tiff_levels(f):
+    """Read the layout of every tiled level (IFD) of a TIFF we wrote"""
+    f.seek(0)
+    header = f.read(16)
+    bigtiff = header[2:4] == b'+\x00'
+    if header[:2] != b'II':
+        raise ValueError("Only little-endian TIFF files are supported")
+    if bigtiff:
+        count_fmt, entry_size, offset_fmt = '<Q', 20, '<Q'
+        ifd_offset = struct.unpack('<Q', header[8:16])[0]
+    else:
+        count_fmt, entry_size, offset_fmt = '<H', 12, '<I'
+        ifd_offset = struct.unpack('<I', header[4:8])[0]
+    
+    levels = []
+    while ifd_offset:
+        f.seek(ifd_offset)
+        entry_count = struct.unpack(count_fmt, f.read(struct.calcsize(count_fmt)))[0]
+        first_entry = ifd_offset + struct.calcsize(count_fmt)
+        fields = {}
+        for index in range(entry_count):
+            entry_offset = first_entry + index * entry_size
+            f.seek(entry_offset)
+            tag = struct.unpack('<H', f.read(2))[0]
+            fields[tag] = _read_tiff_value_location(f, bigtiff, entry_offset)
+        
+        def value(tag):
+            return _read_tiff_array(f, *fields[tag])[0]
+        
+        if 322 not in fields:
+            raise ValueError("TIFF is not tiled")
+        compression = {code: name for name, code in TIFF_COMPRESSION.items()}[value(259)]
+        levels.append({
+            'bigtiff': bigtiff,
+            'width': value(256),
+            'height': value(257),
+            'tile_size': value(322),
+            'compression': compression,
+            'offsets_field': fields[324],
+            'byte_counts_field': fields[325],
+        })
+        f.seek(first_entry + entry_count * entry_size)
+        ifd_offset = struct.unpack(offset_fmt, f.read(struct.calcsize(offset_fmt)))[0]
+    return levels
+
+def replace_tiff_region(path, left, top, image):
+    """
+    Replace one region (e.g. a single card) of a tiled TIFF in place
+    Only the tiles the region touches are re-encoded, at every pyramid level.
+    New tile data is appended and the tile offset tables are patched where they
+    are, so the rest of the poster is never decoded or rewritten.
+    """
+    image = image.convert('RGB')
+    with open(path, 'rb+') as f:
+        levels = read_tiled_tiff_levels(f)
+        full_width = levels[0]['width']
+        
+        for level in levels:
+            scale = full_width / level['width']
+            tile_size = level['tile_size']
+            level_left = int(round(left / scale))
+            level_top = int(round(top / scale))
+            level_right = min(int(round((left + image.width) / scale)), level['width'])
+            level_bottom = min(int(round((top + image.height) / scale)), level['height'])
+            if level_right <= level_left or level_bottom <= level_top:
+                continue
+            region = image if scale == 1 else image.resize(
+                (level_right - level_left, level_bottom - level_top), Image.Resampling.BOX)
+            
+            offsets_type, tile_count, offsets_at = level['offsets_field']
+            counts_type, _, counts_at = level['byte_counts_field']
+            offsets = _read_tiff_array(f, offsets_type, tile_count, offsets_at)
+            byte_counts = _read_tiff_array(f, counts_type, tile_count, counts_at)
+            tiles_across = math.ceil(level['width'] / tile_size)
+            offset_fmt = '<Q' if offsets_type == TIFF_LONG8 else '<I'
+            count_fmt = '<Q' if counts_type == TIFF_LONG8 else '<I'
+            
+            for tile_row in range(level_top // tile_size, (level_bottom - 1) // tile_size + 1):
+                for tile_col in range(level_left // tile_size, (level_right - 1) // tile_size + 1):
+                    index = tile_row * tiles_across + tile_col
+                    f.seek(offsets[index])
+                    tile = decode_tiff_tile(f.read(byte_counts[index]), level['compression'], tile_size)
+                    tile.paste(region, (level_left - tile_col * tile_size,
+                                        level_top - tile_row * tile_size))
+                    data = encode_tiff_tile(tile.tobytes(), level['compression'], tile_size)
+                    
+                    f.seek(0, os.SEEK_END)
+                    new_offset = f.tell()
+                    f.write(data)
+                    f.seek(offsets_at + index * struct.calcsize(offset_fmt))
+                    f.write(struct.pack(offset_fmt, new_offset))
+                    f.seek(counts_at + index * struct.calcsize(count_fmt))
+                    f.write(struct.pack(count_fmt, len(data)))
+
+def open_master_writer(path, width, height, dpi=None, tiled=False, compression='deflate', pyramid=False,
+                       resume=None):
+    """
+    Pick a streaming writer from the file extension (.png, .tif/.tiff)
+    TIFF output is striped by default; tiled=True writes a tiled BigTIFF.
+    resume takes a state returned by the writer's checkpoint() (PNG and tiled TIFF only).
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.png':
+        return StreamingPNGWriter(path, width, height, dpi=dpi, resume=resume)
+    if extension in ('.tif', '.tiff'):
+        if tiled:
+            return TiledTIFFWriter(path, width, height, compression=compression,
+                                   pyramid=pyramid, dpi=dpi, resume=resume)
+        if resume:
+            raise ValueError("Striped TIFF output cannot be resumed")
+        return StreamingTIFFWriter(path, width, height, dpi=dpi)
+    raise ValueError(f"Unsupported master poster format: {extension}")
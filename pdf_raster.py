@@ -0,0 +1,90 @@
+"""
+Rasterize card PDFs straight to their final pixel sizes
+Each page is rendered once per requested size with PyMuPDF, the pixmap memory is
+wrapped for PIL without a PPM round trip, and pages run in a process pool
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+import fitz  # PyMuPDF
+
+from render_jobs import atomic_output
+from card_metadata import parse_metadata_text
+
+WHITE = (255, 255, 255)
+
+def render_page_to_size(page, width, height, background=WHITE):
+    """
+    Render a PDF page at exactly width x height pixels
+    The page is scaled uniformly to fit and centered, so the aspect ratio is kept
+    and no resampling pass is needed afterwards
+    """
+    page_rect = page.rect
+    zoom = min(width / page_rect.width, height / page_rect.height)
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    
+    # Wrap the pixmap samples directly (no encode/decode) and copy once into the output
+    rendered = Image.frombuffer('RGB', (pix.width, pix.height), pix.samples_mv,
+                                'raw', 'RGB', pix.stride, 1)
+    canvas = Image.new('RGB', (width, height), background)
+    canvas.paste(rendered, ((width - pix.width) // 2, (height - pix.height) // 2))
+    del rendered, pix
+    return canvas
+
+def rasterize_card(job):
+    """
+    Render one card PDF for every requested output
+    job is (pdf_path, outputs) where each output is (width, height, jpg_path, keep).
+    JPGs are written here in the worker (via a temp file, so an interrupted
+    run never leaves a truncated JPG); outputs with keep=True come back as
+    (width, height, raw RGB bytes) so the caller can place them in a master band.
+    Returns None if the PDF could not be rendered.
+    """
+    pdf_path, outputs = job
+    kept = []
+    try:
+        with fitz.open(pdf_path) as doc:
+            page = doc[0]
+            # JPGs inherit the card digest embedded in the source PDF
+            subject = (doc.metadata or {}).get('subject')
+            save_options = {'comment': subject.encode('ascii')} if parse_metadata_text(subject) else {}
+            rendered = {}
+            for width, height, jpg_path, keep in outputs:
+                # Outputs that share a size share one render
+                if (width, height) not in rendered:
+                    rendered[(width, height)] = render_page_to_size(page, width, height)
+                img = rendered[(width, height)]
+                if jpg_path:
+                    with atomic_output(jpg_path) as temp_path:
+                        img.save(temp_path, 'JPEG', quality=95, optimize=True, **save_options)
+                if keep:
+                    kept.append((width, height, img.tobytes()))
+    except Exception as e:
+        print(f"Error rasterizing {pdf_path}: {e}")
+        return None
+    return kept
+
+def kept_image(result):
+    """Wrap a kept (width, height, bytes) output as a PIL image without copying"""
+    width, height, raw = result
+    return Image.frombuffer('RGB', (width, height), raw, 'raw', 'RGB', 0, 1)
+
+def rasterize_cards(jobs, workers=None):
+    """
+    Yield rasterize_card() results in job order using a process pool
+    At most a couple of jobs per worker are in flight, so memory stays bounded
+    even when the kept outputs are full-size cards
+    """
+    workers = workers or os.cpu_count()
+    jobs = iter(jobs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for job in jobs:
+            in_flight.append(pool.submit(rasterize_card, job))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Print bingo cards on 58/80 mm ESC/POS thermal receipt printers
+Cards are built directly as 1-bit rasters at printer width from the card layout:
+the static template is thresholded once and card text is stamped from 1-bit glyph tiles
+"""
+
+import sys
+import json
+import time
+import argparse
+import importlib
+import numpy as np
+from PIL import Image, ImageDraw
+
+from card_layout import DEFAULT_LAYOUT, PILRenderer, compile_layout, load_layout, card_values
+
+png_cards = importlib.import_module('generate-png-cards')
+
+# Printable width in dots at 203 dpi
+PAPER_WIDTHS = {'58': 384, '80': 576}
+
+# Luminance below this prints black; colored circles and headers come out solid
+# with their white letters knocked out
+THRESHOLD = 200
+
+# Raster rows per GS v 0 command; some printers reject taller images
+BAND_ROWS = 256
+
+ESC_INIT = b'\x1b@'
+ESC_FEED = b'\x1bd\x04'   # feed 4 lines so the card clears the tear bar
+GS_CUT = b'\x1dV\x01'     # partial cut; ignored by printers without a cutter
+
+class GlyphTiles:
+    """1-bit glyph bitmaps for one font, rendered on first use and kept for the process"""
+    
+    def __init__(self, font):
+        self.font = font
+        self.ascent, self.descent = font.getmetrics()
+        self.tiles = {}
+    
+    def tile(self, char):
+        """(bitmap, left padding, advance) for one character"""
+        tile = self.tiles.get(char)
+        if tile is None:
+            advance = self.font.getlength(char)
+            pad = self.ascent // 4  # room for glyphs that overhang their advance
+            img = Image.new('L', (int(advance) + 2 * pad + 1, self.ascent + self.descent), 0)
+            ImageDraw.Draw(img).text((pad, self.ascent), char, fill=255, font=self.font, anchor='ls')
+            tile = (np.asarray(img) >= 128, pad, advance)
+            self.tiles[char] = tile
+        return tile
+    
+    def width(self, text):
+        return sum(self.tile(char)[2] for char in text)
+
+class ThermalRenderer:
+    """
+    Renders cards as 1-bit numpy rasters (True = black) at printer width
+    The layout's static ops are rendered once through PILRenderer and thresholded;
+    images (the logo) are dithered instead so they keep their shading
+    """
+    
+    def __init__(self, display_list, width_dots):
+        self.display_list = display_list
+        # Stay on whole bytes: ESC/POS and PBM rows are packed 8 dots to a byte
+        self.width = width_dots - width_dots % 8
+        self.scale = self.width / display_list.width
+        renderer = PILRenderer(display_list, self.scale)
+        self.template = self._threshold(renderer.base)
+        self.glyphs = {name: GlyphTiles(font) for name, font in renderer.fonts.items()}
+        self.height = self.template.shape[0]
+    
+    def _threshold(self, base):
+        gray = base.convert('L')
+        bits = np.asarray(gray) < THRESHOLD
+        for op in self.display_list.static:
+            if op[0] == 'image':
+                s = self.scale
+                box = (round(op[2] * s), round(op[3] * s), round(op[4] * s), round(op[5] * s))
+                dithered = np.asarray(gray.crop(box).convert('1')) == 0
+                bits[box[1]:box[3], box[0]:box[2]] = dithered
+        # The raster may be a few dots narrower than the layout after rounding to bytes
+        padded = np.zeros((bits.shape[0], self.width), dtype=bool)
+        padded[:, :min(self.width, bits.shape[1])] = bits[:, :self.width]
+        return padded
+    
+    def render(self, card_data):
+        """One card as a (height, width) bool array"""
+        bits = self.template.copy()
+        values = card_values(card_data)
+        s = self.scale
+        for op in self.display_list.variable:
+            x, y, text, font, fill, anchor = op[1:7]
+            # Dark text is inked; light text (e.g. white on a colored box) is knocked out
+            ink = sum(fill) < 3 * THRESHOLD
+            self._stamp(bits, text.format(**values), self.glyphs[font], x * s, y * s, anchor, ink)
+        return bits
+    
+    def _stamp(self, bits, text, glyphs, x, y, anchor, ink):
+        """Draw text with y at its vertical middle, like PIL's 'lm'/'mm' anchors"""
+        pen = x - glyphs.width(text) / 2 if anchor == 'middle' else x
+        top = round(y + (glyphs.ascent - glyphs.descent) / 2) - glyphs.ascent
+        for char in text:
+            tile, pad, advance = glyphs.tile(char)
+            left = round(pen) - pad
+            height, width = tile.shape
+            # Clip to the raster
+            x0, y0 = max(left, 0), max(top, 0)
+            x1, y1 = min(left + width, bits.shape[1]), min(top + height, bits.shape[0])
+            if x0 < x1 and y0 < y1:
+                mask = tile[y0 - top:y1 - top, x0 - left:x1 - left]
+                region = bits[y0:y1, x0:x1]
+                if ink:
+                    region |= mask
+                else:
+                    region &= ~mask
+            pen += advance
+
+def pbm_bytes(bits):
+    """Binary PBM (P4): 1 is black, rows packed MSB first"""
+    height, width = bits.shape
+    return f"P4\n{width} {height}\n".encode('ascii') + np.packbits(bits, axis=1).tobytes()
+
+def escpos_bytes(bits, cut=True):
+    """ESC/POS GS v 0 raster image in bands of BAND_ROWS, then feed and cut"""
+    packed = np.packbits(bits, axis=1)
+    row_bytes = packed.shape[1]
+    out = bytearray(ESC_INIT)
+    for start in range(0, packed.shape[0], BAND_ROWS):
+        band = packed[start:start + BAND_ROWS]
+        out += b'\x1dv0\x00' + bytes([row_bytes & 0xff, row_bytes >> 8, len(band) & 0xff, len(band) >> 8])
+        out += band.tobytes()
+    out += ESC_FEED
+    if cut:
+        out += GS_CUT
+    return bytes(out)
+
+def thermal_renderer(paper='80', layout_path=DEFAULT_LAYOUT):
+    """Renderer for a paper width, using the same layout as generate-png-cards.py"""
+    return ThermalRenderer(compile_layout(load_layout(layout_path)), PAPER_WIDTHS[paper])
+
+def print_thermal_cards(cards, output, output_format='escpos', paper='80', layout_path=DEFAULT_LAYOUT, cut=True):
+    """
+    Write cards to output (a file, or a printer device such as /dev/usb/lp0)
+    ESC/POS output is one print job per card; PBM writes one image per card,
+    concatenated (PBM readers accept multi-image files)
+    """
+    renderer = thermal_renderer(paper, layout_path)
+    timings = []
+    
+    with open(output, 'wb') as f:
+        for card in cards:
+            start = time.perf_counter()
+            bits = renderer.render(card)
+            data = escpos_bytes(bits, cut) if output_format == 'escpos' else pbm_bytes(bits)
+            timings.append(time.perf_counter() - start)
+            f.write(data)
+            f.flush()
+    
+    return renderer, timings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print bingo cards on an ESC/POS thermal printer")
+    parser.add_argument('cards', nargs='*', type=int, help="Card numbers to print (default: all)")
+    parser.add_argument('--output', required=True,
+                        help="Output file, or the printer device (e.g. /dev/usb/lp0)")
+    parser.add_argument('--format', choices=['escpos', 'pbm'], default='escpos')
+    parser.add_argument('--paper', choices=sorted(PAPER_WIDTHS), default='80', help="Paper width in mm")
+    parser.add_argument('--no-cut', action='store_true', help="Don't send the cut command")
+    parser.add_argument('--layout', default=DEFAULT_LAYOUT, help="Layout spec JSON")
+    parser.add_argument('--deck', help="JSON file of bingo_cards rows instead of the database")
+    args = parser.parse_args()
+    
+    if args.deck:
+        with open(args.deck) as f:
+            cards = json.load(f)
+    else:
+        print("Fetching bingo cards from database...")
+        cards = png_cards.fetch_bingo_cards()
+    
+    if args.cards:
+        wanted = set(args.cards)
+        cards = [card for card in cards if card['card_number'] in wanted]
+    
+    if not cards:
+        print("No cards found!")
+        sys.exit(1)
+    
+    renderer, timings = print_thermal_cards(cards, args.output, args.format, args.paper, args.layout, not args.no_cut)
+    average_ms = sum(timings) / len(timings) * 1000
+    print(f"🧾 {len(cards)} card(s), {renderer.width}x{renderer.height} dots, {average_ms:.2f} ms per card")
+    print(f"SUCCESS! Written to {args.output}")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Render bingo cards from a layout spec (layouts/*.json) to PNG, JPG, PDF or SVG
+The layout is compiled once into a display list and replayed per card
+"""
+
+import os
+import json
+import argparse
+import importlib
+
+from card_layout import DEFAULT_LAYOUT, PDFRenderer, PILRenderer, compile_layout, load_layout
+from card_metadata import save_card_image
+
+png_cards = importlib.import_module('generate-png-cards')
+svg_cards = importlib.import_module('generate-svg-cards')
+
+def render_layout_cards(cards, output_format, output_dir, layout_path=DEFAULT_LAYOUT, scale=1.0):
+    """Render every card in the chosen format; returns the number of files written"""
+    os.makedirs(output_dir, exist_ok=True)
+    display_list = compile_layout(load_layout(layout_path))
+    
+    if output_format == 'pdf':
+        path = os.path.join(output_dir, f"{display_list.name}_cards.pdf")
+        PDFRenderer(display_list, scale).render_deck(cards, path)
+        print(f"Generated PDF: {path} ({len(cards)} pages)")
+        return 1
+    
+    if output_format == 'svg':
+        paths = svg_cards.generate_svg_cards(cards, output_dir, per_card=True, layout_path=layout_path)
+        return len(paths)
+    
+    renderer = PILRenderer(display_list, scale)
+    for card in cards:
+        path = os.path.join(output_dir, f"bingo_card_{card['card_number']:03d}.{output_format}")
+        if output_format == 'jpg':
+            save_card_image(renderer.render(card), path, card, 'JPEG', quality=95)
+        else:
+            save_card_image(renderer.render(card), path, card, 'PNG')
+    return len(cards)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render bingo cards from a layout spec")
+    parser.add_argument('--format', choices=['png', 'jpg', 'pdf', 'svg'], default='png')
+    parser.add_argument('--layout', default=DEFAULT_LAYOUT, help="Layout spec JSON")
+    parser.add_argument('--deck', help="JSON file of bingo_cards rows instead of the database")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="Output size relative to the layout units (pixels or points)")
+    parser.add_argument('--output-dir', default="printable_cards/layout")
+    args = parser.parse_args()
+    
+    if args.deck:
+        with open(args.deck) as f:
+            cards = json.load(f)
+    else:
+        print("Fetching bingo cards from database...")
+        cards = png_cards.fetch_bingo_cards()
+    
+    if not cards:
+        print("No cards found!")
+    else:
+        count = render_layout_cards(cards, args.format, args.output_dir, args.layout, args.scale)
+        print(f"\nSUCCESS! {count} {args.format.upper()} file(s) in {args.output_dir}/")
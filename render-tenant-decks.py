@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Render branded copies of the deck for each tenant
+Branding (title, price, logo, colors) comes from a JSON file and fills the layout
+params; each tenant's static template is rendered once and cached by content hash
+"""
+
+import os
+import re
+import json
+import time
+import argparse
+import importlib
+
+from card_layout import (DEFAULT_LAYOUT, TEMPLATE_CACHE_DIR, PDFRenderer, PILRenderer,
+                         compile_layout, load_layout)
+from card_metadata import save_card_image
+
+png_cards = importlib.import_module('generate-png-cards')
+
+OUTPUT_DIR = "printable_cards/tenants"
+
+# Branding keys a tenant entry may set; anything else in the entry is ignored
+BRANDING_KEYS = ['title', 'price', 'logo', 'colors']
+
+def tenant_slug(name):
+    """Directory-safe tenant name"""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+def load_tenants(path):
+    """Tenant branding entries from JSON; only 'tenant' is required"""
+    with open(path) as f:
+        tenants = json.load(f)
+    for entry in tenants:
+        if not entry.get('tenant'):
+            raise ValueError(f"Tenant entry without a 'tenant' name in {path}: {entry}")
+    return tenants
+
+def render_tenant_deck(cards, tenant, spec, output_format, output_dir, scale=1.0, cache_dir=TEMPLATE_CACHE_DIR):
+    """Render one tenant's deck; returns (number of files, template key)"""
+    branding = {key: tenant[key] for key in BRANDING_KEYS if key in tenant}
+    display_list = compile_layout(spec, branding)
+    tenant_dir = os.path.join(output_dir, tenant_slug(tenant['tenant']))
+    os.makedirs(tenant_dir, exist_ok=True)
+    
+    if output_format == 'pdf':
+        renderer = PDFRenderer(display_list, scale)
+        renderer.render_deck(cards, os.path.join(tenant_dir, "bingo_cards.pdf"))
+        return 1, renderer.form_name
+    
+    renderer = PILRenderer(display_list, scale, cache_dir=cache_dir)
+    for card in cards:
+        path = os.path.join(tenant_dir, f"bingo_card_{card['card_number']:03d}.{output_format}")
+        if output_format == 'jpg':
+            save_card_image(renderer.render(card), path, card, 'JPEG', quality=95)
+        else:
+            save_card_image(renderer.render(card), path, card, 'PNG')
+    return len(cards), renderer.key
+
+def render_tenant_decks(cards, tenants, output_format='png', output_dir=OUTPUT_DIR,
+                        layout_path=DEFAULT_LAYOUT, scale=1.0, cache_dir=TEMPLATE_CACHE_DIR):
+    """Render every tenant's deck; returns the number of files written"""
+    spec = load_layout(layout_path)
+    cards = sorted(cards, key=lambda card: card['card_number'])
+    templates = set()
+    total = 0
+    
+    for tenant in tenants:
+        start = time.perf_counter()
+        count, key = render_tenant_deck(cards, tenant, spec, output_format, output_dir, scale, cache_dir)
+        shared = " (shared template)" if key in templates else ""
+        templates.add(key)
+        total += count
+        print(f"🏷️  {tenant['tenant']}: {count} file(s) in {time.perf_counter() - start:.1f}s{shared}")
+    
+    print(f"{len(templates)} distinct template(s) for {len(tenants)} tenant(s)")
+    return total
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render branded bingo card decks per tenant")
+    parser.add_argument('tenants', help="JSON list of tenant branding, e.g. layouts/tenants.example.json")
+    parser.add_argument('--format', choices=['png', 'jpg', 'pdf'], default='png')
+    parser.add_argument('--layout', default=DEFAULT_LAYOUT, help="Layout spec JSON")
+    parser.add_argument('--deck', help="JSON file of bingo_cards rows instead of the database")
+    parser.add_argument('--only', nargs='+', metavar='TENANT', help="Render just these tenants")
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--cache-dir', default=TEMPLATE_CACHE_DIR,
+                        help="Where rendered templates are kept between runs")
+    args = parser.parse_args()
+    
+    tenants = load_tenants(args.tenants)
+    if args.only:
+        tenants = [tenant for tenant in tenants if tenant['tenant'] in args.only]
+    
+    if args.deck:
+        with open(args.deck) as f:
+            cards = json.load(f)
+    else:
+        print("Fetching bingo cards from database...")
+        cards = png_cards.fetch_bingo_cards()
+    
+    if not cards or not tenants:
+        print("No cards or tenants found!")
+    else:
+        count = render_tenant_decks(cards, tenants, args.format, args.output_dir, args.layout,
+                                    args.scale, args.cache_dir)
+        print(f"\nSUCCESS! {count} {args.format.upper()} file(s) for {len(tenants)} tenant(s) in {args.output_dir}/")
@@ -0,0 +1,158 @@
+"""
+Progress manifests for long render jobs
+Every finished output and master poster checkpoint is appended to a JSONL file,
+so an interrupted run picks up where it stopped instead of starting over
+"""
+
+import os
+import json
+import hashlib
+from contextlib import contextmanager
+
+# Bytes at the end of a checkpointed file that must still match on resume
+CHECKPOINT_TAIL_BYTES = 16
+
+def file_sha256(path):
+    """sha256 of a file, read in 1MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def card_digest(card_data):
+    """Short hash of a card's numbers, so edited cards are re-rendered on resume"""
+    content = [card_data['card_number']] + [card_data[f'{letter}_column'] for letter in 'bingo']
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()[:16]
+
+@contextmanager
+def atomic_output(path):
+    """
+    Yield a temporary path to write to; it replaces path only if the block succeeds
+    A crash mid-write leaves a stray .part file, never a truncated output
+    """
+    temp_path = path + '.part'
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def ensure_cache_dir(path):
+    """
+    Create a cache directory that keeps itself out of git
+    Its own .gitignore ignores everything in it, wherever the directory is placed
+    """
+    os.makedirs(path, exist_ok=True)
+    ignore = os.path.join(path, '.gitignore')
+    if not os.path.exists(ignore):
+        with open(ignore, 'w') as f:
+            f.write('*\n')
+
+def file_tail(path, offset):
+    """Hex of the bytes just before offset, used to spot a file changed since a checkpoint"""
+    with open(path, 'rb') as f:
+        f.seek(max(0, offset - CHECKPOINT_TAIL_BYTES))
+        return f.read(min(offset, CHECKPOINT_TAIL_BYTES)).hex()
+
+class RenderManifest:
+    """
+    Append-only JSONL progress log for one render job
+    The first line describes the job; a run with different parameters, or one
+    after the previous run finished, starts a fresh log
+    """
+    
+    def __init__(self, path, job, restart=False):
+        self.path = path
+        self.job = job
+        self.done = {}
+        self.checkpoints = {}
+        
+        records = [] if restart else self._read_records()
+        resumable = (records and records[0].get('job') == job
+                     and records[-1].get('type') != 'finished')
+        
+        if resumable:
+            for record in records[1:]:
+                if record.get('type') == 'done':
+                    self.done[record['key']] = record
+                elif record.get('type') == 'checkpoint':
+                    self.checkpoints[record['name']] = record['state']
+            self._file = open(path, 'a')
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self._file = open(path, 'w')
+            self._append({'type': 'job', 'job': job})
+        
+        self.resumed = bool(resumable)
+    
+    def _read_records(self):
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        valid_bytes = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # A half-written last line from a crash; everything before it is valid
+                    break
+                valid_bytes += len(line)
+        
+        # Cut the broken tail so new records don't land after it
+        if valid_bytes != os.path.getsize(self.path):
+            os.truncate(self.path, valid_bytes)
+        return records
+    
+    def _append(self, record):
+        self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+    
+    def is_done(self, key, path, **expected):
+        """
+        True if key was recorded as done, path still has the recorded size and
+        hash, and any expected fields (e.g. the card digest) still match
+        """
+        record = self.done.get(key)
+        if not record or not os.path.exists(path):
+            return False
+        if any(record.get(name) != value for name, value in expected.items()):
+            return False
+        if os.path.getsize(path) != record['size']:
+            return False
+        return file_sha256(path) == record['sha256']
+    
+    def mark_done(self, key, path, **extra):
+        """Record a finished output with its size and hash"""
+        record = {'type': 'done', 'key': key, 'size': os.path.getsize(path),
+                  'sha256': file_sha256(path), **extra}
+        self.done[key] = record
+        self._append(record)
+    
+    def save_checkpoint(self, name, path, state):
+        """Record a writer checkpoint, with the file's tail bytes for verification"""
+        state = dict(state, tail=file_tail(path, state['offset']))
+        self.checkpoints[name] = state
+        self._append({'type': 'checkpoint', 'name': name, 'state': state})
+    
+    def checkpoint(self, name, path):
+        """The last checkpoint for name if path still matches it, otherwise None"""
+        state = self.checkpoints.get(name)
+        if not state or not os.path.exists(path):
+            return None
+        if os.path.getsize(path) < state['offset'] or file_tail(path, state['offset']) != state['tail']:
+            print(f"⚠️  {path} changed since its last checkpoint; rewriting it")
+            return None
+        return state
+    
+    def finish(self):
+        self._append({'type': 'finished'})
+        self.close()
+    
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
@@ -3,12 +3,17 @@
  * Prevents overlapping and echoing audio
  */
 
+import { AudioSprite } from './audioSprite'
+import { loadVoicePack, VoicePack } from './voicePack'
+
 class TenantAudioManager {
   private static instance: TenantAudioManager
   private currentAudio: HTMLAudioElement | null = null
   private audioCache: Map<number, HTMLAudioElement> = new Map()
   private isPlaying = false
   private tenantId: string | null = null
+  private sprite: AudioSprite | null = null
+  private voicePack: VoicePack | null = null
 
   static getInstance(): TenantAudioManager {
     if (!TenantAudioManager.instance) {
@@ -28,13 +33,33 @@ class TenantAudioManager {
    * Preload audio files for better performance
    */
   async preloadAudio(): Promise<void> {
+    // Per-clip files from encode-voice-pack.py, in the format that suits this connection;
+    // loaded even when the sprite is, for clips the sprite doesn't have
+    try {
+      this.voicePack = await loadVoicePack()
+      console.log(`🎵 Amharic voice pack: ${this.voicePack.format}`)
+    } catch (error) {
+      console.warn('Voice pack unavailable, using the MP3 clips:', error)
+    }
+    
+    // One sprite file (build-audio-sprite.py) replaces the 81 separate requests
+    try {
+      const sprite = new AudioSprite(0.7)
+      await sprite.load()
+      this.sprite = sprite
+      console.log(`🎵 Amharic audio sprite loaded (${sprite.format})`)
+      return
+    } catch (error) {
+      console.warn('Audio sprite unavailable, preloading separate files:', error)
+    }
+    
     console.log('🎵 Preloading Amharic audio files...')
     
     // Preload letters (lowercase filenames)
     const letters = ['b', 'i', 'n', 'g', 'o']
     for (const letter of letters) {
       try {
-        const audio = new Audio(`/audio/amharic/${letter}.mp3`)
+        const audio = new Audio(this.clipUrl(letter))
         audio.preload = 'auto'
         audio.volume = 0.7
       } catch (error) {
@@ -45,7 +70,7 @@ class TenantAudioManager {
     // Preload numbers
     for (let i = 1; i <= 75; i++) {
       try {
-        const audio = new Audio(`/audio/amharic/${i}.mp3`)
+        const audio = new Audio(this.clipUrl(String(i)))
         audio.preload = 'auto'
         audio.volume = 0.7
         this.audioCache.set(i, audio)
@@ -56,7 +81,7 @@ class TenantAudioManager {
     
     // Preload game started announcement
     try {
-      const gameStartAudio = new Audio('/audio/amharic/game-started.mp3')
+      const gameStartAudio = new Audio(this.clipUrl('game-started'))
       gameStartAudio.preload = 'auto'
       gameStartAudio.volume = 0.8
     } catch (error) {
@@ -81,9 +106,16 @@ class TenantAudioManager {
     }
 
     try {
+      if (this.sprite) {
+        this.isPlaying = true
+        await this.sprite.play(String(number), 0.7)
+        this.isPlaying = false
+        return
+      }
+      
       // Play only the number (no letter to avoid duplicates)
       await this.playSequence([
-        `/audio/amharic/${number}.mp3`
+        this.clipUrl(String(number))
       ])
       
     } catch (error) {
@@ -111,9 +143,20 @@ class TenantAudioManager {
     try {
       this.isPlaying = true
       
+      if (this.sprite) {
+        // A pre-composed call clip (compose-call-clips.py) plays as one seamless sound
+        if (letter && this.sprite.has(`call-${number}`)) {
+          await this.sprite.play(`call-${number}`, 0.7)
+        } else {
+          const clips = letter ? [letter.toLowerCase(), String(number)] : [String(number)]
+          await this.sprite.playSequence(clips, 300)
+        }
+        return
+      }
+      
       // Play letter first
       if (letter) {
-        const letterAudio = new Audio(`/audio/amharic/${letter.toLowerCase()}.mp3`)
+        const letterAudio = new Audio(this.clipUrl(letter.toLowerCase()))
         letterAudio.volume = 0.7
         this.currentAudio = letterAudio
         
@@ -128,7 +171,7 @@ class TenantAudioManager {
       }
       
       // Play number
-      const numberAudio = new Audio(`/audio/amharic/${number}.mp3`)
+      const numberAudio = new Audio(this.clipUrl(String(number)))
       numberAudio.volume = 0.7
       this.currentAudio = numberAudio
       
@@ -146,6 +189,14 @@ class TenantAudioManager {
     }
   }
 
+  /**
+   * URL of a single clip: from the voice pack when loaded, else the original MP3
+   */
+  private clipUrl(name: string): string {
+    if (this.voicePack?.has(name)) return this.voicePack.url(name)
+    return `/audio/amharic/${name}.mp3`
+  }
+
   /**
    * Get BINGO letter for number (lowercase for file paths)
    */
@@ -194,8 +245,15 @@ class TenantAudioManager {
     this.stopCurrent()
     
     try {
+      if (this.sprite) {
+        this.isPlaying = true
+        await this.sprite.play('game-started', 0.8)
+        this.isPlaying = false
+        return
+      }
+      
       // Play primary Amharic game start audio
-      const audio = new Audio('/audio/amharic/game-started.mp3')
+      const audio = new Audio(this.clipUrl('game-started'))
       audio.volume = 0.8
       this.currentAudio = audio
       this.isPlaying = true
@@ -222,6 +280,7 @@ class TenantAudioManager {
    * Stop currently playing audio
    */
   stopCurrent(): void {
+    this.sprite?.stop()
     if (this.currentAudio && this.isPlaying) {
       this.currentAudio.pause()
       this.currentAudio.currentTime = 0
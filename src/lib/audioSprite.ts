@@ -0,0 +1,142 @@
+/**
+ * Audio sprite player - one preloaded file for every call clip
+ * The sprites (one per format) and their manifest are written by build-audio-sprite.py
+ */
+
+import { chooseVoiceFormat } from './voicePack'
+
+export interface SpriteClip {
+  start: number // ms
+  duration: number // ms
+}
+
+export interface SpriteFile {
+  file: string
+  mime: string
+  bytes: number
+}
+
+export interface SpriteManifest {
+  version: number
+  key: string
+  formats: { [format: string]: SpriteFile }
+  sampleRate: number
+  gap: number
+  clips: { [name: string]: SpriteClip }
+}
+
+export class AudioSprite {
+  private context: AudioContext
+  private buffer: AudioBuffer | null = null
+  private manifest: SpriteManifest | null = null
+  private current: AudioBufferSourceNode | null = null
+  private gain: GainNode
+  // Bumped by stop(), so a sequence in progress knows to give up
+  private generation = 0
+  format: string | null = null
+
+  constructor(volume = 0.7) {
+    const AudioContextClass = window.AudioContext || (window as any).webkitAudioContext
+    this.context = new AudioContextClass()
+    this.gain = this.context.createGain()
+    this.gain.gain.value = volume
+    this.gain.connect(this.context.destination)
+  }
+
+  /**
+   * Fetch the manifest and the sprite in the best format for this browser and
+   * connection, and decode the audio once
+   */
+  async load(manifestUrl = '/audio/sprites/amharic.json'): Promise<void> {
+    const manifestResponse = await fetch(manifestUrl)
+    if (!manifestResponse.ok) throw new Error(`Sprite manifest missing: ${manifestResponse.status}`)
+    const manifest: SpriteManifest = await manifestResponse.json()
+
+    const format = chooseVoiceFormat(manifest)
+    if (!format) throw new Error('No sprite format this browser can play')
+    const spriteUrl = manifestUrl.slice(0, manifestUrl.lastIndexOf('/') + 1) + manifest.formats[format].file
+    // The key changes whenever a clip does, so the sprite can be cached forever
+    const spriteResponse = await fetch(`${spriteUrl}?v=${manifest.key.slice(0, 12)}`)
+    if (!spriteResponse.ok) throw new Error(`Sprite missing: ${spriteResponse.status}`)
+    const data = await spriteResponse.arrayBuffer()
+
+    this.buffer = await new Promise<AudioBuffer>((resolve, reject) =>
+      this.context.decodeAudioData(data, resolve, reject)
+    )
+    this.manifest = manifest
+    this.format = format
+  }
+
+  isLoaded(): boolean {
+    return this.buffer !== null
+  }
+
+  has(name: string): boolean {
+    return !!this.manifest && name in this.manifest.clips
+  }
+
+  /**
+   * Play one clip, interrupting anything playing; resolves when it ends (or is stopped)
+   */
+  async play(name: string, volume?: number): Promise<void> {
+    this.stop()
+    await this.playClip(name, volume, this.generation)
+  }
+
+  /**
+   * Play clips back to back with a pause between them
+   */
+  async playSequence(names: string[], pauseMs = 200): Promise<void> {
+    this.stop()
+    const generation = this.generation
+    for (let i = 0; i < names.length; i++) {
+      await this.playClip(names[i], undefined, generation)
+      // stop() (or a newer play) during a clip or the pause ends the whole sequence
+      if (this.generation !== generation) return
+      if (i < names.length - 1) await new Promise(resolve => setTimeout(resolve, pauseMs))
+      if (this.generation !== generation) return
+    }
+  }
+
+  private async playClip(name: string, volume: number | undefined, generation: number): Promise<void> {
+    if (!this.buffer || !this.manifest) throw new Error('Audio sprite not loaded')
+    const clip = this.manifest.clips[name]
+    if (!clip) throw new Error(`No clip ${name} in sprite`)
+
+    // Browsers suspend audio contexts until a user gesture
+    if (this.context.state === 'suspended') await this.context.resume()
+    if (this.generation !== generation) return
+    if (volume !== undefined) this.gain.gain.value = volume
+
+    this.stopSource()
+    const source = this.context.createBufferSource()
+    source.buffer = this.buffer
+    source.connect(this.gain)
+    this.current = source
+
+    await new Promise<void>(resolve => {
+      source.onended = () => resolve()
+      source.start(0, clip.start / 1000, clip.duration / 1000)
+    })
+    if (this.current === source) this.current = null
+  }
+
+  /**
+   * Stop the current clip and any sequence in progress
+   */
+  stop(): void {
+    this.generation++
+    this.stopSource()
+  }
+
+  private stopSource(): void {
+    if (this.current) {
+      try {
+        this.current.stop()
+      } catch (error) {
+        // Already stopped
+      }
+      this.current = null
+    }
+  }
+}
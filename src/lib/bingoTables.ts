@@ -0,0 +1,158 @@
+// Loader for the precomputed tables written by extract-printed-cards.py --tables
+// (see game_tables.py for the layout). Cell positions are row-major
+// (row * 5 + column) like winning_patterns, with FREE at 12
+
+export interface CompiledPattern {
+  name: string
+  priority: number
+  mask: number
+}
+
+export interface BingoTables {
+  cardNumbers: Uint32Array
+  indexOffsets: Uint32Array
+  indexEntries: Uint32Array
+  cellPositions: Uint8Array
+  patterns: CompiledPattern[]
+}
+
+const MAGIC = 'BTBL'
+const VERSION = 2
+const NUMBER_SLOTS = 76
+const NOT_ON_CARD = 0xff
+export const FREE_MASK = 1 << 12
+
+const align4 = (offset: number) => (offset + 3) & ~3
+
+export const parseBingoTables = (buffer: ArrayBuffer): BingoTables => {
+  const view = new DataView(buffer)
+  const magic = String.fromCharCode(view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3))
+  if (magic !== MAGIC || view.getUint8(4) !== VERSION) {
+    throw new Error(`Not a version ${VERSION} bingo tables file`)
+  }
+  const patternCount = view.getUint16(6, true)
+  const cardCount = view.getUint32(8, true)
+
+  // Typed arrays use the platform byte order; every supported device is little-endian
+  let offset = 12
+  const masks = new Uint32Array(buffer, offset, patternCount)
+  offset += patternCount * 4
+  const cardNumbers = new Uint32Array(buffer, offset, cardCount)
+  offset += cardCount * 4
+  const indexOffsets = new Uint32Array(buffer, offset, NUMBER_SLOTS)
+  offset += NUMBER_SLOTS * 4
+  const indexEntries = new Uint32Array(buffer, offset, indexOffsets[NUMBER_SLOTS - 1])
+  offset += indexEntries.length * 4
+  const cellPositions = new Uint8Array(buffer, offset, cardCount * NUMBER_SLOTS)
+  offset = align4(offset + cellPositions.length)
+
+  const bytes = new Uint8Array(buffer)
+  const patterns: CompiledPattern[] = []
+  for (let i = 0; i < patternCount; i++) {
+    const priority = bytes[offset]
+    const length = bytes[offset + 1]
+    const name = new TextDecoder().decode(bytes.subarray(offset + 2, offset + 2 + length))
+    patterns.push({ name, priority, mask: masks[i] })
+    offset += 2 + length
+  }
+
+  return { cardNumbers, indexOffsets, indexEntries, cellPositions, patterns }
+}
+
+let tablesPromise: Promise<BingoTables> | null = null
+
+// Fetch and parse the tables once (public/bingoTables.bin by default)
+export const loadBingoTables = (url = '/bingoTables.bin'): Promise<BingoTables> => {
+  if (!tablesPromise) {
+    tablesPromise = fetch(url)
+      .then(response => {
+        if (!response.ok) throw new Error(`Failed to load ${url}: ${response.status}`)
+        return response.arrayBuffer()
+      })
+      .then(parseBingoTables)
+      .catch(error => {
+        tablesPromise = null
+        throw error
+      })
+  }
+  return tablesPromise
+}
+
+// Index of a card number in the tables, or -1
+export const cardIndexOf = (tables: BingoTables, cardNumber: number): number => {
+  let low = 0
+  let high = tables.cardNumbers.length - 1
+  while (low <= high) {
+    const mid = (low + high) >> 1
+    const value = tables.cardNumbers[mid]
+    if (value === cardNumber) return mid
+    if (value < cardNumber) low = mid + 1
+    else high = mid - 1
+  }
+  return -1
+}
+
+// Cell position (0-24) of a number on a card, or -1 if the card doesn't have it
+export const cellPosition = (tables: BingoTables, cardIndex: number, calledNumber: number): number => {
+  if (calledNumber < 1 || calledNumber > 75) return -1
+  const position = tables.cellPositions[cardIndex * NUMBER_SLOTS + calledNumber]
+  return position === NOT_ON_CARD ? -1 : position
+}
+
+// Indexes of every card holding a number
+export const cardsWithNumber = (tables: BingoTables, calledNumber: number): Uint32Array => {
+  if (calledNumber < 1 || calledNumber > 75) return new Uint32Array(0)
+  return tables.indexEntries.subarray(tables.indexOffsets[calledNumber - 1], tables.indexOffsets[calledNumber])
+}
+
+// 25-bit marks for a card from the numbers called so far (FREE included)
+export const marksForCalledNumbers = (tables: BingoTables, cardIndex: number, calledNumbers: number[]): number => {
+  let marks = FREE_MASK
+  for (const calledNumber of calledNumbers) {
+    const position = cellPosition(tables, cardIndex, calledNumber)
+    if (position !== -1) marks |= 1 << position
+  }
+  return marks
+}
+
+// Mark a called number on every card at once; marks holds one 25-bit value per
+// card index. Returns the indexes of the cards that were marked
+export const markCalledNumber = (tables: BingoTables, marks: Uint32Array, calledNumber: number): Uint32Array => {
+  const holders = cardsWithNumber(tables, calledNumber)
+  for (let i = 0; i < holders.length; i++) {
+    const cardIndex = holders[i]
+    marks[cardIndex] |= 1 << tables.cellPositions[cardIndex * NUMBER_SLOTS + calledNumber]
+  }
+  return holders
+}
+
+// Fresh marks for every card, with only FREE marked
+export const newMarks = (tables: BingoTables): Uint32Array =>
+  new Uint32Array(tables.cardNumbers.length).fill(FREE_MASK)
+
+// Convert marks to the position list used by player_marked_numbers and checkPattern
+export const marksToPositions = (marks: number): number[] => {
+  const positions: number[] = []
+  for (let position = 0; position < 25; position++) {
+    if (marks & (1 << position)) positions.push(position)
+  }
+  return positions
+}
+
+export const positionsToMarks = (positions: number[]): number =>
+  positions.reduce((marks, position) => marks | (1 << position), 0)
+
+// Patterns completed by a card's marks, optionally limited to some pattern names
+export const completedPatterns = (tables: BingoTables, marks: number, activeNames?: string[]): CompiledPattern[] =>
+  tables.patterns.filter(pattern =>
+    (pattern.mask & marks) === pattern.mask && (!activeNames || activeNames.includes(pattern.name))
+  )
+
+// Highest-priority (lowest number) completed pattern, or null
+export const winningPattern = (tables: BingoTables, marks: number, activeNames?: string[]): CompiledPattern | null => {
+  let best: CompiledPattern | null = null
+  for (const pattern of completedPatterns(tables, marks, activeNames)) {
+    if (!best || pattern.priority < best.priority) best = pattern
+  }
+  return best
+}
@@ -0,0 +1,79 @@
+/**
+ * Voice pack - per-format clip URLs from the manifest written by encode-voice-pack.py
+ * Slow or data-saving connections get the small Opus files (and Opus sprite) when the
+ * browser can play them
+ */
+
+export interface VoicePackFormat {
+  path: string
+  extension: string
+  mime: string
+  bytes: number
+  budget: number
+}
+
+export interface VoicePackClip {
+  key: string
+  duration: number // ms
+  bytes: { [format: string]: number }
+  loudness: number | null
+}
+
+export interface VoicePackManifest {
+  version: number
+  formats: { [format: string]: VoicePackFormat }
+  clips: { [name: string]: VoicePackClip }
+}
+
+export interface VoicePack {
+  format: string
+  has(name: string): boolean
+  url(name: string): string
+}
+
+// Best quality first; Opus moves to the front on slow connections
+const FORMAT_PREFERENCE = ['aac', 'mp3', 'opus']
+
+function isSlowConnection(): boolean {
+  const connection = (navigator as any).connection
+  if (!connection) return false
+  return connection.saveData || ['slow-2g', '2g', '3g'].includes(connection.effectiveType)
+}
+
+/**
+ * Pick the format to stream: Opus on slow links, otherwise the first one the browser plays
+ * Works for any manifest listing formats by MIME type (voice pack or audio sprite)
+ */
+export function chooseVoiceFormat(manifest: { formats: { [format: string]: { mime: string } } }): string | null {
+  const probe = document.createElement('audio')
+  const playable = (format: string) => {
+    const info = manifest.formats[format]
+    return !!info && probe.canPlayType(info.mime) !== ''
+  }
+
+  const order = isSlowConnection()
+    ? ['opus', ...FORMAT_PREFERENCE.filter(format => format !== 'opus')]
+    : FORMAT_PREFERENCE
+  return order.find(playable) ?? null
+}
+
+export async function loadVoicePack(baseUrl = '/audio/packs/amharic'): Promise<VoicePack> {
+  const response = await fetch(`${baseUrl}/manifest.json`)
+  if (!response.ok) throw new Error(`Voice pack manifest missing: ${response.status}`)
+  const manifest: VoicePackManifest = await response.json()
+
+  const format = chooseVoiceFormat(manifest)
+  if (!format) throw new Error('No voice pack format this browser can play')
+  const info = manifest.formats[format]
+
+  return {
+    format,
+    has: (name: string) => name in manifest.clips,
+    // The clip key changes with the audio, so the files can be cached forever
+    url: (name: string) => {
+      const clip = manifest.clips[name]
+      const version = clip ? `?v=${clip.key}` : ''
+      return `${baseUrl}/${info.path}/${name}.${info.extension}${version}`
+    },
+  }
+}
@@ -0,0 +1,37 @@
+-- Content-addressed deck versions
+-- Every card hashes to sha256("<card_number>:<B>|<I>|<N>|<G>|<O>"), where each column
+-- is its numbers joined with commas. A range of card numbers hashes to the sha256 of
+-- its card hashes concatenated in card order. sync-deck.py computes the same hashes
+-- locally, so two decks are compared by exchanging range hashes and only the
+-- differing cards are transferred
+
+CREATE OR REPLACE FUNCTION bingo_card_hash(
+  card_number INTEGER, b_column INTEGER[], i_column INTEGER[], n_column INTEGER[],
+  g_column INTEGER[], o_column INTEGER[]
+)
+RETURNS TEXT AS $$
+  SELECT encode(sha256(convert_to(
+    card_number::TEXT || ':' ||
+    COALESCE(array_to_string(b_column, ','), '') || '|' ||
+    COALESCE(array_to_string(i_column, ','), '') || '|' ||
+    COALESCE(array_to_string(n_column, ','), '') || '|' ||
+    COALESCE(array_to_string(g_column, ','), '') || '|' ||
+    COALESCE(array_to_string(o_column, ','), ''),
+    'UTF8')), 'hex');
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Hashes of many card-number ranges (inclusive) in one call, in the order given
+CREATE OR REPLACE FUNCTION bingo_card_range_hashes(range_starts INTEGER[], range_ends INTEGER[])
+RETURNS TABLE (range_start INTEGER, range_end INTEGER, card_count INTEGER, range_hash TEXT) AS $$
+  SELECT r.range_start, r.range_end, COUNT(c.card_number)::INTEGER,
+         encode(sha256(convert_to(COALESCE(string_agg(
+           bingo_card_hash(c.card_number, c.b_column, c.i_column, c.n_column, c.g_column, c.o_column),
+           '' ORDER BY c.card_number), ''), 'UTF8')), 'hex')
+  FROM unnest(range_starts, range_ends) WITH ORDINALITY AS r(range_start, range_end, position)
+  LEFT JOIN bingo_cards c ON c.card_number BETWEEN r.range_start AND r.range_end
+  GROUP BY r.range_start, r.range_end, r.position
+  ORDER BY r.position;
+$$ LANGUAGE sql STABLE;
+
+GRANT EXECUTE ON FUNCTION bingo_card_hash(INTEGER, INTEGER[], INTEGER[], INTEGER[], INTEGER[], INTEGER[]) TO authenticated, anon;
+GRANT EXECUTE ON FUNCTION bingo_card_range_hashes(INTEGER[], INTEGER[]) TO authenticated, anon;
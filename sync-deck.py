@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Sync the bingo_cards deck incrementally instead of deleting and reinserting every card
+Compares two decks (JSON, .bdeck or the database) by range hashes and copies only the
+cards that differ. Requires supabase/deck_versions.sql when the database is involved
+"""
+
+import os
+import sys
+import time
+import argparse
+import importlib
+
+from deck_versions import LocalDeck, SupabaseDeck, sync_decks
+
+png_cards = importlib.import_module('generate-png-cards')
+
+DATABASE = 'db'
+VERSIONS_DIR = 'deck_versions'
+
+def open_deck(spec, missing_ok=False):
+    """'db' for the bingo_cards table, otherwise a .json or .bdeck file (empty if missing_ok and absent)"""
+    if spec == DATABASE:
+        return SupabaseDeck(png_cards.SUPABASE_URL, png_cards.SUPABASE_KEY)
+    if not os.path.exists(spec):
+        if not missing_ok:
+            raise FileNotFoundError(f"Deck not found: {spec}")
+        return LocalDeck([])
+    return LocalDeck.load(spec)
+
+def save_version(deck, directory=VERSIONS_DIR):
+    """Store a local deck as <version>.json, content-addressed by its root hash"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{deck.version[:16]}.json")
+    if not os.path.exists(path):
+        deck.save(path)
+    return path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Make one deck match another, moving only changed cards")
+    parser.add_argument('source', help="'db', a JSON deck or a .bdeck snapshot to copy from")
+    parser.add_argument('target', help="'db', a JSON deck or a .bdeck snapshot to update (created if missing)")
+    parser.add_argument('--dry-run', action='store_true', help="Only report which cards differ")
+    parser.add_argument('--allow-delete', action='store_true',
+                        help="Allow a sync that deletes more than half of the target's cards")
+    parser.add_argument('--save-version', action='store_true',
+                        help=f"Also store a local target as {VERSIONS_DIR}/<version>.json after syncing")
+    args = parser.parse_args()
+    
+    if args.source == args.target:
+        print("Source and target are the same deck")
+        sys.exit(1)
+    
+    try:
+        source, target = open_deck(args.source), open_deck(args.target, missing_ok=True)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"Source version: {source.version[:16]}")
+    print(f"Target version: {target.version[:16]}")
+    
+    start = time.perf_counter()
+    try:
+        summary = sync_decks(source, target, args.dry_run, allow_delete=args.allow_delete)
+    except ValueError as e:
+        print(f"❌ {e} - pass --allow-delete if that is intended")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    
+    print(f"Compared {summary['ranges_compared']} ranges in {summary['round_trips']} round trips ({elapsed:.2f}s)")
+    if not summary['changed']:
+        print("✅ Decks are identical, nothing to sync")
+        sys.exit(0)
+    
+    print(f"{len(summary['upserted'])} card(s) to upsert, {len(summary['deleted'])} to delete")
+    for label, numbers in (('Upsert', summary['upserted']), ('Delete', summary['deleted'])):
+        if numbers:
+            shown = ', '.join(map(str, numbers[:20])) + (' ...' if len(numbers) > 20 else '')
+            print(f"  {label}: {shown}")
+    
+    if args.dry_run:
+        print("Dry run: target left unchanged")
+        sys.exit(0)
+    
+    if isinstance(target, LocalDeck):
+        target.save(args.target)
+        if args.save_version:
+            print(f"Version stored at {save_version(target)}")
+    print(f"✅ Target synced, version now {target.version[:16]}")
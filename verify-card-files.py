@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Check rendered card files against the current deck
+Reads only the embedded card number and digest from each PDF/JPG/PNG header (in
+parallel) and reports any file that doesn't match the bingo_cards rows.
+With --dot-code, the dot code printed on each card PDF is decoded and checked too
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+
+from card_metadata import read_card_metadata, read_pdf_dot_code
+from render_jobs import card_digest
+
+png_cards = importlib.import_module('generate-png-cards')
+printable_cards = importlib.import_module('generate-printable-cards')
+
+# Card files are named bingo_card_NNN.ext; masters, sheets and posters are skipped
+CARD_FILE_PATTERN = re.compile(r'bingo_card_(\d+)\.(pdf|jpe?g|png)$', re.IGNORECASE)
+DEFAULT_WORKERS = 16
+
+def find_card_files(root):
+    """Card files under root, skipping hidden directories (caches, progress files)"""
+    paths = []
+    for directory, subdirs, files in os.walk(root):
+        subdirs[:] = sorted(d for d in subdirs if not d.startswith('.'))
+        paths.extend(os.path.join(directory, name) for name in sorted(files) if CARD_FILE_PATTERN.search(name))
+    return paths
+
+def check_file(path, digests, dot_code=False):
+    """Status of one file: ok, mismatch, unknown_card, no_metadata, bad_dot_code or unreadable"""
+    named_number = int(CARD_FILE_PATTERN.search(os.path.basename(path)).group(1))
+    try:
+        embedded = read_card_metadata(path)
+    except Exception as e:
+        return {'path': path, 'status': 'unreadable', 'detail': str(e)}
+    
+    if embedded is None:
+        return {'path': path, 'status': 'no_metadata'}
+    number, digest = embedded
+    if number != named_number:
+        return {'path': path, 'status': 'mismatch', 'detail': f"file name says card {named_number}, data says {number}"}
+    if number not in digests:
+        return {'path': path, 'status': 'unknown_card', 'detail': f"card {number} is not in the deck"}
+    if digest != digests[number]:
+        return {'path': path, 'status': 'mismatch',
+                'detail': f"card {number} was rendered from different numbers (digest {digest}, deck {digests[number]})"}
+    if dot_code and path.lower().endswith('.pdf'):
+        return check_dot_code(path, number, digest)
+    return {'path': path, 'status': 'ok'}
+
+def check_dot_code(path, number, digest):
+    """Decode the printed dot code of a card PDF and compare it to its header"""
+    try:
+        printed = read_pdf_dot_code(path, *printable_cards.dot_code_position(), printable_cards.DOT_CODE_MODULE)
+    except Exception as e:
+        return {'path': path, 'status': 'unreadable', 'detail': str(e)}
+    if printed is None:
+        return {'path': path, 'status': 'bad_dot_code', 'detail': "no readable dot code"}
+    if printed != (number, digest[:8]):
+        return {'path': path, 'status': 'bad_dot_code',
+                'detail': f"dot code says card {printed[0]} digest {printed[1]}, header says card {number} digest {digest[:8]}"}
+    return {'path': path, 'status': 'ok'}
+
+def verify_card_files(cards, root="printable_cards", workers=DEFAULT_WORKERS, dot_code=False):
+    """Check every card file under root; returns the list of per-file results"""
+    digests = {card['card_number']: card_digest(card) for card in cards}
+    paths = find_card_files(root)
+    # Header reads are I/O bound, so threads overlap them without process start-up cost
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda path: check_file(path, digests, dot_code), paths))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify rendered card files against the deck")
+    parser.add_argument('root', nargs='?', default="printable_cards")
+    parser.add_argument('--deck', help="JSON file of bingo_cards rows instead of the database")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--strict', action='store_true',
+                        help="Also fail on files without embedded metadata (rendered before it existed)")
+    parser.add_argument('--dot-code', action='store_true',
+                        help="Also decode the dot code printed on card PDFs (rendered with --dot-code)")
+    parser.add_argument('--report', help="Write the per-file results as JSON")
+    args = parser.parse_args()
+    
+    if args.deck:
+        with open(args.deck) as f:
+            cards = json.load(f)
+    else:
+        print("Fetching bingo cards from database...")
+        cards = png_cards.fetch_bingo_cards()
+    
+    if not cards:
+        print("No cards found!")
+        sys.exit(1)
+    
+    start = time.perf_counter()
+    results = verify_card_files(cards, args.root, args.workers, args.dot_code)
+    elapsed = time.perf_counter() - start
+    
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    print(f"Checked {len(results)} card files in {elapsed:.2f}s: "
+          + ', '.join(f"{count} {status}" for status, count in sorted(counts.items())))
+    
+    failing = {'mismatch', 'unknown_card', 'unreadable', 'bad_dot_code'} | ({'no_metadata'} if args.strict else set())
+    problems = [result for result in results if result['status'] in failing]
+    for result in problems:
+        print(f"  ❌ {result['path']}: {result['status']} {result.get('detail', '')}")
+    if counts.get('no_metadata') and not args.strict:
+        print(f"  ⚠️  {counts['no_metadata']} file(s) have no embedded digest; re-render them to make them verifiable")
+    
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(results, f, indent=1)
+    
+    if problems:
+        sys.exit(1)
+    print("✅ Every card file matches the deck")
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Verify printed card PDFs against the deck by reading the numbers back out of them
+Each bingo_card_NNN.pdf's text layer is parsed with PyMuPDF, the 5x5 grid is rebuilt
+and every cell is diffed against the database, a JSON deck or a .bdeck snapshot
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import time
+import argparse
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+import fitz  # PyMuPDF
+
+from deck_snapshot import read_bdeck, write_bdeck
+
+png_cards = importlib.import_module('generate-png-cards')
+
+LETTERS = 'BINGO'
+# Printed number -> column, from the standard 75-ball ranges
+COLUMN_RANGES = [(1, 15), (16, 30), (31, 45), (46, 60), (61, 75)]
+CARD_NUMBER_PATTERN = re.compile(r'#(\d+)$')
+FILE_PATTERN = re.compile(r'bingo_card_(\d+)\.pdf$')
+
+def value_column(value):
+    for col, (low, high) in enumerate(COLUMN_RANGES):
+        if low <= value <= high:
+            return col
+    return None
+
+def group_rows(centers):
+    """
+    Cluster word y-centers into rows; a gap larger than a third of the typical
+    row pitch starts a new row. Returns the mean y of each row, top to bottom
+    """
+    ordered = sorted(centers)
+    if not ordered:
+        return []
+    gaps = [b - a for a, b in zip(ordered, ordered[1:]) if b - a > 1]
+    tolerance = max(gaps) / 3 if gaps else 1
+    rows = [[ordered[0]]]
+    for y in ordered[1:]:
+        if y - rows[-1][-1] > tolerance:
+            rows.append([])
+        rows[-1].append(y)
+    return [sum(row) / len(row) for row in rows]
+
+def read_printed_card(path):
+    """
+    Rebuild the printed grid from a card PDF's words
+    Columns come from each number's value range, rows from its y position. Numbers
+    printed under the wrong letter are reported, using the x positions of the
+    B I N G O headers. Returns {card_number, grid, problems}
+    """
+    with fitz.open(path) as doc:
+        words = doc[0].get_text('words')
+    
+    card_number = None
+    headers = {}
+    cells = []
+    for x0, y0, x1, y1, text, *_ in words:
+        x, y = (x0 + x1) / 2, (y0 + y1) / 2
+        match = CARD_NUMBER_PATTERN.match(text)
+        if match and card_number is None:
+            card_number = int(match.group(1))
+        elif text in LETTERS and len(text) == 1 and text not in headers:
+            headers[text] = (x, y)
+        elif text == 'FREE' or text.isdigit():
+            cells.append((x, y, text))
+    
+    # Only words below the B I N G O header row belong to the grid
+    header_y = max((y for _, y in headers.values()), default=0)
+    cells = [cell for cell in cells if cell[1] > header_y]
+    row_centers = group_rows([y for _, y, _ in cells])
+    
+    problems = []
+    if len(row_centers) != 5:
+        problems.append(f"found {len(row_centers)} rows of numbers instead of 5")
+    header_x = [headers[letter][0] for letter in LETTERS] if len(headers) == 5 else None
+    
+    grid = [[None] * 5 for _ in range(5)]
+    for x, y, text in cells:
+        row = min(range(len(row_centers)), key=lambda r: abs(row_centers[r] - y))
+        if row >= 5:
+            continue
+        if text == 'FREE':
+            col = min(range(5), key=lambda c: abs(header_x[c] - x)) if header_x else 2
+            value = 'FREE'
+        else:
+            value = int(text)
+            col = value_column(value)
+            if col is None:
+                problems.append(f"row {row + 1}: {value} is outside 1-75")
+                continue
+            if header_x:
+                printed_col = min(range(5), key=lambda c: abs(header_x[c] - x))
+                if printed_col != col:
+                    problems.append(f"row {row + 1}: {value} is printed under {LETTERS[printed_col]}")
+        if grid[row][col] is not None:
+            problems.append(f"row {row + 1} {LETTERS[col]}: both {grid[row][col]} and {value}")
+        grid[row][col] = value
+    
+    return {'card_number': card_number, 'grid': grid, 'problems': problems}
+
+def expected_grid(card_data):
+    """The deck's 5x5 grid with FREE in the centre"""
+    grid = [[None] * 5 for _ in range(5)]
+    for col, letter in enumerate('bingo'):
+        numbers = card_data[f'{letter}_column']
+        for row in range(5):
+            if col == 2:
+                grid[row][col] = 'FREE' if row == 2 else numbers[row if row < 2 else row - 1]
+            else:
+                grid[row][col] = numbers[row]
+    return grid
+
+def grid_to_card(card_number, grid):
+    """A bingo_cards-style dict from a printed grid (None where a cell is unreadable)"""
+    card = {'card_number': card_number}
+    for col, letter in enumerate('bingo'):
+        card[f'{letter}_column'] = [grid[row][col] for row in range(5) if not (col == 2 and row == 2)]
+    return card
+
+def verify_pdf(job):
+    """Worker: diff one printed PDF against its deck card"""
+    path, card_data = job
+    result = {'path': path}
+    try:
+        printed = read_printed_card(path)
+    except Exception as e:
+        return dict(result, status='unreadable', problems=[str(e)])
+    
+    name_match = FILE_PATTERN.search(os.path.basename(path))
+    card_number = printed['card_number'] or (int(name_match.group(1)) if name_match else None)
+    result.update(card_number=card_number, printed=grid_to_card(card_number, printed['grid']),
+                  problems=printed['problems'])
+    if name_match and printed['card_number'] and int(name_match.group(1)) != printed['card_number']:
+        result['problems'].append(f"file name says card {int(name_match.group(1))}")
+    
+    if card_data is None:
+        return dict(result, status='not_in_deck', cells=[])
+    
+    expected = expected_grid(card_data)
+    cells = [{'row': row + 1, 'column': LETTERS[col], 'printed': printed['grid'][row][col],
+              'expected': expected[row][col]}
+             for row in range(5) for col in range(5) if printed['grid'][row][col] != expected[row][col]]
+    status = 'mismatch' if cells or result['problems'] else 'ok'
+    return dict(result, status=status, cells=cells)
+
+def card_number_from_name(path):
+    match = FILE_PATTERN.search(os.path.basename(path))
+    return int(match.group(1)) if match else None
+
+def verify_printed_pdfs(paths, cards, workers=None):
+    """Verify every PDF in a process pool; returns results in path order"""
+    deck = {card['card_number']: card for card in cards}
+    jobs = [(path, deck.get(card_number_from_name(path))) for path in paths]
+    if workers == 1:
+        return list(map(verify_pdf, jobs))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(verify_pdf, jobs, chunksize=max(1, len(jobs) // (4 * (os.cpu_count() or 1)))))
+
+def load_deck(deck_path=None, bdeck_path=None):
+    if bdeck_path:
+        return read_bdeck(bdeck_path)
+    if deck_path:
+        with open(deck_path) as f:
+            return json.load(f)
+    print("Fetching bingo cards from database...")
+    return png_cards.fetch_bingo_cards()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check printed card PDFs against the deck")
+    parser.add_argument('pdfs', nargs='*', help="PDF files (default: printable_cards/bingo_card_*.pdf)")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--deck', help="JSON file of bingo_cards rows instead of the database")
+    source.add_argument('--bdeck', help=".bdeck snapshot to compare against")
+    parser.add_argument('--save-snapshot', metavar='PATH',
+                        help="Also save the deck being compared against as a .bdeck snapshot")
+    parser.add_argument('--extract', metavar='PATH',
+                        help="Write the decks read back from the PDFs as JSON (rows like bingo_cards)")
+    parser.add_argument('--report', help="Write every result, with each mismatched cell, as JSON")
+    parser.add_argument('--workers', type=int, help="Processes (default: CPU count)")
+    args = parser.parse_args()
+    
+    paths = args.pdfs or sorted(glob.glob("printable_cards/bingo_card_*.pdf"))
+    if not paths:
+        print("No PDFs found!")
+        sys.exit(1)
+    
+    cards = load_deck(args.deck, args.bdeck)
+    if not cards:
+        print("No cards found!")
+        sys.exit(1)
+    if args.save_snapshot:
+        write_bdeck(cards, args.save_snapshot)
+        print(f"Snapshot of {len(cards)} cards saved to {args.save_snapshot}")
+    
+    start = time.perf_counter()
+    results = verify_printed_pdfs(paths, cards, args.workers)
+    elapsed = time.perf_counter() - start
+    
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    print(f"Checked {len(results)} PDFs in {elapsed:.2f}s: "
+          + ', '.join(f"{count} {status}" for status, count in sorted(counts.items())))
+    
+    for result in results:
+        if result['status'] == 'ok':
+            continue
+        print(f"\n❌ {result['path']} (card {result.get('card_number')}): {result['status']}")
+        for problem in result.get('problems', []):
+            print(f"   {problem}")
+        for cell in result.get('cells', []):
+            print(f"   row {cell['row']} {cell['column']}: printed {cell['printed']}, deck has {cell['expected']}")
+    
+    if args.extract:
+        with open(args.extract, 'w') as f:
+            json.dump([result['printed'] for result in results if result.get('printed')], f, indent=1)
+        print(f"\nPrinted decks written to {args.extract}")
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'seconds': round(elapsed, 3), 'counts': counts, 'results': results}, f, indent=1)
+        print(f"Report written to {args.report}")
+    
+    if any(result['status'] != 'ok' for result in results):
+        sys.exit(1)
+    print("✅ Every printed card matches the deck")
@@ -0,0 +1,238 @@
+"""
+Shared text-to-speech pipeline for the caller voice clips
+Clips are synthesized concurrently and cached by a hash of (engine, voice, language,
+text, params), so a run only synthesizes texts or settings that changed; everything
+else is copied from the cache. Engines are pluggable: gTTS for real clips, and a
+fake engine that writes deterministic tones for offline runs
+"""
+
+import io
+import os
+import json
+import math
+import time
+import wave
+import shutil
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from render_jobs import atomic_output
+
+OUTPUT_DIR = "public/audio/amharic"
+CACHE_DIR = ".tts_cache"
+# The fake engine's test tones never go into the served clip directory by default
+FAKE_OUTPUT_DIR = ".tts_cache/fake_clips"
+# Written into the output directory: clip name -> cache key it was copied from
+CLIP_INDEX = ".clips.json"
+DEFAULT_WORKERS = 8
+RETRIES = 2
+
+# Amharic caller texts: game start, the column letters and 1-75
+AMHARIC_TEXTS = {
+    "game-started": "ጨዋታው ተጀምሯል",
+    "b": "ቢ", "i": "አይ", "n": "ኤን", "g": "ጂ", "o": "ኦ",
+    "1": "አንድ", "2": "ሁለት", "3": "ሶስት", "4": "አራት", "5": "አምስት",
+    "6": "ስድስት", "7": "ሰባት", "8": "ስምንት", "9": "ዘጠኝ", "10": "አስር",
+    "11": "አስራ አንድ", "12": "አስራ ሁለት", "13": "አስራ ሶስት", "14": "አስራ አራት", "15": "አስራ አምስት",
+    "16": "አስራ ስድስት", "17": "አስራ ሰባት", "18": "አስራ ስምንት", "19": "አስራ ዘጠኝ", "20": "ሃያ",
+    "21": "ሃያ አንድ", "22": "ሃያ ሁለት", "23": "ሃያ ሶስት", "24": "ሃያ አራት", "25": "ሃያ አምስት",
+    "26": "ሃያ ስድስት", "27": "ሃያ ሰባት", "28": "ሃያ ስምንት", "29": "ሃያ ዘጠኝ", "30": "ሰላሳ",
+    "31": "ሰላሳ አንድ", "32": "ሰላሳ ሁለት", "33": "ሰላሳ ሶስት", "34": "ሰላሳ አራት", "35": "ሰላሳ አምስት",
+    "36": "ሰላሳ ስድስት", "37": "ሰላሳ ሰባት", "38": "ሰላሳ ስምንት", "39": "ሰላሳ ዘጠኝ", "40": "አርባ",
+    "41": "አርባ አንድ", "42": "አርባ ሁለት", "43": "አርባ ሶስት", "44": "አርባ አራት", "45": "አርባ አምስት",
+    "46": "አርባ ስድስት", "47": "አርባ ሰባት", "48": "አርባ ስምንት", "49": "አርባ ዘጠኝ", "50": "ሃምሳ",
+    "51": "ሃምሳ አንድ", "52": "ሃምሳ ሁለት", "53": "ሃምሳ ሶስት", "54": "ሃምሳ አራት", "55": "ሃምሳ አምስት",
+    "56": "ሃምሳ ስድስት", "57": "ሃምሳ ሰባት", "58": "ሃምሳ ስምንት", "59": "ሃምሳ ዘጠኝ", "60": "ስድሳ",
+    "61": "ስድሳ አንድ", "62": "ስድሳ ሁለት", "63": "ስድሳ ሶስት", "64": "ስድሳ አራት", "65": "ስድሳ አምስት",
+    "66": "ስድሳ ስድስት", "67": "ስድሳ ሰባት", "68": "ስድሳ ስምንት", "69": "ስድሳ ዘጠኝ", "70": "ሰባ",
+    "71": "ሰባ አንድ", "72": "ሰባ ሁለት", "73": "ሰባ ሶስት", "74": "ሰባ አራት", "75": "ሰባ አምስት"
+}
+# Combined letter + number clips built by compose-call-clips.py
+CALL_CLIP_NAMES = [f"call-{number}" for number in range(1, 76)]
+
+class GTTSEngine:
+    """Google Translate TTS; the voice is the gTTS tld (accent/server), params take slow"""
+    
+    name = 'gtts'
+    extension = 'mp3'
+    
+    def synthesize(self, text, voice, lang, params):
+        from gtts import gTTS
+        
+        options = {'lang': lang, 'slow': params.get('slow', False)}
+        if voice:
+            options['tld'] = voice
+        buffer = io.BytesIO()
+        gTTS(text=text, **options).write_to_fp(buffer)
+        return buffer.getvalue()
+
+class FakeEngine:
+    """
+    Offline stand-in: a short WAV tone whose pitch and length come from the text,
+    so every clip is distinct and reproducible without network access
+    """
+    
+    name = 'fake'
+    extension = 'wav'
+    sample_rate = 16000
+    
+    def synthesize(self, text, voice, lang, params):
+        seed = int(hashlib.sha256(f"{voice}|{lang}|{text}".encode()).hexdigest()[:8], 16)
+        frequency = 180 + seed % 240
+        duration = (0.25 + 0.06 * len(text)) * (1.5 if params.get('slow') else 1.0)
+        samples = bytearray()
+        for i in range(int(duration * self.sample_rate)):
+            value = int(12000 * math.sin(2 * math.pi * frequency * i / self.sample_rate))
+            samples += value.to_bytes(2, 'little', signed=True)
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(self.sample_rate)
+            out.writeframes(bytes(samples))
+        return buffer.getvalue()
+
+ENGINES = {'gtts': GTTSEngine, 'fake': FakeEngine}
+
+def make_engine(name):
+    if name not in ENGINES:
+        raise ValueError(f"Unknown TTS engine {name!r} (choose from {', '.join(ENGINES)})")
+    return ENGINES[name]()
+
+def clip_key(engine, voice, lang, text, params):
+    """Content address of a clip: everything that changes the synthesized audio"""
+    content = json.dumps([engine.name, voice, lang, text, params], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+class ClipCache:
+    """Synthesized clips stored by key as <key[:2]>/<key>.<ext>"""
+    
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+    
+    def path(self, key, extension):
+        return os.path.join(self.directory, key[:2], f"{key}.{extension}")
+    
+    def get(self, key, extension):
+        path = self.path(key, extension)
+        return path if os.path.exists(path) else None
+    
+    def put(self, key, extension, data):
+        path = self.path(key, extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with atomic_output(path) as temp_path:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+        return path
+
+def load_clip_index(output_dir):
+    try:
+        with open(os.path.join(output_dir, CLIP_INDEX)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_clip_index(output_dir, index):
+    path = os.path.join(output_dir, CLIP_INDEX)
+    with atomic_output(path) as temp_path:
+        with open(temp_path, 'w') as f:
+            json.dump(index, f, indent=1, sort_keys=True)
+
+def synthesize_with_retries(engine, text, voice, lang, params, attempts=RETRIES + 1):
+    for attempt in range(attempts):
+        try:
+            return engine.synthesize(text, voice, lang, params)
+        except ImportError:
+            raise
+        except Exception:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.5 * 2 ** attempt)
+
+def synthesize_clips(texts, engine, voice=None, lang='am', params=None, fallbacks=(),
+                     output_dir=OUTPUT_DIR, cache_dir=CACHE_DIR, workers=DEFAULT_WORKERS, force=False):
+    """
+    Make output_dir/<name>.<ext> hold the clip for every (name, text), in parallel
+    Fallbacks are (voice, lang, params) tuples tried in order when synthesis fails.
+    Returns one result per clip: status is unchanged, cached, synthesized, fallback or failed
+    """
+    params = params or {}
+    cache = ClipCache(cache_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    index = load_clip_index(output_dir)
+    index_lock = threading.Lock()
+    
+    def make_clip(item):
+        name, text = item
+        output_path = os.path.join(output_dir, f"{name}.{engine.extension}")
+        attempts = [(voice, lang, params)] + list(fallbacks)
+        key = clip_key(engine, voice, lang, text, params)
+        result = {'name': name, 'path': output_path, 'key': key}
+        
+        if not force and index.get(name) == key and os.path.exists(output_path):
+            return dict(result, status='unchanged')
+        
+        status = 'cached'
+        cached = None if force else cache.get(key, engine.extension)
+        if cached is None:
+            for number, (attempt_voice, attempt_lang, attempt_params) in enumerate(attempts):
+                key = clip_key(engine, attempt_voice, attempt_lang, text, attempt_params)
+                cached = None if force else cache.get(key, engine.extension)
+                if cached:
+                    break
+                try:
+                    data = synthesize_with_retries(engine, text, attempt_voice, attempt_lang, attempt_params)
+                except Exception as e:
+                    result['error'] = str(e)
+                    continue
+                cached = cache.put(key, engine.extension, data)
+                result.pop('error', None)
+                status = 'synthesized' if number == 0 else 'fallback'
+                break
+        if cached is None:
+            return dict(result, status='failed')
+        
+        with atomic_output(output_path) as temp_path:
+            shutil.copyfile(cached, temp_path)
+        # Indexed under the key the clip was actually made with, so a fallback clip
+        # never counts as the primary voice and the primary is retried next run
+        with index_lock:
+            index[name] = key
+        return dict(result, status=status, key=key)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(make_clip, texts.items()))
+    finally:
+        save_clip_index(output_dir, index)
+
+def print_summary(results, label="voice files"):
+    """Per-clip failures plus one line of counts; returns the number of usable clips"""
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+        if result['status'] == 'failed':
+            print(f"Failed: {os.path.basename(result['path'])} - {result.get('error')}")
+        elif result['status'] == 'fallback':
+            print(f"Generated (fallback): {os.path.basename(result['path'])}")
+    usable = len(results) - counts.get('failed', 0)
+    print(f"\nGenerated {usable}/{len(results)} {label} "
+          f"({', '.join(f'{count} {status}' for status, count in sorted(counts.items()))})")
+    return usable
+
+def add_arguments(parser):
+    """The options every voice script shares"""
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='gtts',
+                        help="TTS engine; 'fake' writes offline test tones as .wav")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Concurrent synthesis requests")
+    parser.add_argument('--output-dir', help=f"Default: {OUTPUT_DIR} ({FAKE_OUTPUT_DIR} for the fake engine)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--force', action='store_true', help="Ignore the cache and synthesize every clip")
+
+def parse_arguments(parser):
+    """parse_args, then pick the output directory for the engine if none was given"""
+    args = parser.parse_args()
+    if args.output_dir is None:
+        args.output_dir = FAKE_OUTPUT_DIR if args.engine == 'fake' else OUTPUT_DIR
+    return args